@@ -19,7 +19,7 @@ async def main():
     else:
         raise RuntimeError("ACCESS_TOKEN not found in environment. Create .env file & put ACCESS_TOKEN=here from upstox.")
     
-    stock_manager_instance = StockManager(access_token=access_token)
+    stock_manager_instance = StockManager(access_token=access_token, broker_url=os.getenv("BROKER_URL")) # BROKER_URL: [Optional] mock broker
     dependencies.stock_manager_instance = stock_manager_instance
     logger.info(f"Initialized Auto Stock Manager with upstox access token...")
     
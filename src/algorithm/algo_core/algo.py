@@ -6,9 +6,13 @@ from datetime import datetime
 from src.algorithm import get_logger
 from src.algorithm.models.candle import Candle
 from src.algorithm.models.ltpc import LTPC
-from src.algorithm.models.trade_signals import SIGNAL
+from src.algorithm.models.trade_signals import SIGNAL, SignalRun
 from src.algorithm.models.indicators import IndicatorModel
 from src.algorithm.models.shared_data import precise_indicator_data
+from src.algorithm.algo_core.signal_emission import SignalEmissionPolicy
+from src.algorithm.algo_core.strategy import Strategy, DefaultStrategy
+from src.algorithm.utils.tracing import tracer
+from src.algorithm.utils.event_bus import events
 
 # logger = get_logger(__name__)
 
@@ -49,6 +53,24 @@ class LevelPlotters:
         return T
     
 
+class TickState:
+    """Per-tick aggregates of the current 5-min interval (every tick is folded in, even the ones skipped while catching up)."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.volume: int = 0
+        self.high: Optional[float] = None
+        self.low: Optional[float] = None
+        self.ticks: int = 0
+
+    def fold(self, ltpc: LTPC):
+        self.volume += ltpc.ltq
+        self.high = ltpc.ltp if self.high is None else max(self.high, ltpc.ltp)
+        self.low = ltpc.ltp if self.low is None else min(self.low, ltpc.ltp)
+        self.ticks += 1
+
+
 class Algorithm:
     
     def __init__(
@@ -57,15 +79,30 @@ class Algorithm:
         indicator_queue: asyncio.Queue = None,
         trade_signal_queue: asyncio.Queue = None,
         isin:str = None,
-        first_candle: Candle = None
+        first_candle: Candle = None,
+        telemetry_every: int = 0,
+        strategy: Strategy = None,
+        catch_up: bool = True,
+        trace: bool = True
     ):
         # self.
         self.algo_ltpc_queue = algo_ltpc_queue
         self.indicator_queue = indicator_queue
         self.trade_signal_queue = trade_signal_queue
+        self.strategy: Strategy = strategy or DefaultStrategy()
         self.latest_indicator: Optional[precise_indicator_data] = None
         self.position_open: bool = False # Flag indicating to check whether a BUY is triggered or not
-        self.trade_signal_hitory: List[SIGNAL] = []
+        # Only signal transitions & BUY/SELL reach the order manager; history is run-length encoded...
+        self.emission_policy = SignalEmissionPolicy(telemetry_every=telemetry_every)
+        self.trade_signal_hitory: List[SignalRun] = self.emission_policy.runs
+        # Catch-up (drain-and-skip) mode: a backlog of ticks is folded into `tick_state` & only the newest one is evaluated...
+        self.catch_up = catch_up
+        self.tick_state = TickState()
+        self.skipped_ticks: int = 0
+        self.last_skipped_lag: float = 0.0 # seconds between the oldest drained tick & the evaluated one
+        self.max_skipped_lag: float = 0.0
+        self.isin = isin
+        self.trace = trace # latency tracing of the ticks (only one algorithm per shared tick may trace it)
         self._tasks = [] 
         self.logger = get_logger(__name__, isin=isin)
         self.t0: Optional[float] = None
@@ -76,11 +113,28 @@ class Algorithm:
         self.first_candle: Candle = first_candle
         #todo self.curr_volume: int = first_candle.volume
     
+    def get_state(self) -> dict:
+        """Snapshot of the algorithm's trading state for checkpointing."""
+        return {
+            "latest_indicator": self.latest_indicator,
+            "position_open": self.position_open,
+            "t0": self.t0,
+            "latest_buy_signal": self.latest_buy_signal,
+            "profit_booking_levels": list(self.profit_booking_levels),
+            "first_candle": self.first_candle,
+        }
+
+    def set_state(self, state: dict):
+        """Restore the trading state from `get_state()` snapshot."""
+        for key, value in state.items():
+            setattr(self, key, value)
+
     async def indicator_consumer(self):
         """Take Input from indicator queue and updating latest indicator to compare with ltpc data."""
         while True:
             indicator_data:precise_indicator_data= await self.indicator_queue.get()
             self.latest_indicator = indicator_data
+            self.tick_state.reset()
             #todo self.curr_volume = max(indicator_data.volume, self.curr_volume) 
             self.logger.info(f"""[Indicators] Updated indicators: {self.latest_indicator.timestamp.strftime('%Y-%m-%d %H:%M:%S:%f')}     
                              VWAP:  {self.latest_indicator.vwap}/-
@@ -88,28 +142,75 @@ class Algorithm:
                              EMA20: {self.latest_indicator.ema20}/-""")
             self.indicator_queue.task_done()
     
+    def _drain_ticks(self, ltpc_data: LTPC) -> List[LTPC]:
+        """Take every tick queued behind `ltpc_data` (catch-up mode) & record the lag being skipped."""
+        ticks = [ltpc_data]
+        if self.catch_up:
+            while not self.algo_ltpc_queue.empty():
+                ticks.append(self.algo_ltpc_queue.get_nowait())
+        if len(ticks) > 1:
+            self.skipped_ticks += len(ticks) - 1
+            self.last_skipped_lag = (ticks[-1].ltt - ticks[0].ltt).total_seconds()
+            self.max_skipped_lag = max(self.max_skipped_lag, self.last_skipped_lag)
+            self.logger.warning(f"[Catch-up] Skipped {len(ticks) - 1} stale ticks ({self.last_skipped_lag:.3f}s behind LTP).")
+        return ticks
+
+    def get_catch_up_stats(self) -> dict:
+        return {
+            "catch_up": self.catch_up,
+            "skipped_ticks": self.skipped_ticks,
+            "last_skipped_lag": self.last_skipped_lag,
+            "max_skipped_lag": self.max_skipped_lag,
+            "backlog": self.algo_ltpc_queue.qsize() if self.algo_ltpc_queue else 0,
+        }
+
     async def algo_ltpc_consumer(self):
-        """Take Real-Time LTPC data input from ltpc queue and compute a trade signal."""
+        """Take Real-Time LTPC data input from ltpc queue and compute a trade signal.
+
+        In catch-up mode every wakeup drains the queued ticks, folds all of them into `tick_state` (volume, high/low) and
+        evaluates the signal once on the newest tick, so a burst can't leave the algorithm trading on stale prices.
+        """
         while True:
-            ltpc_data = await self.algo_ltpc_queue.get()
+            ticks = self._drain_ticks(await self.algo_ltpc_queue.get())
+            for tick in ticks:
+                self.tick_state.fold(tick)
+            ltpc_data = ticks[-1]
+            trace_id = ltpc_data.trace_id if self.trace else None
+            if self.trace:
+                for tick in ticks[:-1]:
+                    tracer.discard(tick.trace_id)
+                tracer.mark(trace_id, "algo_queue")
             if self.latest_indicator is not None:
                 signal = self.compute_trade_signal(indicator_data=self.latest_indicator, ltpc_data=ltpc_data)
-                await self.trade_signal_queue.put(signal)
-                self.trade_signal_hitory.append(signal)
-                self.logger.info(f"Trade Signal: [{signal.signal}] | LTP: {signal.value} | {signal.timestamp.strftime('%Y-%m-%d %H:%M:%S:%f')}")
+                signal.trace_id = trace_id
+                tracer.mark(trace_id, "signal")
+                if self.emission_policy.process(signal):
+                    signal.setup = self.emission_policy.runs[-1].start
+                    if events.wants("signal", self.isin):
+                        events.publish("signal", self.isin, {"strategy": self.strategy.name, **signal.model_dump(mode="json", exclude={"trace_id"})})
+                    await self.trade_signal_queue.put(signal)
+                    self.logger.info(f"Trade Signal: [{signal.signal}] | LTP: {signal.value} | {signal.timestamp.strftime('%Y-%m-%d %H:%M:%S:%f')}")
+                elif self.emission_policy.telemetry_every and self.emission_policy.evaluated % self.emission_policy.telemetry_every == 0:
+                    self.logger.debug(f"[Telemetry] Signal: [{signal.signal}] | LTP: {signal.value} | suppressed: {self.emission_policy.suppressed}")
+                    tracer.discard(trace_id)
+                else:
+                    tracer.discard(trace_id)
             else:
                 self.logger.info("[LTP] No indicator available ATM. Skipping tick.")
-            self.algo_ltpc_queue.task_done()
+                tracer.discard(trace_id)
+            for _ in ticks:
+                self.algo_ltpc_queue.task_done()
     
     def compute_trade_signal(self, indicator_data:precise_indicator_data, ltpc_data: LTPC = None, candle_data: Candle = None) -> SIGNAL:
-        """_summary_
+        """Compute the trade signal of the latest price with the algorithm's strategy.
 
         Args:
-            ltpc_data (LTPC): _description_
-            indicator_data (_type_): _description_
+            indicator_data (precise_indicator_data): Latest indicator values.
+            ltpc_data (LTPC): Real-time tick (live).
+            candle_data (Candle): Candle (backtest), its close is used as price.
 
         Returns:
-            SIGNAL: _description_
+            SIGNAL: Trade signal with the current profit booking levels.
         """
         if candle_data is not None:
             ltp = candle_data.close
@@ -120,20 +221,7 @@ class Algorithm:
         else:
             return None
         
-        # Collect all the indicator values here...
-        vwap = indicator_data.vwap
-        ema9 = indicator_data.ema9
-        ema20 = indicator_data.ema20
-            
-        # NOT Uploading the logic for privacy reasons...
-        # Example usage as follow
-        
-        trade_signal = "WAIT" 
-        #! Four Kind of Trade Signals as follow:
-        # "BUY"  
-        # "SELL"
-        # "HOLD": if either of buy/sell triggered than algorithm will HOLD the value.
-        # "WAIT": if no buy/sell triggered than algorithm will WAIT for trigger.
+        trade_signal = self.strategy.evaluate(indicator_data=indicator_data, ltp=ltp, ltt=ltt, algo=self)
         
         return SIGNAL(
             signal=trade_signal,
@@ -189,7 +277,8 @@ class Algorithm:
                 historical_signals.append(signal)
                 self.logger.info(f"[Historical] at Price : {candle.close}, Signal: {signal.signal}, Indicator: {indicator}") 
         
-        self.trade_signal_hitory.extend(historical_signals)
+        for signal in historical_signals:
+            self.emission_policy.record(signal)
         
         return historical_signals
         
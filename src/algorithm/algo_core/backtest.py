@@ -0,0 +1,205 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.algorithm import get_logger
+from src.algorithm.models.candle import Candle
+from src.algorithm.models.trade_signals import SIGNAL
+from src.algorithm.models.shared_data import precise_indicator_data
+from src.algorithm.models.backtest import BacktestFill, BacktestTrade, BacktestReport
+from src.algorithm.algo_core.algo import LevelPlotters
+from src.algorithm.core.signal_based_order_manager import profit_target_quantities, round_to_tick, DEFAULT_TARGET_SPLIT
+from src.algorithm.utils.columnar_store import to_epoch_us
+
+
+IST = timezone(timedelta(hours=5, minutes=30))
+BUY, SELL, WAIT = 1, -1, 0
+
+# Array form of a trading day: {'timestamp' (int64 epoch-µs), 'open', 'high', 'low', 'close', 'volume', 'ema9', 'ema20', 'vwap'}
+DayArrays = Dict[str, np.ndarray]
+SignalRule = Callable[[DayArrays], np.ndarray]
+
+
+def wait_signal_rule(day: DayArrays) -> np.ndarray:
+    """Vectorized counterpart of `Algorithm.compute_trade_signal` (+1 BUY, -1 SELL, 0 WAIT/HOLD per bar).
+
+    NOTE: The strategy logic isn't part of the repository (same as `compute_trade_signal`), hence WAIT everywhere.
+    Pass your own rule to `VectorizedBacktester(signal_rule=...)`.
+    """
+    return np.zeros(len(day["close"]), dtype=np.int8)
+
+
+def to_day_arrays(one_min_candles: List[Candle], indicators: List[precise_indicator_data], indicator_lag: timedelta = timedelta(minutes=5)) -> DayArrays:
+    """Build aligned day arrays from 1-min candles and 5-min indicators.
+
+    Each bar gets the latest indicator whose 5-min candle had closed (indicator timestamp + `indicator_lag`) at or before the bar,
+    i.e. alignment is by timestamp instead of assuming exactly five 1-min candles per indicator (`i // 5`).
+    """
+    candles = sorted(one_min_candles, key=lambda candle: candle.timestamp)
+    day: DayArrays = {
+        "timestamp": np.array([to_epoch_us(c.timestamp) for c in candles], dtype=np.int64),
+        "open": np.array([c.open for c in candles], dtype=np.float64),
+        "high": np.array([c.high for c in candles], dtype=np.float64),
+        "low": np.array([c.low for c in candles], dtype=np.float64),
+        "close": np.array([c.close for c in candles], dtype=np.float64),
+        "volume": np.array([c.volume for c in candles], dtype=np.float64),
+    }
+    indicators = sorted(indicators, key=lambda indicator: indicator.timestamp)
+    available_at = np.array([to_epoch_us(i.timestamp + indicator_lag) for i in indicators], dtype=np.int64)
+    idx = np.searchsorted(available_at, day["timestamp"], side="right") - 1
+    for name in ("ema9", "ema20", "vwap"):
+        values = np.array([getattr(i, name) for i in indicators] + [np.nan], dtype=np.float64)
+        day[name] = values[idx]  # idx == -1 -> NaN (no indicator yet)
+    return day
+
+
+def _first(mask: np.ndarray, offset: int, default: int) -> int:
+    """Index (+offset) of the first True in mask, else default."""
+    if mask.size and mask.any():
+        return offset + int(mask.argmax())
+    return default
+
+
+class VectorizedBacktester:
+    """Array based backtest engine for the Algorithm over many days & many instruments.
+
+    Signals are computed for a whole day at once by a vectorized `signal_rule`. Fills are simulated per entry (not per bar)
+    with the live order flow's rules:
+        - BUY at the bar close (MARKET), one position at a time.
+        - T1-T4 LIMIT SELLs at `LevelPlotters` levels rounded to `market_spread`, quantities split like `SignalBasedOrderManager`.
+        - SELL signal or end of day exits the remaining quantity (MARKET), like `SignalBasedOrderManager`.
+        - [Opt-in] `stop_level` adds a price stop loss at that level (e.g. -2), not placed by the live order flow; a
+          stop loss and a target touched on the same bar are resolved pessimistically (stop first).
+    """
+
+    def __init__(self,
+                 quantity: int = 100,
+                 percentage_change: float = 1,
+                 market_spread: float = 0.05,
+                 target_split: Tuple[float, float, float] = DEFAULT_TARGET_SPLIT,
+                 signal_rule: SignalRule = wait_signal_rule,
+                 stop_level: Optional[int] = None):
+        """
+        :param stop_level: [Optional] `LevelPlotters` level (e.g. -2) whose price acts as a stop loss. None (default) exits
+            only on a SELL signal / end of day, like the live order flow.
+        """
+        self.quantity = quantity
+        self.percentage_change = percentage_change
+        self.market_spread = market_spread
+        self.target_split = target_split
+        self.signal_rule = signal_rule
+        self.stop_level = stop_level
+        self.level_plotters = LevelPlotters(percentage_change=percentage_change)
+        self.logger = get_logger(__name__)
+
+    def _levels(self, entry_price: float, entry_ts: datetime) -> Tuple[List[float], Optional[float]]:
+        """Target prices & the opt-in stop price (None without `stop_level`).
+
+        :raises ValueError: If `stop_level` isn't one of the plotted levels.
+        """
+        levels = self.level_plotters.get_n_levels(
+            number_of_levels=4,
+            BUY_SIGNAL=SIGNAL(signal="BUY", value=entry_price, timestamp=entry_ts),
+        )
+        targets = [round_to_tick(level["value"], self.market_spread) for level in levels if level["level"] > 0]
+        if self.stop_level is None:
+            return targets, None
+        stops = [level["value"] for level in levels if level["level"] == self.stop_level]
+        if not stops:
+            raise ValueError(f"stop_level {self.stop_level} isn't a plotted level: {[level['level'] for level in levels]}")
+        return targets, stops[0]
+
+    def run_day(self, isin: str, day: DayArrays) -> List[BacktestTrade]:
+        """Simulate one instrument-day and return its trades."""
+        close, high, low, ts = day["close"], day["high"], day["low"], day["timestamp"]
+        n = len(close)
+        if n == 0:
+            return []
+        signals = np.asarray(self.signal_rule(day))
+        buys = np.flatnonzero(signals == BUY)
+        sells = np.flatnonzero(signals == SELL)
+        to_dt = lambda i: datetime.fromtimestamp(ts[i] / 1e6, tz=IST)
+
+        trades: List[BacktestTrade] = []
+        next_allowed = 0
+        for b in buys:
+            if b < next_allowed or b >= n - 1:
+                continue
+            entry_price = float(close[b])
+            targets, stop = self._levels(entry_price, to_dt(b))
+            start = b + 1
+
+            stop_idx = _first(low[start:] <= stop, start, n) if stop is not None else n
+            sell_pos = np.searchsorted(sells, b, side="right")
+            signal_idx = int(sells[sell_pos]) if sell_pos < len(sells) else n
+            exit_idx = min(stop_idx, signal_idx, n - 1)
+
+            fills = [BacktestFill(label="BUY", price=entry_price, quantity=self.quantity, timestamp=to_dt(b))]
+            remaining, pnl, last_target_idx = self.quantity, 0.0, start
+            for (qty, label), target in zip(profit_target_quantities(self.quantity, self.target_split), targets):
+                if qty <= 0:
+                    continue
+                hit_idx = _first(high[start:exit_idx + 1] >= target, start, n)
+                # pessimistic: nothing fills on a bar that hits the stop...
+                if hit_idx < exit_idx or (hit_idx == exit_idx and exit_idx != stop_idx):
+                    fills.append(BacktestFill(label=label, price=target, quantity=qty, timestamp=to_dt(hit_idx)))
+                    pnl += qty * (target - entry_price)
+                    remaining -= qty
+                    last_target_idx = max(last_target_idx, hit_idx)
+
+            if remaining > 0:
+                if exit_idx == stop_idx:
+                    # gap below the stop -> filled at the open...
+                    label, exit_price = "SL", min(stop, float(day["open"][exit_idx]))
+                elif exit_idx == signal_idx:
+                    label, exit_price = "SELL", float(close[exit_idx])
+                else:
+                    label, exit_price = "EOD", float(close[exit_idx])
+                fills.append(BacktestFill(label=label, price=exit_price, quantity=remaining, timestamp=to_dt(exit_idx)))
+                pnl += remaining * (exit_price - entry_price)
+            else:
+                exit_idx = last_target_idx
+
+            trades.append(BacktestTrade(
+                isin=isin,
+                entry_price=entry_price,
+                entry_time=to_dt(b),
+                exit_time=to_dt(exit_idx),
+                quantity=self.quantity,
+                fills=fills,
+                pnl=pnl,
+            ))
+            next_allowed = exit_idx + 1
+        return trades
+
+    def run(self, data: Dict[str, Sequence[DayArrays]]) -> BacktestReport:
+        """Backtest every instrument-day.
+
+        :param data: {isin: [day arrays, ...]} (see `to_day_arrays`).
+        """
+        started = time.perf_counter()
+        trades: List[BacktestTrade] = []
+        pnl_by_isin: Dict[str, float] = {}
+        bars = 0
+        for isin, days in data.items():
+            pnl_by_isin[isin] = 0.0
+            for day in days:
+                bars += len(day["close"])
+                day_trades = self.run_day(isin, day)
+                pnl_by_isin[isin] += sum(trade.pnl for trade in day_trades)
+                trades.extend(day_trades)
+        elapsed = time.perf_counter() - started
+
+        report = BacktestReport(
+            trades=trades,
+            pnl_by_isin=pnl_by_isin,
+            total_pnl=sum(pnl_by_isin.values()),
+            win_rate=(sum(trade.pnl > 0 for trade in trades) / len(trades)) if trades else None,
+            bars=bars,
+            elapsed=elapsed,
+            bars_per_sec=(bars / elapsed) if elapsed > 0 else 0.0,
+        )
+        self.logger.info(f"[Backtest] {len(data)} instruments | {bars} bars | {len(trades)} trades | PnL: {report.total_pnl:.2f} | {report.bars_per_sec:,.0f} bars/sec")
+        return report
@@ -0,0 +1,268 @@
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.algorithm import get_logger
+from src.algorithm.algo_core.backtest import VectorizedBacktester, SignalRule, DayArrays, wait_signal_rule
+from src.algorithm.core.signal_based_order_manager import DEFAULT_TARGET_SPLIT
+
+
+CANDLE_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+FIVE_MIN_US = 5 * 60 * 1_000_000
+
+# Parameter set, e.g. {'percentage_change': 1, 'ema_fast': 9, 'ema_slow': 20, 'target_split': (0.5, 0.1, 0.15), 'market_spread': 0.05}
+Params = Dict[str, Any]
+
+
+def grid(space: Dict[str, Sequence[Any]]) -> List[Params]:
+    """All the combinations of a parameter space."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_sample(space: Dict[str, Sequence[Any]], n: int, seed: int = None) -> List[Params]:
+    """`n` random parameter sets of a parameter space."""
+    rng = random.Random(seed)
+    return [{key: rng.choice(list(values)) for key, values in space.items()} for _ in range(n)]
+
+
+def ema_on_5min_closes(timestamp: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """EMA of 5-minute closes over consecutive days, forward-filled to 1-min bars once its 5-min candle closed.
+
+    Seeded like `EMA.initialize_ema_with_history` (SMA of the first `period` 5-min closes), then carried over day boundaries.
+    """
+    # last 1-min bar of every 5-min interval...
+    bucket = timestamp // FIVE_MIN_US
+    is_last = np.ones(len(bucket), dtype=bool)
+    is_last[:-1] = bucket[1:] != bucket[:-1]
+    closes = close[is_last]
+    available_at = (bucket[is_last] + 1) * FIVE_MIN_US
+
+    ema = np.full(len(closes), np.nan)
+    if len(closes) >= period:
+        alpha = 2 / (period + 1)
+        value = closes[:period].mean()
+        ema[period - 1] = value
+        for i in range(period, len(closes)):
+            value = alpha * closes[i] + (1 - alpha) * value
+            ema[i] = value
+
+    idx = np.searchsorted(available_at, timestamp, side="right") - 1
+    return np.where(idx >= 0, ema[np.maximum(idx, 0)], np.nan)
+
+
+def vwap_on_5min_candles(timestamp: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                         day_offsets: np.ndarray) -> np.ndarray:
+    """Session VWAP (HLC3) of the 5-minute candles built from 1-min bars, forward-filled to 1-min bars once its 5-min candle closed.
+
+    Same as `VWAP.update` (reset every session) aligned like `backtest.to_day_arrays` (NaN before the first 5-min candle of the day).
+    """
+    vwap = np.full(len(close), np.nan)
+    for lo, hi in zip(day_offsets[:-1], day_offsets[1:]):
+        if hi <= lo:
+            continue
+        bucket = timestamp[lo:hi] // FIVE_MIN_US
+        starts = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+        ends = np.concatenate([starts[1:], [hi - lo]]) - 1
+        hlc3 = (np.maximum.reduceat(high[lo:hi], starts) + np.minimum.reduceat(low[lo:hi], starts) + close[lo:hi][ends]) / 3
+        bucket_volume = np.add.reduceat(volume[lo:hi], starts)
+        cum_v = np.cumsum(bucket_volume)
+        values = np.divide(np.cumsum(hlc3 * bucket_volume), cum_v, out=np.zeros_like(cum_v), where=cum_v != 0)
+        available_at = (bucket[starts] + 1) * FIVE_MIN_US
+        idx = np.searchsorted(available_at, timestamp[lo:hi], side="right") - 1
+        vwap[lo:hi] = np.where(idx >= 0, values[np.maximum(idx, 0)], np.nan)
+    return vwap
+
+
+# ---------------- Worker side (shared memory) ----------------
+_WORKER: Dict[str, Any] = {}
+
+
+def _attach(shm_name: str, layout: Dict[str, Tuple[int, int, np.ndarray]], signal_rule: SignalRule, quantity: int):
+    """Process pool initializer: attach the shared candle arrays once per worker (no copies)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    data = {}
+    for isin, (offset, n_bars, day_offsets) in layout.items():
+        block = np.ndarray((len(CANDLE_FIELDS), n_bars), dtype=np.float64, buffer=shm.buf, offset=offset)
+        data[isin] = (block, day_offsets)
+    _WORKER.update(shm=shm, data=data, signal_rule=signal_rule, quantity=quantity, ema_cache={})
+
+
+def _ema(isin: str, period: int) -> np.ndarray:
+    key = (isin, period)
+    if key not in _WORKER["ema_cache"]:
+        block, day_offsets = _WORKER["data"][isin]
+        _WORKER["ema_cache"][key] = ema_on_5min_closes(block[0].view(np.int64), block[4], period)
+    return _WORKER["ema_cache"][key]
+
+
+def _vwap(isin: str) -> np.ndarray:
+    key = (isin, "vwap")
+    if key not in _WORKER["ema_cache"]:
+        block, day_offsets = _WORKER["data"][isin]
+        _WORKER["ema_cache"][key] = vwap_on_5min_candles(block[0].view(np.int64), block[2], block[3], block[4], block[5], day_offsets)
+    return _WORKER["ema_cache"][key]
+
+
+def _evaluate(task: Tuple[int, Params, int, int]) -> Dict[str, Any]:
+    """Backtest one parameter set over days [day_start, day_end) of every instrument."""
+    param_id, params, day_start, day_end = task
+    backtester = VectorizedBacktester(
+        quantity=_WORKER["quantity"],
+        percentage_change=params.get("percentage_change", 1),
+        market_spread=params.get("market_spread", 0.05),
+        target_split=params.get("target_split", DEFAULT_TARGET_SPLIT),
+        signal_rule=_WORKER["signal_rule"],
+        stop_level=params.get("stop_level"),
+    )
+    backtester.logger.disabled = True
+    data: Dict[str, List[DayArrays]] = {}
+    for isin, (block, day_offsets) in _WORKER["data"].items():
+        ema_fast = _ema(isin, params.get("ema_fast", 9))
+        ema_slow = _ema(isin, params.get("ema_slow", 20))
+        vwap = _vwap(isin)
+        days = []
+        for d in range(day_start, min(day_end, len(day_offsets) - 1)):
+            lo, hi = day_offsets[d], day_offsets[d + 1]
+            day = {field: block[i, lo:hi] for i, field in enumerate(CANDLE_FIELDS)}
+            day["timestamp"] = block[0, lo:hi].view(np.int64)
+            # `DayArrays` columns of the backtester (ema9 / ema20 hold the swept fast / slow periods) + their aliases...
+            day["ema9"] = day["ema_fast"] = ema_fast[lo:hi]
+            day["ema20"] = day["ema_slow"] = ema_slow[lo:hi]
+            day["vwap"] = vwap[lo:hi]
+            days.append(day)
+        data[isin] = days
+    report = backtester.run(data)
+    return {
+        "param_id": param_id,
+        **params,
+        "day_start": day_start,
+        "day_end": day_end,
+        "pnl": report.total_pnl,
+        "trades": len(report.trades),
+        "win_rate": report.win_rate,
+        "bars": report.bars,
+        "bars_per_sec": report.bars_per_sec,
+    }
+
+
+class ParameterSweep:
+    """Parallel parameter sweep & walk-forward optimizer over cached history.
+
+    Candle arrays of all instruments are packed once into a single shared memory block; every `ProcessPoolExecutor` worker
+    attaches to it in its initializer (zero-copy views) and caches the EMA columns per period it needs (and the VWAP column).
+    The day arrays passed to the signal rule have the `DayArrays` columns of `VectorizedBacktester`, so the same rules run
+    under both: `ema9` / `ema20` hold the parameter set's `ema_fast` / `ema_slow` periods (also available under those
+    names) and `vwap` is the session VWAP.
+
+    Use it as a context manager (or call `close`) to release the shared memory block.
+
+    :param history: {isin: [day arrays (timestamp, open, high, low, close, volume)], ...} in chronological order.
+    :param signal_rule: Module-level (picklable) vectorized signal rule (see `backtest.wait_signal_rule`).
+    """
+
+    def __init__(self, history: Dict[str, Sequence[DayArrays]], signal_rule: SignalRule = wait_signal_rule, quantity: int = 100, max_workers: int = None):
+        self.signal_rule = signal_rule
+        self.quantity = quantity
+        self.max_workers = max_workers
+        self.logger = get_logger(__name__)
+        self.n_days = min(len(days) for days in history.values()) if history else 0
+        self._shm, self._layout = self._pack(history)
+
+    def __enter__(self) -> "ParameterSweep":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _pack(history: Dict[str, Sequence[DayArrays]]):
+        sizes = {isin: sum(len(day["close"]) for day in days) for isin, days in history.items()}
+        total = max(sum(sizes.values()) * len(CANDLE_FIELDS) * 8, 1)
+        shm = shared_memory.SharedMemory(create=True, size=total)
+        try:
+            return shm, ParameterSweep._fill(shm, history, sizes)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+
+    @staticmethod
+    def _fill(shm: shared_memory.SharedMemory, history: Dict[str, Sequence[DayArrays]], sizes: Dict[str, int]):
+        layout, offset = {}, 0
+        for isin, days in history.items():
+            n_bars = sizes[isin]
+            block = np.ndarray((len(CANDLE_FIELDS), n_bars), dtype=np.float64, buffer=shm.buf, offset=offset)
+            block[0].view(np.int64)[:] = np.concatenate([day["timestamp"] for day in days]).astype(np.int64) if days else []
+            for i, field in enumerate(CANDLE_FIELDS[1:], start=1):
+                block[i] = np.concatenate([day[field] for day in days]) if days else []
+            day_offsets = np.concatenate([[0], np.cumsum([len(day["close"]) for day in days])]).astype(np.int64)
+            layout[isin] = (offset, n_bars, day_offsets)
+            offset += block.nbytes
+            del block
+        return layout
+
+    def _run_tasks(self, tasks: List[Tuple[int, Params, int, int]]) -> List[Dict[str, Any]]:
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_attach,
+            initargs=(self._shm.name, self._layout, self.signal_rule, self.quantity),
+        ) as executor:
+            chunksize = max(1, len(tasks) // ((self.max_workers or 8) * 4))
+            return list(executor.map(_evaluate, tasks, chunksize=chunksize))
+
+    def sweep(self, param_sets: Iterable[Params], day_start: int = 0, day_end: int = None, sort_by: str = "pnl") -> pd.DataFrame:
+        """Evaluate every parameter set over the given days -> results table sorted by `sort_by` (desc)."""
+        day_end = self.n_days if day_end is None else day_end
+        tasks = [(i, params, day_start, day_end) for i, params in enumerate(param_sets)]
+        results = pd.DataFrame(self._run_tasks(tasks))
+        self.logger.info(f"[Sweep] {len(tasks)} parameter sets | days {day_start}-{day_end}")
+        return results.sort_values(sort_by, ascending=False, ignore_index=True) if not results.empty else results
+
+    def walk_forward(self, param_sets: Sequence[Params], train_days: int, test_days: int, step: int = None, sort_by: str = "pnl") -> pd.DataFrame:
+        """Walk-forward optimization: pick the best parameter set on each train window, evaluate it on the following test window.
+
+        :return: One row per window with the chosen parameters, its train score and out-of-sample test results.
+        """
+        param_sets = list(param_sets)
+        step = step or test_days
+        windows = []
+        for start in range(0, self.n_days - train_days - test_days + 1, step):
+            windows.append((start, start + train_days, start + train_days + test_days))
+
+        train_tasks = [(i, params, start, split) for start, split, _ in windows for i, params in enumerate(param_sets)]
+        train = pd.DataFrame(self._run_tasks(train_tasks))
+
+        best = []
+        for start, split, end in windows:
+            scores = train[(train["day_start"] == start) & (train["day_end"] == split)]
+            best.append(int(scores.loc[scores[sort_by].idxmax(), "param_id"]))
+        test_tasks = [(param_id, param_sets[param_id], split, end) for param_id, (start, split, end) in zip(best, windows)]
+        test = self._run_tasks(test_tasks)
+
+        rows = []
+        for (start, split, end), param_id, test_result in zip(windows, best, test):
+            train_score = train[(train["day_start"] == start) & (train["param_id"] == param_id)][sort_by].iloc[0]
+            rows.append({
+                "train_start": start, "test_start": split, "test_end": end,
+                **param_sets[param_id], "param_id": param_id,
+                f"train_{sort_by}": train_score,
+                "test_pnl": test_result["pnl"], "test_trades": test_result["trades"], "test_win_rate": test_result["win_rate"],
+            })
+        self.logger.info(f"[Walk-Forward] {len(windows)} windows x {len(param_sets)} parameter sets")
+        return pd.DataFrame(rows)
+
+    def close(self):
+        """Release the shared memory block (idempotent)."""
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        finally:
+            self._shm.unlink()
+            self._shm = None
@@ -0,0 +1,62 @@
+from collections import deque
+from typing import Deque, List, Optional, Sequence
+
+from src.algorithm.models.trade_signals import SIGNAL, SignalRun
+
+
+class SignalEmissionPolicy:
+    """Decides which per-tick signals are forwarded to the order manager & keeps a compact signal history.
+
+    - Only state transitions (e.g. WAIT -> HOLD) and actionable signals (BUY / SELL) are emitted; `once_per_run` signals
+      (SELL: one exit per run, its handler flattens the whole position) only on their first tick.
+    - History is kept as run-length encoded state changes (`runs`) instead of one `SIGNAL` per tick.
+    - Optional sampled telemetry keeps every `telemetry_every`-th tick's signal (bounded).
+    """
+
+    def __init__(self,
+                 actionable: Sequence[str] = ("BUY", "SELL"),
+                 once_per_run: Sequence[str] = ("SELL",),
+                 telemetry_every: int = 0,
+                 telemetry_size: int = 1000):
+        self.actionable = set(actionable)
+        self.once_per_run = set(once_per_run)
+        self.telemetry_every = telemetry_every
+        self.runs: List[SignalRun] = []
+        self.telemetry: Deque[SIGNAL] = deque(maxlen=telemetry_size)
+        self.evaluated = 0
+        self.emitted = 0
+
+    @property
+    def last_signal(self) -> Optional[str]:
+        return self.runs[-1].signal if self.runs else None
+
+    def process(self, signal: SIGNAL) -> bool:
+        """Record the signal and tell whether it has to be emitted."""
+        self.evaluated += 1
+        emit = signal.signal != self.last_signal or (signal.signal in self.actionable and signal.signal not in self.once_per_run)
+        self.record(signal)
+        if self.telemetry_every and self.evaluated % self.telemetry_every == 0:
+            self.telemetry.append(signal)
+        if emit:
+            self.emitted += 1
+        return emit
+
+    def record(self, signal: SIGNAL):
+        """Append the signal to the run-length encoded history."""
+        last = self.runs[-1] if self.runs else None
+        if last is not None and last.signal == signal.signal:
+            last.end = signal.timestamp
+            last.count += 1
+            last.last_value = signal.value
+        else:
+            self.runs.append(SignalRun(
+                signal=signal.signal,
+                start=signal.timestamp,
+                end=signal.timestamp,
+                first_value=signal.value,
+                last_value=signal.value,
+            ))
+
+    @property
+    def suppressed(self) -> int:
+        return self.evaluated - self.emitted
@@ -0,0 +1,86 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple, Type
+
+from src.algorithm.models.shared_data import precise_indicator_data
+from src.algorithm.tools.indicator import Indicator
+from src.algorithm.tools.ema import EMA
+from src.algorithm.tools.vwap import VWAP
+
+
+class Strategy(ABC):
+    """Base Class for all the trading strategies | Blueprint.
+
+    Declared requirements (used by `StockProcessor` to build one shared `IndicatorPipeline` per instrument):
+        indicators: {pipeline name: indicator factory} -> indicators with the same name are computed once for all the strategies.
+        timeframes: Candle timeframes the strategy consumes.
+    """
+    name: str = None
+    indicators: Dict[str, Callable[[], Indicator]] = {}
+    timeframes: Tuple[str, ...] = ("5min",)
+
+    @abstractmethod
+    def evaluate(self, indicator_data: precise_indicator_data, ltp: float, ltt: datetime, algo) -> str:
+        """Decide the trade signal for the latest price.
+
+        :param indicator_data(precise_indicator_data): Latest indicator values (`indicator_data.values[name]`).
+        :param ltp(float): Last traded price (or candle close while backtesting).
+        :param ltt(datetime): Last traded time.
+        :param algo(Algorithm): Owning algorithm (position state, profit booking levels, ...).
+        :return: One of "WAIT", "BUY", "HOLD", "SELL".
+        """
+        pass
+
+
+STRATEGIES: Dict[str, Type[Strategy]] = {}
+
+
+def register_strategy(cls: Type[Strategy]) -> Type[Strategy]:
+    """Class decorator adding a strategy to the registry (selectable per ISIN through the API)."""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} must define a strategy name.")
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+def get_strategy(name: str) -> Strategy:
+    """New instance of a registered strategy.
+
+    :raises ValueError: On unknown strategy names.
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Available: {list_strategies()}")
+    return STRATEGIES[name]()
+
+
+def list_strategies() -> List[str]:
+    return sorted(STRATEGIES)
+
+
+@register_strategy
+class DefaultStrategy(Strategy):
+    """EMA9 / EMA20 / VWAP strategy (the original `Algorithm.compute_trade_signal`)."""
+    name = "default"
+    indicators = {
+        "EMA9": lambda: EMA(period=9),
+        "EMA20": lambda: EMA(period=20),
+        "VWAP": lambda: VWAP(),
+    }
+
+    def evaluate(self, indicator_data: precise_indicator_data, ltp: float, ltt: datetime, algo) -> str:
+        # Collect all the indicator values here...
+        vwap = indicator_data.vwap
+        ema9 = indicator_data.ema9
+        ema20 = indicator_data.ema20
+
+        # NOT Uploading the logic for privacy reasons...
+        # Example usage as follow
+
+        trade_signal = "WAIT"
+        #! Four Kind of Trade Signals as follow:
+        # "BUY"
+        # "SELL"
+        # "HOLD": if either of buy/sell triggered than algorithm will HOLD the value.
+        # "WAIT": if no buy/sell triggered than algorithm will WAIT for trigger.
+
+        return trade_signal
@@ -1,10 +1,17 @@
 import os
-from fastapi import FastAPI, Depends, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+import json
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException, Request, Form, WebSocket
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
+from typing import List, Optional
 from src.algorithm.pipelines.stock_manager import StockManager
+from src.algorithm.models.risk import RiskLimits
+from src.algorithm.algo_core.strategy import list_strategies
+from src.algorithm.utils.tracing import tracer
+from src.algorithm.utils.event_bus import events, Subscription
 from src.algorithm.api.dependencies import get_stock_manager
 from src.algorithm import get_logger
 
@@ -32,6 +39,7 @@ stock_manager: StockManager = None # initialized in main.py
 class StockRequest(BaseModel):
     isin:str
     quantity: int
+    strategies: List[str] = ["default"]
     # buy/sell
 
 
@@ -40,8 +48,17 @@ async def add_stock(stock: StockRequest, stock_manager:StockManager= Depends(get
 
     if stock_manager is None:
         raise HTTPException(status_code=500, detail="Stock manager not initialized.")
-    await stock_manager.add_stock(stock.isin, stock.quantity)
-    logger.info(f"Added stock {stock.isin}")
+    unknown = set(stock.strategies) - set(list_strategies())
+    if unknown or not stock.strategies:
+        raise HTTPException(status_code=400, detail=f"Unknown strategies: {sorted(unknown)}. Available: {list_strategies()}")
+    if stock.isin in stock_manager.processors:
+        strategies = list(stock_manager.processors[stock.isin].strategies)
+        raise HTTPException(status_code=409, detail=f"Stock {stock.isin} is already monitored with strategies {strategies}. Remove it first to change them.")
+    try:
+        await stock_manager.add_stock(stock.isin, stock.quantity, stock.strategies)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Added stock {stock.isin} with strategies {stock.strategies}")
     return {
         "message": f"Added stock {stock.isin}."
     }
@@ -62,7 +79,145 @@ async def list_stocks(stock_manager:StockManager=Depends(get_stock_manager)):
         raise HTTPException(status_code=500, detail="Stock manager not initialized.")
     stocks = list(stock_manager.processors.keys())
     return {
-        "stocks": stocks
+        "stocks": stocks,
+        "strategies": {isin: list(processor.strategies) for isin, processor in stock_manager.processors.items()}
+    }
+    
+@app.get("/stocks/{isin}/stats", response_class=JSONResponse)
+async def stock_stats(isin: str, stock_manager:StockManager=Depends(get_stock_manager)):
+    processor = stock_manager.processors.get(isin) if stock_manager else None
+    if processor is None:
+        raise HTTPException(status_code=404, detail=f"Stock {isin} not found.")
+    return {
+        "isin": isin,
+        "strategies": {
+            name: {
+                **algo.get_catch_up_stats(),
+                "signals_evaluated": algo.emission_policy.evaluated,
+                "signals_emitted": algo.emission_policy.emitted,
+                "order_idempotency": processor.signal_managers[name].idempotency.get_stats(),
+            }
+            for name, algo in processor.algos.items()
+        }
+    }
+
+@app.get("/orders/latency", response_class=JSONResponse)
+async def order_latency(stock_manager:StockManager=Depends(get_stock_manager)):
+    return {
+        "latency_ms": stock_manager.order_manager.get_latency_stats(),
+        "rate_limits": stock_manager.order_manager.rate_limiter.get_stats(),
+        "status_poller": stock_manager.order_manager.status_poller.get_stats()
+    }
+
+@app.get("/positions", response_class=JSONResponse)
+async def get_positions(stock_manager:StockManager=Depends(get_stock_manager)):
+    """Live positions & PnL per ISIN and in aggregate."""
+    return {
+        "summary": stock_manager.ledger.get_summary(),
+        "positions": stock_manager.ledger.get_positions()
+    }
+
+@app.get("/positions/{isin}", response_class=JSONResponse)
+async def get_position(isin: str, stock_manager:StockManager=Depends(get_stock_manager)):
+    position = stock_manager.ledger.get_position(isin)
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"No position for {isin}.")
+    return position
+
+@app.get("/risk", response_class=JSONResponse)
+async def get_risk(stock_manager:StockManager=Depends(get_stock_manager)):
+    """Risk limits, kill switch & the gate's decision counters."""
+    return stock_manager.risk_gate.get_stats()
+
+@app.put("/risk/limits", response_class=JSONResponse)
+async def set_risk_limits(limits: RiskLimits, stock_manager:StockManager=Depends(get_stock_manager)):
+    stock_manager.risk_gate.set_limits(limits)
+    logger.info(f"Risk limits updated: {limits}")
+    return stock_manager.risk_gate.get_stats()
+
+@app.post("/risk/kill", response_class=JSONResponse)
+async def kill_switch(stock_manager:StockManager=Depends(get_stock_manager)):
+    """Block every new entry (exits still go through)."""
+    stock_manager.risk_gate.kill("manual (API)")
+    return {"kill_switch": stock_manager.risk_gate.killed}
+
+@app.post("/risk/resume", response_class=JSONResponse)
+async def resume_trading(stock_manager:StockManager=Depends(get_stock_manager)):
+    stock_manager.risk_gate.resume()
+    return {"kill_switch": stock_manager.risk_gate.killed}
+
+@app.get("/latency/trace", response_class=JSONResponse)
+async def trace_latency():
+    """Per stage (tick -> fill) latency histograms."""
+    return {
+        "stages": tracer.get_histograms()
+    }
+
+def _subscribe(isins: Optional[str], topics: Optional[str], max_buffer: int) -> Subscription:
+    """Comma separated ISINs / topics (all by default) -> event bus subscription."""
+    return events.subscribe(
+        isins=[isin for isin in (isins or "").split(",") if isin],
+        topics=[topic for topic in (topics or "").split(",") if topic],
+        max_buffer=max_buffer,
+    )
+
+@app.get("/stream")
+async def stream_events(isins: Optional[str] = None, topics: Optional[str] = None, max_rate: Optional[float] = None, max_buffer: int = 512):
+    """Server-Sent Events of ticks, estimated & confirmed indicators, signals and order updates.
+
+    e.g. `/stream?isins=INE121J01017&topics=tick,signal&max_rate=4` (at most 4 updates/sec, ticks conflated to the latest).
+    """
+    try:
+        subscription = _subscribe(isins, topics, max_buffer)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def event_source():
+        try:
+            async for batch in subscription.batches(max_rate):
+                yield "".join(f"event: {event['topic']}\ndata: {json.dumps(event, default=str)}\n\n" for event in batch)
+        finally:
+            events.unsubscribe(subscription)
+
+    return StreamingResponse(event_source(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/ws/stream")
+async def websocket_stream(websocket: WebSocket, isins: Optional[str] = None, topics: Optional[str] = None, max_rate: Optional[float] = None, max_buffer: int = 512):
+    """WebSocket variant of `/stream`: every message is a JSON array of events (one throttled batch)."""
+    try:
+        subscription = _subscribe(isins, topics, max_buffer)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    await websocket.accept()
+
+    async def watch_disconnect():
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            events.unsubscribe(subscription, reason="client disconnected")
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        async for batch in subscription.batches(max_rate):
+            await websocket.send_text(json.dumps(batch, default=str))
+        if subscription.close_reason != "client disconnected":
+            await websocket.close(code=1013, reason=subscription.close_reason or "")
+    except Exception as e:
+        logger.info(f"Stream websocket closed: {e}")
+    finally:
+        watcher.cancel()
+        events.unsubscribe(subscription)
+
+@app.get("/stream/stats", response_class=JSONResponse)
+async def stream_stats():
+    return events.get_stats()
+
+@app.get("/strategies", response_class=JSONResponse)
+async def get_strategies():
+    return {
+        "strategies": list_strategies()
     }
     
 # Frontend Form Handling Endpoint
@@ -74,15 +229,19 @@ async def add_stock_form(request: Request,
     
     if stock_manager is None:
         raise HTTPException(status_code=500, detail="Stock manager not initialized.")
-    await stock_manager.add_stock(isin, quantity)
-    logger.info(f"Added stock {isin} via frontend")
+    if isin in stock_manager.processors:
+        message = f"Stock {isin} is already monitored with strategies {list(stock_manager.processors[isin].strategies)}."
+    else:
+        await stock_manager.add_stock(isin, quantity)
+        logger.info(f"Added stock {isin} via frontend")
+        message = f"Stock {isin} added."
     stocks = list(stock_manager.processors.keys())
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
             "stocks":stocks,
-            "message": f"Stock {isin} added."
+            "message": message
         }
     )
     
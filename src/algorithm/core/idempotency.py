@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from typing import Hashable
+
+from src.algorithm.utils import clock
+
+
+class IdempotencyCache:
+    """TTL cache of order idempotency keys (e.g. (ISIN, strategy, setup)).
+
+    `acquire(key)` is an O(1) check-and-set: the first caller of a key gets True, every other caller gets False until
+    the key expires (`ttl` seconds) or is released. Keys are kept in insertion order, so expired ones are purged from the
+    front (amortized O(1)).
+    """
+
+    def __init__(self, ttl: float = 6 * 60 * 60, max_size: int = 10000):
+        """
+        :param ttl: Seconds a key blocks duplicates (default: a trading session).
+        :param max_size: Max keys kept (oldest dropped first).
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._expires: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.acquired = 0
+        self.suppressed = 0
+
+    def _purge(self, now: float):
+        while self._expires:
+            key, expires_at = next(iter(self._expires.items()))
+            if expires_at > now and len(self._expires) <= self.max_size:
+                return
+            self._expires.popitem(last=False)
+
+    def acquire(self, key: Hashable) -> bool:
+        """Claim the key; False (duplicate, counted as suppressed) if it's already held."""
+        now = clock.monotonic()
+        self._purge(now)
+        if key in self._expires:
+            self.suppressed += 1
+            return False
+        self._expires[key] = now + self.ttl
+        self.acquired += 1
+        return True
+
+    def release(self, key: Hashable):
+        """Forget the key (e.g. the order never reached the broker, so a retry is not a duplicate)."""
+        self._expires.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._purge(clock.monotonic())
+        return key in self._expires
+
+    def get_stats(self) -> dict:
+        return {
+            "keys": len(self._expires),
+            "acquired": self.acquired,
+            "suppressed_duplicates": self.suppressed,
+        }
@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.algorithm import get_logger
+
+
+class PositionLedger:
+    """In-memory positions & PnL per ISIN and in aggregate.
+
+    State lives in parallel NumPy arrays (one slot per ISIN: signed quantity, average cost, last price, realized &
+    unrealized PnL), so a tick re-marks only the instrument that ticked in O(1), and the aggregates are kept as running
+    totals updated by the tick's delta. Fills are taken from order updates (`on_order_update`, subscribed to the
+    `OrderUpdateHub`), deduplicated by the cumulative filled quantity of each order.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.slots: Dict[str, int] = {} # isin -> array index
+        self.isins: List[str] = []
+        self.quantity = np.zeros(capacity)     # signed (long > 0, short < 0)
+        self.avg_cost = np.zeros(capacity)
+        self.last_price = np.zeros(capacity)
+        self.realized = np.zeros(capacity)
+        self.unrealized = np.zeros(capacity)
+        # Running aggregates...
+        self.total_realized = 0.0
+        self.total_unrealized = 0.0
+        self.gross_exposure = 0.0 # Σ |qty| × price
+        self.net_exposure = 0.0   # Σ qty × price
+        self._fills: Dict[str, Tuple[int, float]] = {} # order_id -> (filled quantity, filled value) seen so far
+        self.logger = get_logger(__name__)
+
+    def _slot(self, isin: str) -> int:
+        i = self.slots.get(isin)
+        if i is None:
+            i = len(self.isins)
+            if i == len(self.quantity):
+                for name in ("quantity", "avg_cost", "last_price", "realized", "unrealized"):
+                    setattr(self, name, np.concatenate([getattr(self, name), np.zeros(len(self.quantity))]))
+            self.slots[isin] = i
+            self.isins.append(isin)
+        return i
+
+    def _remark(self, i: int, price: float):
+        """Re-value slot `i` at `price` & shift the aggregates by its change."""
+        quantity = float(self.quantity[i])
+        unrealized = quantity * (price - float(self.avg_cost[i])) if quantity else 0.0
+        exposure = quantity * price
+        previous_exposure = quantity * float(self.last_price[i])
+        self.total_unrealized += unrealized - float(self.unrealized[i])
+        self.net_exposure += exposure - previous_exposure
+        self.gross_exposure += abs(exposure) - abs(previous_exposure)
+        self.unrealized[i] = unrealized
+        self.last_price[i] = price
+
+    def mark(self, isin: str, price: float):
+        """Mark-to-market one instrument on its tick (O(1); the slot is created on the first tick, so prices are known pre-trade)."""
+        self._remark(self._slot(isin), price)
+
+    def apply_fill(self, isin: str, transaction_type: str, quantity: int, price: float):
+        """Book a (partial) fill: average cost on increases, realized PnL on reductions."""
+        i = self._slot(isin)
+        # aggregates are shifted relative to the current mark, so take the position out first...
+        last_price = float(self.last_price[i]) or price
+        self._remark(i, last_price)
+        position = float(self.quantity[i])
+        avg_cost = float(self.avg_cost[i])
+        signed = quantity if transaction_type == 'BUY' else -quantity
+        exposure = position * last_price
+
+        if position == 0 or (position > 0) == (signed > 0):
+            avg_cost = (abs(position) * avg_cost + quantity * price) / (abs(position) + quantity)
+        else:
+            closed = min(quantity, abs(position))
+            realized = closed * (price - avg_cost) * (1 if position > 0 else -1)
+            self.realized[i] += realized
+            self.total_realized += realized
+            if quantity > abs(position): # reversed through zero...
+                avg_cost = price
+        new_position = position + signed
+        self.quantity[i] = new_position
+        self.avg_cost[i] = avg_cost if new_position else 0.0
+        # exposure of the new quantity at the same mark...
+        new_exposure = new_position * last_price
+        self.net_exposure += new_exposure - exposure
+        self.gross_exposure += abs(new_exposure) - abs(exposure)
+        self._remark(i, last_price)
+
+    def on_order_update(self, order: dict):
+        """`OrderUpdateHub` listener: book the newly filled quantity of the order (if any)."""
+        order_id = order.get('order_id')
+        filled_quantity = order.get('filled_quantity') or 0
+        if not order_id or not filled_quantity:
+            return
+        seen_quantity, seen_value = self._fills.get(order_id, (0, 0.0))
+        if filled_quantity <= seen_quantity:
+            return # already booked (updates are delivered by the stream & the poller)...
+        value = filled_quantity * (order.get('average_price') or order.get('price') or 0)
+        delta = filled_quantity - seen_quantity
+        price = (value - seen_value) / delta
+        self._fills[order_id] = (filled_quantity, value)
+        isin = order.get('isin') or order.get('instrument_token', '').split('|')[-1]
+        self.apply_fill(isin, order.get('transaction_type'), delta, price)
+
+    def get_position(self, isin: str) -> Optional[dict]:
+        i = self.slots.get(isin)
+        if i is None:
+            return None
+        return {
+            "isin": isin,
+            "quantity": int(self.quantity[i]),
+            "avg_cost": float(self.avg_cost[i]),
+            "last_price": float(self.last_price[i]),
+            "realized_pnl": float(self.realized[i]),
+            "unrealized_pnl": float(self.unrealized[i]),
+            "exposure": float(self.quantity[i] * self.last_price[i]),
+        }
+
+    def get_summary(self) -> dict:
+        n = len(self.isins)
+        return {
+            "positions": int(np.count_nonzero(self.quantity[:n])),
+            "realized_pnl": self.total_realized,
+            "unrealized_pnl": self.total_unrealized,
+            "total_pnl": self.total_realized + self.total_unrealized,
+            "gross_exposure": self.gross_exposure,
+            "net_exposure": self.net_exposure,
+        }
+
+    def get_positions(self) -> Dict[str, dict]:
+        return {isin: self.get_position(isin) for isin in self.isins}
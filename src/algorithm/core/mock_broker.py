@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+from src.algorithm import get_logger
+from src.algorithm.models.ltpc import LTPC
+
+
+class MatchingEngine:
+    """Order book of the mock broker: fills MARKET orders at the last price & LIMIT orders once the price crosses them.
+
+    :param fill_latency: Seconds between acceptance and a MARKET fill.
+    :param reject_rate: Probability of rejecting an accepted order.
+    :param default_price: Price of instruments without any tick yet.
+    """
+
+    def __init__(self, fill_latency: float = 0.0, reject_rate: float = 0.0, default_price: float = 100.0, seed: int = None):
+        self.fill_latency = fill_latency
+        self.reject_rate = reject_rate
+        self.default_price = default_price
+        self.orders: Dict[str, dict] = {}
+        self.last_price: Dict[str, float] = {}
+        self.listeners: Set[asyncio.Queue] = set() # order update subscribers (portfolio stream)
+        self._ids = itertools.count(1)
+        self._rng = random.Random(seed)
+
+    def _publish(self, order: dict):
+        update = {"update_type": "order", **order}
+        for queue in self.listeners:
+            queue.put_nowait(update)
+
+    def place(self, payload: dict) -> dict:
+        """Accept an order (Upstox place payload) and match it against the current price."""
+        instrument_token = payload["instrument_token"]
+        order_id = f"MOCK-{datetime.now():%y%m%d}-{next(self._ids):06d}"
+        order = {
+            "order_id": order_id,
+            "instrument_token": instrument_token,
+            "trading_symbol": instrument_token.split("|")[-1],
+            "exchange": instrument_token.split("_")[0],
+            "product": payload.get("product", "I"),
+            "order_type": payload["order_type"],
+            "transaction_type": payload["transaction_type"],
+            "validity": payload.get("validity", "DAY"),
+            "quantity": payload["quantity"],
+            "price": payload.get("price") or 0,
+            "average_price": 0,
+            "filled_quantity": 0,
+            "pending_quantity": payload["quantity"],
+            "status": "open",
+            "status_message": None,
+            "tag": payload.get("tag"),
+            "order_timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.orders[order_id] = order
+        if self._rng.random() < self.reject_rate:
+            order.update(status="rejected", status_message="Simulated rejection by the mock broker")
+        elif order["order_type"] == "MARKET" and self.fill_latency > 0:
+            asyncio.get_running_loop().call_later(self.fill_latency, self._match, order)
+        else:
+            self._match(order)
+        self._publish(order)
+        return order
+
+    def cancel(self, order_id: str) -> Optional[dict]:
+        """Cancel an open order (None if unknown / not open)."""
+        order = self.orders.get(order_id)
+        if order is None or order["status"] != "open":
+            return None
+        order.update(status="cancelled")
+        self._publish(order)
+        return order
+
+    def on_price(self, instrument_token: str, price: float):
+        """Match resting orders of the instrument against a new tick."""
+        self.last_price[instrument_token] = price
+        for order in self.orders.values():
+            if order["instrument_token"] == instrument_token and order["status"] == "open":
+                self._match(order)
+
+    def _match(self, order: dict):
+        if order["status"] != "open":
+            return
+        price = self.last_price.setdefault(order["instrument_token"], self.default_price)
+        if order["order_type"] == "MARKET":
+            fill_price = price
+        elif order["transaction_type"] == "SELL" and price >= order["price"]:
+            fill_price = order["price"]
+        elif order["transaction_type"] == "BUY" and price <= order["price"]:
+            fill_price = order["price"]
+        else:
+            if order["validity"] == "IOC":
+                order.update(status="cancelled", status_message="IOC order not marketable")
+                self._publish(order)
+            return
+        order.update(status="complete", filled_quantity=order["quantity"], pending_quantity=0, average_price=fill_price)
+        self._publish(order)
+
+    async def random_walk(self, instrument_tokens: Iterable[str], sigma: float = 0.0005, interval: float = 0.1):
+        """Synthetic price stream: geometric random walk of every instrument every `interval` seconds."""
+        instrument_tokens = list(instrument_tokens)
+        while True:
+            for token in instrument_tokens or list(self.last_price):
+                price = self.last_price.get(token, self.default_price)
+                self.on_price(token, round(price * (1 + self._rng.gauss(0, sigma)), 2))
+            await asyncio.sleep(interval)
+
+    async def replay(self, ticks: Iterable[Tuple[str, LTPC]], speed: float = 1.0):
+        """Replayed price stream: (isin, LTPC) ticks paced by their ltt (speed x real time, 0 = as fast as possible)."""
+        previous = None
+        for isin, tick in ticks:
+            if previous is not None and speed > 0:
+                await asyncio.sleep(max(0.0, (tick.ltt - previous).total_seconds() / speed))
+            previous = tick.ltt
+            self.on_price(f"NSE_EQ|{isin}", tick.ltp)
+
+
+class MockBroker:
+    """Local stand-in of the upstox order endpoints used by `ORDER_MANAGER` (aiohttp web app).
+
+    Endpoints: place (single & multi), details, order book, cancel & the portfolio stream (authorize + websocket).
+    Point the order manager at it with `ORDER_MANAGER(access_token, base_url=broker.url)` / `BROKER_URL` env.
+
+    :param engine: Matching engine (fills, rejections).
+    :param ack_latency: Seconds before every response.
+    :param rate_limits: {endpoint class: requests per second} -> HTTP 429 beyond it (like upstox).
+    """
+
+    def __init__(self,
+                 engine: MatchingEngine = None,
+                 ack_latency: float = 0.0,
+                 rate_limits: Dict[str, int] = None,
+                 host: str = "127.0.0.1",
+                 port: int = 8081):
+        self.engine = engine or MatchingEngine()
+        self.ack_latency = ack_latency
+        self.rate_limits = rate_limits if rate_limits is not None else {"place": 50, "cancel": 50, "fetch": 100}
+        self.host = host
+        self.port = port
+        self.requests: Dict[str, Deque[float]] = {}
+        self.throttled = 0
+        self.logger = get_logger(__name__)
+        self._runner: Optional[web.AppRunner] = None
+        self._sockets: Set[web.WebSocketResponse] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("HEAD", "/", self.handle_ping)
+        app.router.add_post("/v3/order/place", self.handle_place)
+        app.router.add_post("/v2/order/multi/place", self.handle_multi_place)
+        app.router.add_get("/v2/order/details", self.handle_details)
+        app.router.add_get("/v2/order/retrieve-all", self.handle_order_book)
+        app.router.add_delete("/v3/order/cancel", self.handle_cancel)
+        app.router.add_get("/v2/feed/portfolio-stream-feed/authorize", self.handle_authorize)
+        app.router.add_get("/v2/feed/portfolio-stream-feed", self.handle_portfolio_stream)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"Mock broker listening on {self.url}")
+
+    async def stop(self):
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ---------------- helpers ----------------
+    @staticmethod
+    def _error(message: str, code: str, status: int) -> web.Response:
+        return web.json_response({"status": "error", "errors": [{"errorCode": code, "message": message}]}, status=status)
+
+    async def _admit(self, endpoint: str) -> Optional[web.Response]:
+        """Apply the rate limit & the acknowledgement latency (returns the 429 response when throttled)."""
+        limit = self.rate_limits.get(endpoint)
+        if limit:
+            window = self.requests.setdefault(endpoint, deque())
+            now = time.monotonic()
+            while window and now - window[0] >= 1:
+                window.popleft()
+            if len(window) >= limit:
+                self.throttled += 1
+                return self._error("Too Many Request Sent", "UDAPI10005", 429)
+            window.append(now)
+        if self.ack_latency > 0:
+            await asyncio.sleep(self.ack_latency)
+        return None
+
+    # ---------------- handlers ----------------
+    async def handle_ping(self, request: web.Request) -> web.Response:
+        return web.Response()
+
+    async def handle_place(self, request: web.Request) -> web.Response:
+        throttled = await self._admit("place")
+        if throttled:
+            return throttled
+        order = self.engine.place(await request.json())
+        return web.json_response({"status": "success", "data": {"order_ids": [order["order_id"]]}})
+
+    async def handle_multi_place(self, request: web.Request) -> web.Response:
+        throttled = await self._admit("place")
+        if throttled:
+            return throttled
+        data = [
+            {"correlation_id": payload.get("correlation_id"), "order_id": self.engine.place(payload)["order_id"]}
+            for payload in await request.json()
+        ]
+        return web.json_response({"status": "success", "data": data})
+
+    async def handle_details(self, request: web.Request) -> web.Response:
+        throttled = await self._admit("fetch")
+        if throttled:
+            return throttled
+        order = self.engine.orders.get(request.query.get("order_id"))
+        if order is None:
+            return self._error("Order not found", "UDAPI100010", 400)
+        return web.json_response({"status": "success", "data": order})
+
+    async def handle_order_book(self, request: web.Request) -> web.Response:
+        throttled = await self._admit("fetch")
+        if throttled:
+            return throttled
+        return web.json_response({"status": "success", "data": list(self.engine.orders.values())})
+
+    async def handle_cancel(self, request: web.Request) -> web.Response:
+        throttled = await self._admit("cancel")
+        if throttled:
+            return throttled
+        order = self.engine.cancel(request.query.get("order_id"))
+        if order is None:
+            return self._error("Order is not open", "UDAPI100040", 400)
+        return web.json_response({"status": "success", "data": {"order_ids": [order["order_id"]]}})
+
+    async def handle_authorize(self, request: web.Request) -> web.Response:
+        ws_url = f"ws://{self.host}:{self.port}/v2/feed/portfolio-stream-feed"
+        return web.json_response({"status": "success", "data": {"authorized_redirect_uri": ws_url}})
+
+    async def handle_portfolio_stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            while True:
+                await ws.send_str(json.dumps(await queue.get()))
+
+        self.engine.listeners.add(queue)
+        self._sockets.add(ws)
+        sender = asyncio.create_task(pump())
+        try:
+            async for _ in ws: # until the client disconnects...
+                pass
+        finally:
+            sender.cancel()
+            self.engine.listeners.discard(queue)
+            self._sockets.discard(ws)
+        return ws
+
+
+async def run_load_test(order_manager, n_stocks: int = 100, quantity: int = 10) -> Dict[str, float]:
+    """Drive `n_stocks` simultaneous BUY -> fill -> target ladder -> cancel & flatten order flows through `order_manager`.
+
+    :return: Signal-to-fill latency percentiles (ms) & throughput.
+    """
+    async def flow(i: int) -> float:
+        isin = f"MOCK{i:08d}"
+        started = time.perf_counter()
+        buy_id = await order_manager.place_new_intraday_order(isin, quantity, "BUY", "MARKET", validity="DAY", tag=f"LT-BUY-{i}")
+        await order_manager.wait_for_order(buy_id)
+        filled_ms = (time.perf_counter() - started) * 1000
+        legs = await order_manager.place_multi_intraday_orders([
+            dict(ISIN=isin, net_quantity=quantity // 2, transaction_type="SELL", order_type="LIMIT", price=1e6, validity="DAY", tag=f"LT-T1-{i}"),
+            dict(ISIN=isin, net_quantity=quantity - quantity // 2, transaction_type="SELL", order_type="LIMIT", price=1e6, validity="DAY", tag=f"LT-T2-{i}"),
+        ])
+        await asyncio.gather(*(order_manager.cancel_orders(order_id) for order_id, _ in legs if order_id), return_exceptions=True)
+        sell_id = await order_manager.place_new_intraday_order(isin, quantity, "SELL", "MARKET", validity="DAY", tag=f"LT-SL-{i}")
+        await order_manager.wait_for_order(sell_id)
+        return filled_ms
+
+    # order updates: push stream first, batched poller as fallback...
+    tasks = [asyncio.create_task(order_manager.order_update_stream.run()), asyncio.create_task(order_manager.status_poller.run())]
+    try:
+        for _ in range(50):
+            if order_manager.order_updates.connected:
+                break
+            await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(flow(i) for i in range(n_stocks))))
+        elapsed = time.perf_counter() - started
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "stocks": n_stocks,
+        "elapsed": elapsed,
+        "fill_p50_ms": latencies[len(latencies) // 2],
+        "fill_p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "fill_max_ms": latencies[-1],
+        "flows_per_sec": n_stocks / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+async def _serve(args):
+    broker = MockBroker(
+        engine=MatchingEngine(fill_latency=args.fill_latency, reject_rate=args.reject_rate, seed=args.seed),
+        ack_latency=args.ack_latency,
+        host=args.host,
+        port=args.port,
+    )
+    await broker.start()
+    await broker.engine.random_walk([], sigma=args.sigma, interval=args.tick_interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock broker (upstox order endpoints) with a matching engine.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--ack-latency", type=float, default=0.005, help="seconds before every response")
+    parser.add_argument("--fill-latency", type=float, default=0.02, help="seconds between acceptance & MARKET fill")
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    parser.add_argument("--sigma", type=float, default=0.0005, help="random walk volatility per tick")
+    parser.add_argument("--tick-interval", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=None)
+    asyncio.run(_serve(parser.parse_args()))
@@ -1,49 +1,313 @@
 import json
+import time
 import aiohttp
 import asyncio
-from typing import Literal, Optional
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Literal, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlsplit
 
 from src.algorithm import get_logger
+from src.algorithm.utils import clock
 from src.algorithm.core.order_placement_queue import OrderPlacementQueue
+from src.algorithm.core.rate_limiter import RateLimiter, PRIORITY_EXIT, PRIORITY_ENTRY, PRIORITY_TARGET
+from src.algorithm.core.order_updates import OrderUpdateHub, UpstoxOrderUpdateStream, TERMINAL_STATUSES
+from src.algorithm.core.order_status_poller import OrderStatusPoller
+from src.algorithm.core.risk_gate import RiskGate, RiskRejected
+
+
+NO_RESPONSE = (None, "No response for this leg")
+
+
+class OrderNotPlaced(Exception):
+    """The broker definitively didn't accept the order (error response / connection never established): a retry isn't a duplicate."""
+
+
+class OrderStateUnknown(Exception):
+    """The order reached no final state within the wait timeout (still open at the broker or its status unavailable)."""
+
+    def __init__(self, order_id: str, order: Optional[dict] = None):
+        self.order_id = order_id
+        self.order = order or {} # last known state (may be partially filled)
+        super().__init__(f"Order {order_id} has no final state (last known status: {self.order.get('status', 'unknown')})")
 
 
 class ORDER_MANAGER:
     """Manages order placement, fetching and cancellation using upstox API."""
 
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, base_url: str = None):
         """
         Initialize the order manager with an access token for auth...
 
         :param access_token: Upstox API access token.
+        :param base_url: [Optional] Replaces both upstox hosts, e.g. the local mock broker ('http://127.0.0.1:8081').
         """
         
-        self.order_place_url = 'https://api-hft.upstox.com/v3/order/place'
-        self.order_fetch_url = 'https://api.upstox.com/v2/order/details'
-        self.order_cancel_url = 'https://api.upstox.com/v3/order/cancel'
+        api_url = base_url.rstrip('/') if base_url else 'https://api.upstox.com'
+        hft_url = base_url.rstrip('/') if base_url else 'https://api-hft.upstox.com'
+        self.order_place_url = f'{hft_url}/v3/order/place'
+        self.multi_order_place_url = f'{hft_url}/v2/order/multi/place'
+        self.order_fetch_url = f'{api_url}/v2/order/details'
+        self.order_book_url = f'{api_url}/v2/order/retrieve-all'
+        self.order_cancel_url = f'{api_url}/v3/order/cancel'
+        self.portfolio_stream_authorize_url = f'{api_url}/v2/feed/portfolio-stream-feed/authorize'
         self.headers = {
             'Content-Type': 'application/json',
             'Accept': 'application/json',
             'Authorization': f"Bearer {access_token}"
         }
         self.order_history = []
+        self.order_quantities: Dict[str, int] = {} # order_id -> quantity sent (after risk clipping)
         self.logger = get_logger(__name__)
-        self.order_queue = OrderPlacementQueue(self)
+        self.rate_limiter = RateLimiter() # token buckets per endpoint class (place / modify / cancel / fetch)
+        self.order_queue = OrderPlacementQueue(self, self.rate_limiter)
+        # Push based order updates (portfolio stream) resolving per-order futures...
+        self.order_updates = OrderUpdateHub()
+        self.order_update_stream = UpstoxOrderUpdateStream(self, self.order_updates)
+        # ...with one shared, batched order status poller as fallback (all the ISINs' open orders per order book fetch)
+        self.status_poller = OrderStatusPoller(self, self.order_updates)
+        self.risk_gate: Optional[RiskGate] = None # pre-trade risk checks (set by StockManager, see `attach_risk_gate`)
+        self.order_wait_timeout = 60.0 # seconds `wait_for_order` waits for a final update before fetching the order
+        # One long-lived keep-alive session per host (no TCP/TLS handshake per order or status poll)...
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.request_timeout = aiohttp.ClientTimeout(total=10, connect=3)
+        self.latency: Dict[str, Deque[float]] = {} # endpoint -> recent request latencies (ms)
+        self.latency_window = 1000
+
+    def _get_session(self, url: str) -> aiohttp.ClientSession:
+        """Pooled session of the url's host (created lazily inside the running event loop)."""
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=20,
+                ttl_dns_cache=300,        # seconds
+                keepalive_timeout=60,     # seconds
+            )
+            session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.request_timeout)
+            self._sessions[host] = session
+        return session
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs) -> dict:
+        """Send a request over the host's pooled session and record its latency.
+
+        :param endpoint: Metric name (e.g., 'place', 'fetch', 'cancel').
+        """
+        session = self._get_session(url)
+        started = time.perf_counter()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                return await response.json()
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.latency.setdefault(endpoint, deque(maxlen=self.latency_window)).append(elapsed_ms)
+
+    def get_latency_stats(self) -> Dict[str, dict]:
+        """Per endpoint latency summary (ms) over the recent requests."""
+        stats = {}
+        for endpoint, samples in self.latency.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            stats[endpoint] = {
+                "count": len(ordered),
+                "mean": sum(ordered) / len(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+                "max": ordered[-1],
+            }
+        return stats
+
+    async def prewarm(self):
+        """Open (or refresh) the pooled connections of every order host, e.g. before market open."""
+        for url in (self.order_place_url, self.order_fetch_url, self.order_cancel_url):
+            parts = urlsplit(url)
+            try:
+                async with self._get_session(url).head(f"{parts.scheme}://{parts.netloc}/") as response:
+                    await response.read()
+            except Exception as e:
+                self.logger.warning(f"Failed to pre-warm connection to {parts.netloc}: {e}")
+        self.logger.info(f"Pre-warmed order connections: {list(self._sessions)}")
+
+    async def keep_warm(self, interval: float = 30):
+        """Periodically pre-warm so idle pooled connections aren't dropped between orders."""
+        while True:
+            await self.prewarm()
+            await clock.sleep(interval)
+
+    async def close(self):
+        """Close every pooled session (graceful shutdown)."""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
     
     async def _place_order_direct(self, payload: dict) -> str:
-        """Directly place an order via the API (used by OrderPlacementQueue)."""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.order_place_url, headers=self.headers, json=payload) as response:
-                response_json = await response.json()
-                self.logger.info(f"Place order response: {response_json}")
-                if response_json.get('status') == 'success':
-                    order_id = response_json['data']['order_ids'][0]
-                    self.order_history.append(order_id)
-                    return order_id
-                else:
-                    raise Exception(f"Failed to place order: {response_json}")
+        """Directly place an order via the API (used by OrderPlacementQueue).
+
+        :raises OrderNotPlaced: On an error response / if the connection couldn't be established.
+        :raises Exception: Any other failure (e.g. timeout): the order may have been accepted.
+        """
+        try:
+            response_json = await self._request('place', 'POST', self.order_place_url, json=payload)
+        except aiohttp.ClientConnectorError as e:
+            raise OrderNotPlaced(f"Failed to place order (not sent): {e}") from e
+        self.logger.info(f"Place order response: {response_json}")
+        if response_json.get('status') == 'success':
+            order_id = response_json['data']['order_ids'][0]
+            self.order_history.append(order_id)
+            self.order_quantities[order_id] = payload['quantity']
+            self.status_poller.track(order_id)
+            return order_id
+        else:
+            raise OrderNotPlaced(f"Failed to place order: {response_json}")
             
     
+    def _build_payload(self,
+                       ISIN: str,
+                       net_quantity: int,
+                       transaction_type: str,
+                       order_type: str,
+                       price: Optional[float] = None,
+                       validity: str = 'IOC',
+                       stock_type: str = 'NSE',
+                       index_type: str = 'EQ',
+                       tag: str = None) -> dict:
+        """Validate the order parameters & build the intraday order payload (see `place_new_intraday_order`)."""
+        if net_quantity < 1:
+            raise ValueError("net_quantity must be at least 1.")
+        if order_type == 'LIMIT' and price is None:
+            raise ValueError("price must be provided for LIMIT orders.")
+        if order_type == 'MARKET':
+            price = 0
+            
+        if tag is None:
+            tag = f"{ISIN}-{clock.now().strftime('%Y-%m-%dT%H:%M:%S')}"
+            
+
+        instrument_token = f"{stock_type}_{index_type}|{ISIN}"
+        
+        return {
+            'quantity': net_quantity,
+            'product': 'I',  # Intraday product
+            'validity': validity,
+            'price': price,
+            'tag': tag,
+            'instrument_token': instrument_token,
+            'order_type': order_type,
+            'transaction_type': transaction_type,
+            'disclosed_quantity': 0,
+            'trigger_price': 0,
+            'is_amo': False,  # After Market Order flag
+            'slice': True
+        }
+
+    def attach_risk_gate(self, risk_gate: RiskGate):
+        """Check every order with the risk gate before it's queued (its reservations follow the order updates)."""
+        self.risk_gate = risk_gate
+        self.order_updates.subscribe(risk_gate.on_order_update)
+
+    def _risk_check(self, ISIN: str, transaction_type: str, net_quantity: int, price: Optional[float]) -> int:
+        """Approved (possibly clipped) quantity of the order.
+
+        :raises RiskRejected: If the risk gate rejects the order.
+        """
+        if self.risk_gate is None:
+            return net_quantity
+        approved, reason = self.risk_gate.check(ISIN, transaction_type, net_quantity, price)
+        if not approved:
+            raise RiskRejected(reason, f"{transaction_type} {net_quantity} shares of {ISIN} rejected by the risk gate.")
+        if approved != net_quantity:
+            self.logger.warning(f"[Risk] {transaction_type} {ISIN} clipped from {net_quantity} to {approved} shares ({reason}).")
+        return approved
+
+    def _risk_settle(self, ISIN: str, transaction_type: str, quantity: int, order_id: Optional[str]):
+        """Bind the approved quantity to the placed order, or release it if the order wasn't placed."""
+        if self.risk_gate is None:
+            return
+        if order_id is None:
+            self.risk_gate.release(ISIN, transaction_type, quantity)
+        else:
+            self.risk_gate.bind(order_id, ISIN, transaction_type, quantity, self.order_updates.get(order_id))
+
+    @staticmethod
+    def _default_priority(transaction_type: str, order_type: str) -> int:
+        if transaction_type == 'SELL':
+            return PRIORITY_EXIT if order_type == 'MARKET' else PRIORITY_TARGET
+        return PRIORITY_ENTRY
+
+    async def place_multi_intraday_orders(self, orders: List[dict]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Place several intraday orders at once (e.g. the T1-T4 profit target ladder).
+
+        Uses the multi-order endpoint (one request, one 'place' token). Only if that request definitively failed (no
+        connection / error response) are the legs submitted concurrently through the rate limiter instead; when its
+        outcome is unknown (timeout, lost response, legs missing from the response) the legs are looked up in the order
+        book by tag (`reconcile_by_tag`) and never re-sent.
+
+        :param orders: Keyword arguments of `place_new_intraday_order` per leg.
+        :return: (order_id, None) or (None, error message) per leg, in order.
+        """
+        if not orders:
+            return []
+        legs: List[Tuple[Optional[str], Optional[str]]] = [NO_RESPONSE] * len(orders)
+        payloads = []
+        for i, order in enumerate(orders):
+            payload = self._build_payload(**{key: value for key, value in order.items() if key != 'priority'})
+            try:
+                payload['quantity'] = self._risk_check(order['ISIN'], order['transaction_type'], payload['quantity'], order.get('price'))
+            except RiskRejected as e:
+                legs[i] = (None, str(e))
+                continue
+            payloads.append({**payload, 'correlation_id': str(i)})
+        if not payloads:
+            return legs
+        priority = min(order.get('priority', self._default_priority(order['transaction_type'], order['order_type'])) for order in orders)
+
+        try:
+            async with self.rate_limiter.limit('place', priority=priority):
+                response_json = await self._request('place', 'POST', self.multi_order_place_url, json=payloads)
+            self.logger.info(f"Multi order response: {response_json}")
+        except aiohttp.ClientConnectorError as e:
+            self.logger.warning(f"Multi order request not sent ({e}), placing {len(payloads)} legs concurrently.")
+            response_json = None
+        except Exception as e:
+            # The batch may have been accepted (e.g. timed out after reaching the broker): reconciled below...
+            self.logger.warning(f"Multi order request outcome unknown ({e!r}), reconciling {len(payloads)} legs with the order book.")
+            response_json = {}
+
+        if response_json is None or response_json.get('status') == 'error':
+            indices = [int(payload['correlation_id']) for payload in payloads]
+            for i, payload in zip(indices, payloads):
+                self._risk_settle(orders[i]['ISIN'], orders[i]['transaction_type'], payload['quantity'], None) # re-checked per leg...
+            results = await asyncio.gather(*(self.place_new_intraday_order(**{**orders[i], 'net_quantity': payload['quantity']}) for i, payload in zip(indices, payloads)), return_exceptions=True)
+            for i, result in zip(indices, results):
+                legs[i] = (None, str(result)) if isinstance(result, Exception) else (result, None)
+            return legs
+
+        sent = {int(payload['correlation_id']): payload['quantity'] for payload in payloads}
+        for item in response_json.get('data') or []:
+            i = int(item['correlation_id'])
+            legs[i] = (item['order_id'], None)
+            self.order_history.append(item['order_id'])
+            self.order_quantities[item['order_id']] = sent[i]
+            self.status_poller.track(item['order_id'])
+        for error in response_json.get('errors') or []:
+            if error.get('correlation_id') is not None:
+                legs[int(error['correlation_id'])] = (None, error.get('message'))
+        unknown = {payload['tag']: int(payload['correlation_id']) for payload in payloads if legs[int(payload['correlation_id'])] == NO_RESPONSE}
+        if unknown:
+            try:
+                found = await self.reconcile_by_tag(unknown)
+            except Exception as e:
+                self.logger.error(f"Outcome of legs {list(unknown)} unknown: {e}")
+                found = {}
+            for tag, i in unknown.items():
+                legs[i] = (found[tag]['order_id'], None) if tag in found else (None, "Not accepted by the broker (not in the order book)")
+        for payload in payloads:
+            i = int(payload['correlation_id'])
+            self._risk_settle(orders[i]['ISIN'], orders[i]['transaction_type'], payload['quantity'], legs[i][0])
+        return legs
+    
     async def place_new_intraday_order(self,
                                        ISIN: str,
                                        net_quantity: int, 
@@ -53,7 +317,8 @@ class ORDER_MANAGER:
                                        validity: Literal['IOC', 'DAY'] = 'IOC',
                                        stock_type: Literal['NSE', 'BSE'] = 'NSE',
                                        index_type: Literal['EQ', 'FO'] = 'EQ',
-                                       tag: str = None
+                                       tag: str = None,
+                                       priority: Optional[int] = None
                                        ) -> str:
 
         """Place a new intraday order (BUY / SELL)
@@ -67,44 +332,34 @@ class ORDER_MANAGER:
         :param stock_type: 'NSE' or 'BSE' (default: 'NSE').
         :param index_type: 'EQ' (Equity) or 'FO' (Futures & Options, default: 'EQ').
         :param tag: [Optional] Order tag to identify the order type / Datetime tag by default.
-        :return: Order ID of the placed order.
+        :param priority: [Optional] Rate limiter lane; by default MARKET SELLs are exits, LIMIT SELLs profit targets & BUYs entries.
+        :return: Order ID of the placed order (its quantity may be clipped by the risk gate).
         :raises ValueError: If parameters are invalid.
-        :raises Exception: If the order placement fails.
+        :raises RiskRejected: If the pre-trade risk gate rejects the order.
+        :raises OrderNotPlaced: If the broker didn't accept the order.
+        :raises Exception: If the order placement fails otherwise (e.g. timeout: its outcome is unknown, see `reconcile_by_tag`).
         """
 
-        if net_quantity < 1:
-            raise ValueError("net_quantity must be at least 1.")
-        if order_type == 'LIMIT' and price is None:
-            raise ValueError("price must be provided for LIMIT orders.")
-        if order_type == 'MARKET':
-            price = 0
-            
-        if tag is None:
-            f"{ISIN}-{datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}"
-            
-
-        instrument_token = f"{stock_type}_{index_type}|{ISIN}"
+        payload = self._build_payload(ISIN, net_quantity, transaction_type, order_type, price, validity, stock_type, index_type, tag)
         
-        payload = {
-            'quantity': net_quantity,
-            'product': 'I',  # Intraday product
-            'validity': validity,
-            'price': price,
-            'tag': tag,
-            'instrument_token': instrument_token,
-            'order_type': order_type,
-            'transaction_type': transaction_type,
-            'disclosed_quantity': 0,
-            'trigger_price': 0,
-            'is_amo': False,  # After Market Order flag
-            'slice': True
-        }
+        if priority is None:
+            priority = self._default_priority(transaction_type, order_type)
         
         try:
-            return await self.order_queue.place_order(payload)
+            payload['quantity'] = self._risk_check(ISIN, transaction_type, net_quantity, price)
+        except RiskRejected as e:
+            self.logger.warning(f"Order for {ISIN} not placed: {e}")
+            raise
+        
+        order_id = None
+        try:
+            order_id = await self.order_queue.place_order(payload, priority=priority)
+            return order_id
         except Exception as e:
             self.logger.error(f"Error placing order for {ISIN}: {e}")
             raise
+        finally:
+            self._risk_settle(ISIN, transaction_type, payload['quantity'], order_id)
 
 
         
@@ -118,17 +373,81 @@ class ORDER_MANAGER:
         
         params = { 'order_id' : order_id}
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.order_fetch_url, headers= self.headers, params=params) as response:
-                response_json = await response.json()
-                if response_json['status'] != 'success':  
-                    stock_name = response_json['data']['trading_symbol']
-                    order_status = response_json['data']['status']
-                    order_tag = response_json['data']['tag']
-                    self.logger.info(f"Order details for ordre_id: {order_id} & tag: {order_tag} | {stock_name} : {order_status} | {response_json['data']['quantity']} shares")
-                else:
-                    self.logger.info(f"Failed to fetch order {order_id}: {response_json}")
-                return response_json
+        async with self.rate_limiter.limit('fetch'):
+            response_json = await self._request('fetch', 'GET', self.order_fetch_url, params=params)
+        if response_json.get('status') == 'success':  
+            stock_name = response_json['data']['trading_symbol']
+            order_status = response_json['data']['status']
+            order_tag = response_json['data']['tag']
+            self.logger.info(f"Order details for ordre_id: {order_id} & tag: {order_tag} | {stock_name} : {order_status} | {response_json['data']['quantity']} shares")
+        else:
+            self.logger.info(f"Failed to fetch order {order_id}: {response_json}")
+        return response_json
+            
+    async def get_order_book(self) -> dict:
+        """
+        Fetch all the orders of the day (one call for every tracked order of the status poller).
+
+        :return: Dictionery containing the list of orders ('data').
+        """
+        async with self.rate_limiter.limit('fetch'):
+            return await self._request('fetch', 'GET', self.order_book_url)
+
+    async def reconcile_by_tag(self, tags: Iterable[str]) -> Dict[str, dict]:
+        """Find orders of unknown outcome (request timed out / response lost) in the order book by their tag.
+
+        Only orders whose id isn't known yet (not in `order_history`, seeded from the order book on restart) match, so
+        earlier orders sharing a tag (a retried leg) are ignored.
+        Found orders are adopted like placed ones (order history, status poller & order update cache).
+
+        :param tags: Tags of the orders to look for.
+        :return: {tag: order} of the orders the broker accepted.
+        :raises Exception: If the order book can't be fetched (the outcome is still unknown).
+        """
+        tags = set(tags)
+        response = await self.get_order_book()
+        if response.get('status') != 'success':
+            raise Exception(f"Failed to fetch the order book: {response}")
+        known = set(self.order_history)
+        found: Dict[str, dict] = {}
+        for order in response.get('data') or []:
+            if order.get('tag') in tags and order.get('order_id') not in known:
+                found[order['tag']] = order
+        for tag, order in found.items():
+            self.logger.warning(f"Order {order['order_id']} ({tag}) found in the order book: it was accepted.")
+            self.order_history.append(order['order_id'])
+            self.order_quantities[order['order_id']] = order.get('quantity')
+            self.status_poller.track(order['order_id'])
+            self.order_updates.publish(order)
+        return found
+
+    async def wait_for_order(self, order_id: str, timeout: float = None) -> dict:
+        """Wait until the order is complete / rejected / cancelled.
+
+        Pushed portfolio stream updates resolve the wait; while the stream is down the shared `status_poller` refreshes
+        the order with its batched order book fetches (no per-order polling). When no final update arrives in time the
+        order is fetched once (REST) before giving up.
+
+        :param order_id: The ID of the order to wait for.
+        :param timeout: Seconds to wait (default `order_wait_timeout`).
+        :return: Dictionery containing order details (same shape as `get_order_details`).
+        :raises OrderStateUnknown: If the order still isn't final (it stays tracked, later updates land in `order_updates`).
+        """
+        self.status_poller.track(order_id)
+        timeout = self.order_wait_timeout if timeout is None else timeout
+        try:
+            return await self.order_updates.wait(order_id, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"No final update of order {order_id} within {timeout}s, fetching it.")
+        try:
+            response = await self.get_order_details(order_id)
+        except Exception as e:
+            response = {'status': 'error', 'errors': str(e)}
+        if response.get('status') == 'success':
+            self.order_updates.publish(response['data'])
+            if response['data'].get('status') in TERMINAL_STATUSES:
+                return response
+        raise OrderStateUnknown(order_id, self.order_updates.get(order_id))
             
     async def cancel_orders(self, order_id: str) -> None:
         """
@@ -140,11 +459,12 @@ class ORDER_MANAGER:
         
         params = {'order_id': order_id}
         
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(self.order_cancel_url, headers=self.headers, params=params) as response:
-                response_json = await response.json()
-                self.logger.info(f"Cancel order response for {order_id}: {response_json}")
+        async with self.rate_limiter.limit('cancel', priority=PRIORITY_EXIT):
+            response_json = await self._request('cancel', 'DELETE', self.order_cancel_url, params=params)
+        self.logger.info(f"Cancel order response for {order_id}: {response_json}")
 
-                if response_json.get('status') != 'success':
-                    raise Exception(f"Failed to cancel order: {response_json}")
+        if response_json.get('status') != 'success':
+            raise Exception(f"Failed to cancel order: {response_json}")
+        if self.risk_gate is not None:
+            self.risk_gate.on_cancel(order_id)
     
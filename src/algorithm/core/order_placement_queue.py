@@ -1,32 +1,27 @@
 import asyncio
 from typing import Dict, Any
 
+from src.algorithm.core.rate_limiter import RateLimiter, PRIORITY_ENTRY
+from src.algorithm.utils.tracing import tracer, current_trace
+
 class OrderPlacementQueue:
+    """Rate limited order placement: orders are sent concurrently within the 'place' token bucket, exits first."""
     
     def __init__(self,
-                 order_manager):
+                 order_manager,
+                 rate_limiter: RateLimiter = None):
         self.order_manager = order_manager
-        self.queue = asyncio.Queue()
-        self.rate_limit_delay = 0.25
-        self._task = asyncio.create_task(self._process_queue())
-
+        self.rate_limiter = rate_limiter or RateLimiter()
 
-    async def place_order(self, payload: Dict[str, Any]) -> str:
-        """Add an order to the queue and wait for its execution."""
-        future = asyncio.Future()
-        await self.queue.put((payload, future))
-        return await future
 
-    async def _process_queue(self):
-        """Process orders with rate limiting (fetching from the queue)."""
-        while True:
-            payload, future = await self.queue.get()
-            try:
-                order_id = await self.order_manager._place_order_direct(payload=payload)
-                future.set_result(order_id)
-            except Exception as e:
-                future.set_exception(e)
-            await asyncio.sleep(self.rate_limit_delay)
+    async def place_order(self, payload: Dict[str, Any], priority: int = PRIORITY_ENTRY) -> str:
+        """Wait for a 'place' token (by priority lane) and place the order."""
+        async with self.rate_limiter.limit("place", priority=priority):
+            trace_id = current_trace.get()
+            tracer.mark(trace_id, "rate_limit")
+            order_id = await self.order_manager._place_order_direct(payload=payload)
+            tracer.mark(trace_id, "ack")
+            return order_id
             
             
             
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Dict
+
+from src.algorithm import get_logger
+from src.algorithm.utils import clock
+from src.algorithm.core.order_updates import OrderUpdateHub, TERMINAL_STATUSES
+
+
+class OrderStatusPoller:
+    """Shared order status service (fallback of the push stream).
+
+    Tracks the open order ids of every ISIN and refreshes all of them with one order book fetch per cycle, publishing the
+    results into the `OrderUpdateHub` (which resolves the waiters' futures). The cycle is adaptive:
+        - `fast_interval` while some order was placed less than `fast_window` seconds ago (MARKET fills, fresh orders).
+        - `slow_interval` once only resting orders (e.g. LIMIT profit targets) are left.
+        - `stream_interval` while the push stream is live (safety net for missed updates).
+    """
+
+    def __init__(self,
+                 order_manager,
+                 hub: OrderUpdateHub,
+                 fast_interval: float = 0.3,
+                 slow_interval: float = 2.0,
+                 fast_window: float = 3.0,
+                 stream_interval: float = 5.0):
+        self.order_manager = order_manager
+        self.hub = hub
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.fast_window = fast_window
+        self.stream_interval = stream_interval
+        self.tracked: Dict[str, float] = {} # order_id -> placed at (clock.monotonic)
+        self.last_poll: float = None
+        self.polls = 0
+        self.logger = get_logger(__name__)
+
+    def track(self, order_id: str):
+        """Start tracking an order until it's complete / rejected / cancelled."""
+        self.tracked.setdefault(order_id, clock.monotonic())
+
+    def untrack(self, order_id: str):
+        self.tracked.pop(order_id, None)
+
+    def next_interval(self) -> float:
+        if self.hub.connected:
+            return self.stream_interval
+        now = clock.monotonic()
+        if any(now - placed_at < self.fast_window for placed_at in self.tracked.values()):
+            return self.fast_interval
+        return self.slow_interval
+
+    async def poll_once(self):
+        """Refresh every tracked order with a single order book call."""
+        self.last_poll = clock.monotonic()
+        self.polls += 1
+        response = await self.order_manager.get_order_book()
+        if response.get('status') != 'success':
+            self.logger.warning(f"Failed to fetch order book: {response}")
+            return
+        for order in response.get('data') or []:
+            order_id = order.get('order_id')
+            if order_id in self.tracked:
+                self.hub.publish(order)
+                if order.get('status') in TERMINAL_STATUSES:
+                    self.tracked.pop(order_id, None)
+
+    async def run(self):
+        """Poll whenever the adaptive interval has elapsed & there are tracked orders."""
+        while True:
+            await clock.sleep(self.fast_interval)
+            if not self.tracked:
+                continue
+            if self.last_poll is not None and clock.monotonic() - self.last_poll < self.next_interval():
+                continue
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Order status poll failed: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            "tracked_orders": len(self.tracked),
+            "polls": self.polls,
+            "interval": self.next_interval(),
+            "push_stream": self.hub.connected,
+        }
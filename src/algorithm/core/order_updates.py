@@ -0,0 +1,128 @@
+import asyncio
+import json
+import socket
+import ssl
+from typing import Callable, Dict, List, Optional
+
+import websockets
+
+from src.algorithm import get_logger
+
+
+TERMINAL_STATUSES = ("complete", "rejected", "cancelled")
+
+
+class OrderUpdateHub:
+    """Latest known state of every order & per-order futures resolved by pushed updates.
+
+    Order handlers `await hub.wait(order_id)` instead of polling `get_order_details`; whoever receives order updates (the
+    portfolio stream, a paper broker, the status poller...) calls `publish(order)`.
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, dict] = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self.connected = False # True while a push stream is live (otherwise callers should fall back to polling)
+        self._listeners: List[Callable[[dict], None]] = []
+        self.logger = get_logger(__name__)
+
+    def subscribe(self, listener: Callable[[dict], None]):
+        """Call `listener(order)` on every published update (e.g. the position ledger booking fills)."""
+        self._listeners.append(listener)
+
+    def publish(self, order: dict):
+        """Store an order update (Upstox order fields) and resolve the order's waiters once it's terminal."""
+        order_id = order.get("order_id")
+        if not order_id:
+            return
+        self.orders[order_id] = order
+        for listener in self._listeners:
+            try:
+                listener(order)
+            except Exception as e:
+                self.logger.error(f"Order update listener failed for {order_id}: {e}")
+        if order.get("status") in TERMINAL_STATUSES:
+            for future in self._waiters.pop(order_id, []):
+                if not future.done():
+                    future.set_result(order)
+
+    def get(self, order_id: str) -> Optional[dict]:
+        return self.orders.get(order_id)
+
+    async def wait(self, order_id: str, timeout: float = None) -> dict:
+        """Wait until the order is complete / rejected / cancelled.
+
+        :return: Response shaped like `ORDER_MANAGER.get_order_details` ({'status': 'success', 'data': order}).
+        :raises asyncio.TimeoutError: If no terminal update arrives within `timeout` seconds.
+        """
+        order = self.orders.get(order_id)
+        if order is None or order.get("status") not in TERMINAL_STATUSES:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(order_id, []).append(future)
+            try:
+                order = await asyncio.wait_for(future, timeout)
+            finally:
+                waiters = self._waiters.get(order_id, [])
+                if future in waiters:
+                    waiters.remove(future)
+        return {"status": "success", "data": dict(order)}
+
+    def forget(self, order_id: str):
+        """Drop a finished order's cached state."""
+        self.orders.pop(order_id, None)
+
+
+class UpstoxOrderUpdateStream:
+    """Single consumer of the Upstox portfolio stream feed (order updates) publishing into an `OrderUpdateHub`."""
+
+    def __init__(self, order_manager, hub: OrderUpdateHub, reconnect_delay: float = 5):
+        """
+        :param order_manager: `ORDER_MANAGER` (its pooled session authorizes the feed).
+        :param hub: Hub receiving the order updates.
+        :param reconnect_delay: Seconds between reconnection attempts.
+        """
+        self.order_manager = order_manager
+        self.hub = hub
+        self.reconnect_delay = reconnect_delay
+        self.logger = get_logger(__name__)
+
+    async def _authorize(self) -> str:
+        response = await self.order_manager._request("fetch", "GET", self.order_manager.portfolio_stream_authorize_url, params={"update_types": "order"})
+        if response.get("status") != "success":
+            raise ValueError(f"Failed to authorize portfolio stream: {response}")
+        return response["data"]["authorized_redirect_uri"]
+
+    async def run(self):
+        """Consume order updates forever (re-authorizing on every reconnection)."""
+        ssl_context = ssl.create_default_context()
+        while True:
+            try:
+                ws_uri = await self._authorize()
+                async with websockets.connect(ws_uri, ssl=ssl_context if ws_uri.startswith("wss") else None) as websocket:
+                    self.hub.connected = True
+                    self.logger.info("Upstox portfolio stream (order updates) connected...")
+                    async for message in websocket:
+                        update = json.loads(message)
+                        if update.get("update_type") == "order":
+                            self.hub.publish(update)
+            except asyncio.CancelledError:
+                raise
+            except (websockets.ConnectionClosed, asyncio.TimeoutError, ConnectionRefusedError, socket.gaierror, OSError, ValueError) as e:
+                self.logger.warning(f"Portfolio stream error: {e}. Reconnecting in {self.reconnect_delay} seconds...")
+            except Exception as e:
+                self.logger.error(f"Unexpected error in portfolio stream: {e}")
+            finally:
+                self.hub.connected = False
+            await asyncio.sleep(self.reconnect_delay)
+
+
+class LocalOrderUpdateStream:
+    """In-process stand-in for the portfolio stream (tests, paper trading & replays)."""
+
+    def __init__(self, hub: OrderUpdateHub):
+        self.hub = hub
+        self.hub.connected = True
+
+    def push(self, order: dict):
+        """Deliver an order update as if it came from the broker's stream."""
+        self.hub.publish(dict(order))
@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple
+
+from src.algorithm.utils import clock
+
+
+# Priority lanes (lower value is served first)...
+PRIORITY_EXIT = 0    # stop-loss / flattening orders
+PRIORITY_ENTRY = 1   # new entries
+PRIORITY_TARGET = 2  # profit target placements
+
+# Endpoint class -> (tokens per second, burst). Upstox allows more; budgets are kept below the broker limits.
+DEFAULT_BUDGETS: Dict[str, Tuple[float, int]] = {
+    "place": (10, 20),
+    "modify": (10, 20),
+    "cancel": (10, 20),
+    "fetch": (20, 40),
+}
+
+
+class TokenBucket:
+    """Classic token bucket: refills `rate` tokens per second up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = clock.monotonic()
+
+    def _refill(self):
+        now = clock.monotonic()
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate) # (clock swaps can go backwards)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_available(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Token-bucket rate limiter with one bucket per endpoint class, in-flight caps & priority lanes.
+
+    Requests run concurrently as long as their endpoint's bucket has tokens and fewer than `max_in_flight` requests of that
+    class are outstanding. Waiting requests are granted strictly by (priority, arrival), so exits jump ahead of entries & targets.
+
+    Usage:
+        async with limiter.limit("place", priority=PRIORITY_EXIT):
+            await send_request()
+    """
+
+    def __init__(self, budgets: Dict[str, Tuple[float, int]] = None, max_in_flight: int = 10):
+        budgets = budgets or DEFAULT_BUDGETS
+        self.buckets: Dict[str, TokenBucket] = {name: TokenBucket(rate, burst) for name, (rate, burst) in budgets.items()}
+        self.max_in_flight = max_in_flight
+        self.in_flight: Dict[str, int] = {name: 0 for name in budgets}
+        self._waiters: Dict[str, List[Tuple[int, int, asyncio.Future]]] = {name: [] for name in budgets}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._counter = itertools.count()
+
+    async def acquire(self, endpoint: str, priority: int = PRIORITY_ENTRY):
+        """Wait for a token of the endpoint's bucket (and an in-flight slot)."""
+        if endpoint not in self.buckets:
+            raise ValueError(f"Unknown endpoint class '{endpoint}'. Available: {list(self.buckets)}")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters[endpoint], (priority, next(self._counter), future))
+        self._dispatch(endpoint)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(endpoint) # granted right before the cancellation...
+            raise
+
+    def release(self, endpoint: str):
+        """Free the in-flight slot taken by `acquire`."""
+        self.in_flight[endpoint] -= 1
+        self._dispatch(endpoint)
+
+    @asynccontextmanager
+    async def limit(self, endpoint: str, priority: int = PRIORITY_ENTRY):
+        await self.acquire(endpoint, priority)
+        try:
+            yield
+        finally:
+            self.release(endpoint)
+
+    def _dispatch(self, endpoint: str):
+        """Grant tokens to the waiters in priority order; schedule a refill wakeup if some have to wait."""
+        waiters = self._waiters[endpoint]
+        bucket = self.buckets[endpoint]
+        while waiters and self.in_flight[endpoint] < self.max_in_flight:
+            if waiters[0][2].done(): # cancelled while waiting...
+                heapq.heappop(waiters)
+                continue
+            if not bucket.try_acquire():
+                self._schedule(endpoint, bucket.time_until_available())
+                return
+            _, _, future = heapq.heappop(waiters)
+            self.in_flight[endpoint] += 1
+            future.set_result(None)
+
+    def _schedule(self, endpoint: str, delay: float):
+        timer = self._timers.get(endpoint)
+        if timer is None or timer.done():
+            self._timers[endpoint] = asyncio.create_task(self._wakeup(endpoint, delay))
+
+    async def _wakeup(self, endpoint: str, delay: float):
+        await clock.sleep(delay)
+        self._timers.pop(endpoint, None)
+        self._dispatch(endpoint)
+
+    def get_stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "tokens": round(bucket.tokens, 3),
+                "rate": bucket.rate,
+                "burst": bucket.burst,
+                "in_flight": self.in_flight[name],
+                "waiting": sum(not future.done() for _, _, future in self._waiters[name]),
+            }
+            for name, bucket in self.buckets.items()
+        }
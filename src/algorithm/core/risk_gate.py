@@ -0,0 +1,198 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from src.algorithm import get_logger
+from src.algorithm.utils import clock
+from src.algorithm.models.risk import RiskLimits
+from src.algorithm.core.ledger import PositionLedger
+from src.algorithm.core.order_updates import TERMINAL_STATUSES
+
+
+# Reason codes...
+APPROVED = "APPROVED"
+KILL_SWITCH = "KILL_SWITCH"
+DAILY_LOSS = "DAILY_LOSS"
+STOCK_DAILY_LOSS = "STOCK_DAILY_LOSS"
+ORDER_RATE = "ORDER_RATE"
+STOCK_ORDER_RATE = "STOCK_ORDER_RATE"
+MAX_POSITION = "MAX_POSITION"
+MAX_NOTIONAL = "MAX_NOTIONAL"
+MAX_GROSS_EXPOSURE = "MAX_GROSS_EXPOSURE"
+NO_PRICE = "NO_PRICE"
+
+
+class RiskRejected(Exception):
+    """Order rejected by the pre-trade risk gate."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(f"[{reason}] {message}")
+        self.reason = reason
+
+
+class RiskGate:
+    """Constant-time pre-trade risk checks in front of `OrderPlacementQueue`.
+
+    Limits are precomputed once (None -> inf) and every check is a fixed number of dict / array lookups against running
+    counters: the ledger's position & PnL, the quantity of our open orders per ISIN (reserved on approval, released
+    by order updates) and fixed-window order counters.
+
+    Orders reducing the projected position (position + open orders) always pass, even with the kill switch on, so exits
+    are never blocked; the increasing part of an order is clipped to the position / notional / exposure headroom or
+    rejected with a reason code.
+    """
+
+    def __init__(self, ledger: PositionLedger, limits: RiskLimits = None):
+        self.ledger = ledger
+        self.set_limits(limits or RiskLimits())
+        self.killed: Optional[str] = None # kill switch reason
+        self.open_quantity: Dict[str, int] = {} # isin -> signed quantity of our open orders
+        self._orders: Dict[str, Tuple[str, int]] = {} # order_id -> (isin, signed open quantity)
+        self._second, self._second_count = -1, 0
+        self._minutes: Dict[str, List[int]] = {} # isin -> [minute, count]
+        self.approved = 0
+        self.clipped = 0
+        self.rejected: Dict[str, int] = {}
+        self.logger = get_logger(__name__)
+
+    def set_limits(self, limits: RiskLimits):
+        def limit(value):
+            return math.inf if value is None else value
+        self.limits = limits
+        self.max_position = limit(limits.max_position)
+        self.max_notional = limit(limits.max_notional)
+        self.max_gross_exposure = limit(limits.max_gross_exposure)
+        self.max_stock_loss = -limit(limits.max_daily_loss_per_stock)
+        self.max_loss = -limit(limits.max_daily_loss)
+        self.max_orders_per_second = limit(limits.max_orders_per_second)
+        self.max_orders_per_minute = limit(limits.max_orders_per_minute_per_stock)
+        self._needs_price = self.max_notional < math.inf or self.max_gross_exposure < math.inf
+
+    def kill(self, reason: str = "manual"):
+        """Block every order adding exposure (exits still pass)."""
+        if self.killed is None:
+            self.logger.critical(f"Kill switch ON: {reason}")
+        self.killed = reason
+
+    def resume(self):
+        self.killed = None
+        self.logger.warning("Kill switch OFF.")
+
+    def _reject(self, reason: str) -> Tuple[int, str]:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return 0, reason
+
+    def check(self, isin: str, transaction_type: str, quantity: int, price: Optional[float] = None) -> Tuple[int, str]:
+        """Check an order & reserve its approved quantity.
+
+        :param price: Limit price (None / 0 for MARKET orders: the last traded price is used).
+        :return: (approved quantity, reason code): `quantity` & APPROVED, a clipped quantity & the binding limit's code,
+            or 0 & the rejection code.
+        """
+        ledger = self.ledger
+        i = ledger.slots.get(isin)
+        position = int(ledger.quantity[i]) if i is not None else 0
+        projected = position + self.open_quantity.get(isin, 0)
+        signed = quantity if transaction_type == 'BUY' else -quantity
+        # Reducing part (towards flat) always passes; open orders count (cancelled ones are released by `on_cancel`)...
+        reducing = min(quantity, abs(projected)) if projected and (projected > 0) != (signed > 0) else 0
+        increase = quantity - reducing
+        reason = APPROVED
+
+        if increase:
+            now = clock.monotonic()
+            second = int(now)
+            counter = self._minutes.get(isin)
+            if counter is None or counter[0] != second // 60:
+                counter = self._minutes[isin] = [second // 60, 0]
+            if second != self._second:
+                self._second, self._second_count = second, 0
+
+            if self.killed is not None:
+                reason = KILL_SWITCH
+            elif ledger.total_realized + ledger.total_unrealized <= self.max_loss:
+                self.kill(f"daily loss limit ({self.limits.max_daily_loss}) hit")
+                reason = DAILY_LOSS
+            elif i is not None and ledger.realized.item(i) + ledger.unrealized.item(i) <= self.max_stock_loss:
+                reason = STOCK_DAILY_LOSS
+            elif self._second_count >= self.max_orders_per_second:
+                reason = ORDER_RATE
+            elif counter[1] >= self.max_orders_per_minute:
+                reason = STOCK_ORDER_RATE
+            if reason is not APPROVED:
+                if not reducing:
+                    return self._reject(reason)
+                increase = 0
+            else:
+                price = price or (ledger.last_price.item(i) if i is not None else 0.0)
+                held = 0 if reducing else abs(projected) # absolute position the increase starts from
+                if self.max_position - held < increase:
+                    increase, reason = max(0, int(self.max_position - held)), MAX_POSITION
+                if price:
+                    headroom = self.max_notional / price - held
+                    if headroom < increase:
+                        increase, reason = max(0, int(headroom)), MAX_NOTIONAL
+                    headroom = (self.max_gross_exposure - ledger.gross_exposure) / price
+                    if headroom < increase:
+                        increase, reason = max(0, int(headroom)), MAX_GROSS_EXPOSURE
+                elif self._needs_price:
+                    increase, reason = 0, NO_PRICE
+                if increase:
+                    self._second_count += 1
+                    counter[1] += 1
+            if not reducing + increase:
+                return self._reject(reason)
+
+        approved = reducing + increase
+        if reason is APPROVED:
+            self.approved += 1
+        else:
+            self.clipped += 1
+        self.open_quantity[isin] = self.open_quantity.get(isin, 0) + (approved if signed > 0 else -approved)
+        return approved, reason
+
+    def release(self, isin: str, transaction_type: str, quantity: int):
+        """Undo the reservation of an approved order that wasn't placed."""
+        self.open_quantity[isin] = self.open_quantity.get(isin, 0) - (quantity if transaction_type == 'BUY' else -quantity)
+
+    def bind(self, order_id: str, isin: str, transaction_type: str, quantity: int, latest: dict = None):
+        """Attach the reservation to the placed order (released by its updates).
+
+        :param latest: Order state already published before the ack (e.g. filled during the placement round trip).
+        """
+        if order_id not in self._orders:
+            self._orders[order_id] = (isin, quantity if transaction_type == 'BUY' else -quantity)
+            if latest is not None:
+                self.on_order_update(latest)
+
+    def on_cancel(self, order_id: str):
+        """Release the whole reservation of an order once its cancellation is accepted (without waiting for the terminal
+        update; fills made before the cancel reach the ledger through the order updates)."""
+        entry = self._orders.pop(order_id, None)
+        if entry is not None:
+            isin, reserved = entry
+            self.open_quantity[isin] = self.open_quantity.get(isin, 0) - reserved
+
+    def on_order_update(self, order: dict):
+        """`OrderUpdateHub` listener: shrink the order's reservation to its unfilled quantity (0 once terminal)."""
+        entry = self._orders.get(order.get('order_id'))
+        if entry is None:
+            return
+        isin, reserved = entry
+        if order.get('status') in TERMINAL_STATUSES:
+            remaining = 0
+            del self._orders[order['order_id']]
+        else:
+            remaining = max(0, (order.get('quantity') or 0) - (order.get('filled_quantity') or 0))
+            remaining = remaining if reserved > 0 else -remaining
+            self._orders[order['order_id']] = (isin, remaining)
+        self.open_quantity[isin] = self.open_quantity.get(isin, 0) + remaining - reserved
+
+    def get_stats(self) -> dict:
+        return {
+            "kill_switch": self.killed,
+            "limits": self.limits.model_dump(),
+            "approved": self.approved,
+            "clipped": self.clipped,
+            "rejected": dict(self.rejected),
+            "open_quantity": {isin: quantity for isin, quantity in self.open_quantity.items() if quantity},
+        }
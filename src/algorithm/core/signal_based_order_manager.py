@@ -1,14 +1,44 @@
 import asyncio
 import logging
-from typing import List
+import time
+from collections import deque
+from typing import Deque, List, Tuple
 from datetime import datetime
 
 from src.algorithm import get_logger
+from src.algorithm.utils import clock
+from src.algorithm.utils.tracing import tracer, current_trace
+from src.algorithm.utils.journal import OrderJournal, INTENT, ACK, FILL, CANCEL, POSITION, ROLE_ENTRY, ROLE_TARGET, ROLE_EXIT
 from src.algorithm.models.trade_signals import SIGNAL
-from src.algorithm.core.order_manager import ORDER_MANAGER
+from src.algorithm.core.order_manager import ORDER_MANAGER, OrderNotPlaced, OrderStateUnknown
+from src.algorithm.core.order_updates import TERMINAL_STATUSES
+from src.algorithm.core.idempotency import IdempotencyCache
+from src.algorithm.core.risk_gate import RiskRejected
 from src.algorithm.models.shared_data import SharedData
 
 
+DEFAULT_TARGET_SPLIT = (0.50, 0.10, 0.15) # T1, T2, T3 (T4 gets the remaining ~%25)
+
+
+def profit_target_quantities(Q: int, split: Tuple[float, float, float] = DEFAULT_TARGET_SPLIT) -> List[Tuple[int, str]]:
+    """Split the bought quantity into the T1-T4 profit booking orders -> [(qty, label), ...]."""
+    t1_qty = round(split[0] * Q) # %50
+    t2_qty = round(split[1] * Q) # %10
+    t3_qty = round(split[2] * Q) # %15
+    t4_qty = Q - (t1_qty + t2_qty + t3_qty) # ~%25 (Remaining)
+    return [
+        (t1_qty, "T1"),
+        (t2_qty, "T2"),
+        (t3_qty, "T3"),
+        (t4_qty, "T4"),
+    ]
+
+
+def round_to_tick(price: float, market_spread: float = 0.05) -> float:
+    """Limit price must be a multiple of the tick size (market spread)."""
+    return round(price / market_spread) * market_spread
+
+
 class SignalBasedOrderManager:
     """Class to Automate the BUY/SELL and other orders based on the incoming SIGNAL form the algorithm.
     
@@ -18,7 +48,9 @@ class SignalBasedOrderManager:
     def __init__(self,
                 order_manager: ORDER_MANAGER,
                 signal_queue: asyncio.Queue,
-                default_quantity: int):
+                default_quantity: int,
+                strategy: str = "default",
+                journal: OrderJournal = None):
         self.order_manager = order_manager
         self.signal_queue = signal_queue
         self.default_quantity = default_quantity
@@ -27,18 +59,38 @@ class SignalBasedOrderManager:
         self.executed_orders: List[str] = []
         self.is_monitoring = False
         self.isin: str = ""
+        self.strategy = strategy
+        self.journal = journal # [Optional] durable order lifecycle (crash recovery)
+        self.idempotency = IdempotencyCache() # one entry per (ISIN, strategy, setup)...
         # self.shared_data = shared_data
         self.logger:logging.Logger = None
         self.market_spread = 0.05
+        self.target_split = DEFAULT_TARGET_SPLIT
+        self.bracket_latency: Deque[float] = deque(maxlen=1000) # fill -> all targets resting (ms)
+        self.exit_latency: Deque[dict] = deque(maxlen=1000) # SELL signal -> legs cancelled / flatten submitted / flatten filled (ms)
+        self.cancel_confirm_timeout = 2.0 # seconds to wait for a cancelled leg's final state before fetching it
         
     async def start_monitoring(self, isin:str):
         """Start monitoring signals for the given Stock ISIN."""
         self.isin = isin
         self.is_monitoring = True
         self.logger = get_logger(__name__, isin=self.isin)
-        self.logger.info(f"Started monitoring signals for {self.isin}.")
+        self.logger.info(f"Started monitoring signals for {self.isin} [{self.strategy}].")
         await self._monitor_signals()
     
+    def restore(self, state: dict):
+        """Resume the position & resting target legs recovered from the order journal (see `utils.journal`)."""
+        self.current_position = state["position"]
+        self.pending_orders = list(state["pending_orders"])
+        self.executed_orders = list(state["executed_orders"])
+
+    def _journal(self, event: str, **fields):
+        if self.journal is not None:
+            self.journal.record(event, self.isin, self.strategy, **fields)
+
+    def _journal_position(self):
+        self._journal(POSITION, position=self.current_position, pending_orders=[order['order_id'] for order in self.pending_orders])
+    
     async def stop_monitoring(self):
         """Stop monitoring signals."""
         self.is_monitoring = False
@@ -49,206 +101,316 @@ class SignalBasedOrderManager:
         while self.is_monitoring:
             try:
                 signal: SIGNAL = await self.signal_queue.get()
-                if signal.signal == "BUY":
-                    await self._handle_buy_signal(signal)
-                elif signal.signal == "SELL":
-                    await self._handle_sell_signal()
+                tracer.mark(signal.trace_id, "signal_queue")
+                token = current_trace.set(signal.trace_id) # order placement stages of this signal...
+                try:
+                    if signal.signal == "BUY":
+                        await self._handle_buy_signal(signal)
+                    elif signal.signal == "SELL":
+                        await self._handle_sell_signal()
+                finally:
+                    current_trace.reset(token)
+                    tracer.discard(signal.trace_id) # no fill (non actionable / not placed)
                     
                 self.signal_queue.task_done()
                 
             except Exception as e:
                 self.logger.error(f"Error processing signal: {e}")
-            await asyncio.sleep(0.1)
     
     async def _handle_buy_signal(self, signal:SIGNAL):
         """Handle a BUY signal by placing a buy order and setting up sell orders."""
         
         
-        if signal.timestamp.date() != datetime.today().date():
+        if signal.timestamp.date() != clock.today().date():
             self.logger.warning(f"""
                            Invalid BUY SIGNAL Date: {signal.timestamp.date()}
-                           Today's Date: {datetime.today().date()}
+                           Today's Date: {clock.today().date()}
                            
                            Cannot Place Intraday Market order with another dates...
                            :BUY ORDER NOT PLACED:
                            """)
             return
         
+        # Every tick of a BUY setup emits a BUY signal: only its first one may place an order...
+        entry_key = (self.isin, self.strategy, signal.setup or signal.timestamp)
+        if not self.idempotency.acquire(entry_key):
+            self.logger.debug(f"Duplicate BUY signal of setup {entry_key[2]} suppressed ({self.idempotency.suppressed} so far).")
+            return
                     
         Q = self.default_quantity
-        buy_order_tag = f'BUY-ORDER-{self.isin}-{Q}'
-        buy_order_id = await self.order_manager.place_new_intraday_order(
-            ISIN=self.isin,
-            net_quantity=Q, 
-            transaction_type='BUY',
-            order_type='MARKET',
-            tag=buy_order_tag,
-            validity='DAY'
-        )
-        self.logger.info(f"Placing buy order {buy_order_id} for {Q} shares of {self.isin}")
+        # Tags are unique per setup (& leg): orders of unknown outcome are found in the order book by tag...
+        setup_id = entry_key[2].strftime('%H%M%S')
+        buy_order_tag = f'BUY-ORDER-{self.isin}-{Q}-{setup_id}'
+        self._journal(INTENT, tag=buy_order_tag, role=ROLE_ENTRY, quantity=Q)
+        try:
+            buy_order_id = await self.order_manager.place_new_intraday_order(
+                ISIN=self.isin,
+                net_quantity=Q, 
+                transaction_type='BUY',
+                order_type='MARKET',
+                tag=buy_order_tag,
+                validity='DAY'
+            )
+        except RiskRejected as e:
+            self.logger.warning(f"BUY order not placed: {e}") # (the setup stays claimed, no retry on every tick)
+            return
+        except (ValueError, OrderNotPlaced):
+            self.idempotency.release(entry_key) # never accepted by the broker, a retry isn't a duplicate...
+            raise
+        except Exception as e:
+            # Timeout / lost response: the order may be live, so the setup stays claimed...
+            buy_order_id = await self._reconcile_entry(buy_order_tag, e)
+            if buy_order_id is None:
+                return
+        placed_quantity = self.order_manager.order_quantities.get(buy_order_id, Q) # (may be clipped by the risk gate)
+        self._journal(ACK, tag=buy_order_tag, role=ROLE_ENTRY, quantity=placed_quantity, order_id=buy_order_id)
+        self.logger.info(f"Placing buy order {buy_order_id} for {placed_quantity} shares of {self.isin}")
 
-        while True:
-            response = await self.order_manager.get_order_details(buy_order_id)
-            if response.get('status') == 'success':
-                
-                order_data = response['data']
-                order_status = order_data['status']
-                #! for testing set status == 'after market order req received'
-                # if order_status == 'after market order req received':
-                if order_status == 'complete' and order_data['pending_quantity'] == 0:
-                    self.current_position += order_data['filled_quantity'] #-> Use this in live market. 
-                    # self.current_position += order_data['quantity']
-                    self.logger.info(f"""
-                                    BUY order (id:{buy_order_id}) executed successfully.
-                                    Stock Name: {order_data['trading_symbol']}
-                                    Quantity Purchased: {order_data['filled_quantity']} Shares @ {order_data['order_type']}
+        # Wait for the fill (pushed order updates, no polling)...
+        try:
+            response = await self.order_manager.wait_for_order(buy_order_id)
+        except OrderStateUnknown as e:
+            # The setup stays claimed & the entry stays in flight in the journal (resolved by the order book on recovery)...
+            self.logger.error(f"BUY order {buy_order_id}: {e}. Any fill isn't tracked nor protected by targets: check the broker.")
+            return
+        tracer.mark(signal.trace_id, "fill")
+        tracer.finish(signal.trace_id)
+        order_data = response['data']
+        order_status = order_data['status']
+        self._journal(FILL, tag=buy_order_tag, order_id=buy_order_id, status=order_status, filled_quantity=order_data.get('filled_quantity', 0), price=order_data.get('average_price'))
+        #! for testing set status == 'after market order req received'
+        # if order_status == 'after market order req received':
+        if order_status == 'complete' and order_data['pending_quantity'] == 0:
+            self.current_position += order_data['filled_quantity'] #-> Use this in live market. 
+            self._journal_position()
+            # self.current_position += order_data['quantity']
+            self.logger.info(f"""
+                            BUY order (id:{buy_order_id}) executed successfully.
+                            Stock Name: {order_data['trading_symbol']}
+                            Quantity Purchased: {order_data['filled_quantity']} Shares @ {order_data['order_type']}
 {'-'*100}""")
-                    self.executed_orders.append({
-                        'order_id': buy_order_id,
-                        'tag': buy_order_tag
-                    })
-                    break
-                
-                if order_status == 'rejected':
-                    self.logger.warning(f"""
-                                    BUY order rejected: {order_data['status_message']}
+            self.executed_orders.append({
+                'order_id': buy_order_id,
+                'tag': buy_order_tag
+            })
+            filled_at = time.perf_counter()
+        else:
+            self.logger.warning(f"""
+                            BUY order {order_status}: {order_data.get('status_message')}
 {'-'*100}""")
-                    return
-                
-            await asyncio.sleep(0.3)
+            return
             
-        await asyncio.sleep(0.3)
-        
-        # Profit levels order placing...
+        # Profit levels order placing (whole ladder at once)...
         positive_levels = [level for level in signal.levels if level['level'] > 0]
         N = len(positive_levels)
         if N > 0 and N < 5:
-            # sell_quantity = 
-            t1_qty = round(0.50 * Q) # %50
-            t2_qty = round(0.10 * Q) # %10
-            t3_qty = round(0.15 * Q) # %15
-            t4_qty = Q - (t1_qty + t2_qty + t3_qty) # ~%25 (Remaining) 
-
-            sell_orders_info = [
-                (t1_qty, "T1"),
-                (t2_qty, "T2"),
-                (t3_qty, "T3"),
-                (t4_qty, "T4"),
-            ]
-
+            # split what was actually bought (clipped / partially filled orders)...
+            sell_orders_info = profit_target_quantities(order_data['filled_quantity'], self.target_split)
+            legs = []
             for (qty, label), level in zip(sell_orders_info, positive_levels):
+                if qty <= 0:
+                    continue
                 # This field must be multiple of 0.05
-                limit_price = level['value']
-                limit_price = round(limit_price / self.market_spread) * self.market_spread
-                tag = f"{label}-SELL-ORDER-{self.isin}-{qty}"
-                sell_order_id = await self.order_manager.place_new_intraday_order(
-                    ISIN = self.isin,
-                    net_quantity=qty,
-                    transaction_type='SELL',
-                    order_type='LIMIT',
-                    price=limit_price,
-                    tag=tag,
-                    validity='DAY'
-                )
-                self.pending_orders.append({
-                    'order_id': sell_order_id,
-                    'tag': tag
+                limit_price = round_to_tick(level['value'], self.market_spread)
+                legs.append({
+                    'label': label,
+                    'level': level['level'],
+                    'order': dict(
+                        ISIN = self.isin,
+                        net_quantity=qty,
+                        transaction_type='SELL',
+                        order_type='LIMIT',
+                        price=limit_price,
+                        tag=f"{label}-SELL-ORDER-{self.isin}-{qty}-{setup_id}",
+                        validity='DAY'
+                    ),
                 })
-                self.logger.info(f"""Placed LIMIT {label} SELL order {sell_order_id} for {qty} shares @ {limit_price}/- INR ({level['level']}% of BUY PRICE.)""")
-                await asyncio.sleep(0.25)
+            await self._place_target_ladder(legs)
+            latency_ms = (time.perf_counter() - filled_at) * 1000
+            self.bracket_latency.append(latency_ms)
+            self.logger.info(f"Profit target ladder resting {latency_ms:.1f} ms after the BUY fill ({len(self.pending_orders)}/{len(legs)} legs).")
+
+    def _accept_leg(self, leg: dict, order_id: str):
+        order = leg['order']
+        quantity = self.order_manager.order_quantities.get(order_id, order['net_quantity']) # (may be clipped by the risk gate)
+        self.pending_orders.append({
+            'order_id': order_id,
+            'tag': order['tag'],
+            'quantity': quantity
+        })
+        self._journal(ACK, tag=order['tag'], role=ROLE_TARGET, quantity=quantity, order_id=order_id, price=order['price'])
+        self.logger.info(f"""Placed LIMIT {leg['label']} SELL order {order_id} for {quantity} shares @ {order['price']}/- INR ({leg['level']}% of BUY PRICE.)""")
+
+    async def _reconcile_entry(self, tag: str, error: Exception):
+        """Order id of a BUY whose placement failed with an unknown outcome, if the broker has it (order book by tag)."""
+        try:
+            found = await self.order_manager.reconcile_by_tag([tag])
+        except Exception as e:
+            self.logger.error(f"BUY order {tag} outcome unknown ({error!r}) & not reconciled ({e}). Check the broker: the setup isn't retried.")
+            return None
+        if tag not in found:
+            self.logger.error(f"BUY order {tag} failed ({error!r}) & isn't in the order book: not placed.")
+            return None
+        self.logger.warning(f"BUY order {tag} failed ({error!r}) but was accepted as {found[tag]['order_id']}.")
+        return found[tag]['order_id']
+
+    async def _place_target_ladder(self, legs: List[dict], retries: int = 1):
+        """Submit the T1-T4 LIMIT SELLs as one batch & reconcile every leg.
+
+        Failed legs are looked up in the order book by tag first (a timed out leg may have been accepted) and only the
+        ones the broker doesn't have are retried; if the order book is unavailable nothing is re-sent.
+        """
+        for attempt in range(retries + 1):
+            for leg in legs:
+                self._journal(INTENT, tag=leg['order']['tag'], role=ROLE_TARGET, quantity=leg['order']['net_quantity'])
+            results = await self.order_manager.place_multi_intraday_orders([leg['order'] for leg in legs])
+            failed = []
+            for leg, (order_id, error) in zip(legs, results):
+                if order_id is None:
+                    self.logger.warning(f"{leg['label']} SELL order failed (attempt {attempt + 1}): {error}")
+                    failed.append(leg)
+                    continue
+                self._accept_leg(leg, order_id)
+            if not failed:
+                return
+            legs = failed
+            try:
+                found = await self.order_manager.reconcile_by_tag([leg['order']['tag'] for leg in legs])
+            except Exception as e:
+                self.logger.error(f"Failed target legs not reconciled, not re-sending them: {e}")
+                break
+            for leg in legs:
+                if leg['order']['tag'] in found:
+                    self._accept_leg(leg, found[leg['order']['tag']]['order_id'])
+            legs = [leg for leg in legs if leg['order']['tag'] not in found]
+            if not legs:
+                return
+        self.logger.error(f"Unprotected target legs: {[leg['label'] for leg in legs]} ({sum(leg['order']['net_quantity'] for leg in legs)} shares). They'll be exited with the position.")
                 
                 
+    def _cached_order(self, order_id: str) -> dict:
+        """Locally tracked order state (pushed updates / status poller), no API call."""
+        return self.order_manager.order_updates.get(order_id) or {}
+
+    async def _refresh_order(self, order_id: str):
+        """Fetch the order (REST) into the locally tracked state."""
+        response = await self.order_manager.get_order_details(order_id)
+        if response.get('status') == 'success':
+            self.order_manager.order_updates.publish(response['data'])
+
+    async def _cancel_leg(self, order: dict) -> bool:
+        """Cancel a target leg & wait for its final state (fills made before the cancel), so its filled quantity is exact."""
+        try:
+            await self.order_manager.cancel_orders(order_id=order['order_id'])
+            self._journal(CANCEL, tag=order['tag'], order_id=order['order_id'])
+        except Exception as e:
+            self.logger.warning(f"Cancel failed for {order['tag']} ({order['order_id']}): {e}")
+            return False
+        try:
+            # (fetched once if its final update is late)
+            await self.order_manager.wait_for_order(order['order_id'], timeout=self.cancel_confirm_timeout)
+        except OrderStateUnknown as e:
+            self.logger.warning(f"Cancelled {order['tag']}: {e}. Its filled quantity may be stale.")
+        return True
+
     async def _handle_sell_signal(self):
-        """Handle a SELL signal by canceling pending orders and selling the position."""
+        """Handle a SELL signal (stop loss / exit): cancel every open target concurrently & flatten the rest at MARKET.
+
+        The remaining quantity comes from the locally tracked fill state of the targets, once every cancelled leg's final
+        update has arrived; orders are re-fetched only when their cancellation failed (e.g. filled during the cancel round
+        trip) or their final update is late.
+        """
         if self.current_position <=0:
             # IF BUY order didn't executed at all... there's nothing to sell...
             self.logger.warning("No position to sell")
             return
         
-        total_filled_quantities: int = 0
-        total_pending_quantities: int = 0
+        started = time.perf_counter()
         try:
-            for order in self.pending_orders:
-                order_id = order['order_id']
-                order_tag = order['tag']
-                
-                response = await self.order_manager.get_order_details(order_id=order_id)
-                
-                if response.get('status') == 'success':
-                    order_data = response['data']
-                    order_status = order_data['status']
-                    pending_quantity = order_data['pending_quantity']
-                    
-                    # If Profit Order Executed Before SL call
-                    if order_status == 'complete' and pending_quantity == 0:
-                        total_filled_quantities += order_data['filled_quantity']
-                        self.executed_orders.append({
-                            'order_id': order_id,
-                            'tag': order_tag
-                        })
-                        self.logger.info(f"Profit Booked at {order_tag[:2]} level | Q:{order_data['filled_quantity']} @ {order_data['price']}/- INR.")
-                    
-                    
-                    # If Profit Booking Order didn't executed Before SL Call then Order will be cancelled and calculate the remaining quantities to SELL.
-                    if order_status == 'open' or pending_quantity != 0:
-                        total_pending_quantities += pending_quantity
-                        # Cancelling all the OPEN orders [During SL condition hit]
-                        await self.order_manager.cancel_orders(order_id=order_id)
-                    
-                    if order_status == 'rejected':
-                        self.logger.info(f"Order at {order_tag[:2]} level |{order_data['status_message']}")
-                    
-                else:
-                    self.logger.warning(f"Error fetching order {order_id} | TAG: {order_tag}")         
+            # Cancelling all the OPEN profit booking orders at once [During SL condition hit]
+            open_legs = [order for order in self.pending_orders if self._cached_order(order['order_id']).get('status') not in TERMINAL_STATUSES]
+            cancelled = await asyncio.gather(*(self._cancel_leg(order) for order in open_legs))
+            failed = [order for order, ok in zip(open_legs, cancelled) if not ok]
+            if failed:
+                await asyncio.gather(*(self._refresh_order(order['order_id']) for order in failed))
+            cancelled_at = time.perf_counter()
 
-                await asyncio.sleep(0.25)
+            # Profit booked before the SL call (local fill state)...
+            total_filled_quantities = 0
+            for order in self.pending_orders:
+                order_data = self._cached_order(order['order_id'])
+                filled_quantity = order_data.get('filled_quantity', 0)
+                if filled_quantity:
+                    total_filled_quantities += filled_quantity
+                    self._journal(FILL, tag=order['tag'], order_id=order['order_id'], status=order_data.get('status'), filled_quantity=filled_quantity, price=order_data.get('average_price'))
+                    self.executed_orders.append({
+                        'order_id': order['order_id'],
+                        'tag': order['tag']
+                    })
+                    self.logger.info(f"Profit Booked at {order['tag'][:2]} level | Q:{filled_quantity} @ {order_data.get('price')}/- INR.")
+                if order_data.get('status') == 'rejected':
+                    self.logger.info(f"Order at {order['tag'][:2]} level |{order_data.get('status_message')}")
             
             self.current_position -= total_filled_quantities
-            await asyncio.sleep(0.2)
+            total_pending_quantities = self.current_position
+            self._journal(POSITION, position=self.current_position, pending_orders=[]) # targets settled...
             
-            if total_pending_quantities == 0:
+            if total_pending_quantities <= 0:
                 self.logger.info('All orders executed successfully! Nothing to SELL')
                 self.pending_orders = []
                 return 
             
-            if total_pending_quantities > 0: # selling all the remaining quantities (total exit from market)
-                sell_order_tag = f'SELL-SL-ORDER-{self.isin}'
-                sell_order_id = await self.order_manager.place_new_intraday_order(
-                    self.isin,
-                    net_quantity=total_pending_quantities,
-                    transaction_type='SELL',
-                    order_type='MARKET',
-                    tag=sell_order_tag,
-                    validity='DAY'
-                )
-                self.logger.info(f"Placing [SELL] order {sell_order_id} for remaining {total_pending_quantities} shares of {self.isin}")
-                
-                while True:
-                    response = await self.order_manager.get_order_details(sell_order_id)
-                    if response.get('status') == 'success':
-                        order_data = response['data']
-                        order_status = order_data['status']
-                        #! for testing set status == 'after market order req received.
-                        # if order_status == 'after market order req received': 
-                        if order_status == 'complete' and order_data['pending_quantity'] == 0:
-                            self.current_position = order_data['pending_quantity']
-                            # self.current_position = 0
-                            self.logger.info(f"SELL order {sell_order_id} executed successfully.")
-                            self.logger.info(f"""
-                                        Stock Name: {order_data['trading_symbol']}
-                                        Quantity Sold: {order_data['filled_quantity']}
-                                        """)
-                            self.executed_orders.append({
-                                'order_id': sell_order_id,
-                                'tag': sell_order_tag
-                            })
-                            break
-                        
-                        if order_status == 'rejected':
-                            self.logger.warning(f"SELL order rejected: {order_data['status_message']}")
-                            break
-                        
-                        await asyncio.sleep(0.5)
+            # selling all the remaining quantities (total exit from market)
+            sell_order_tag = f"SELL-SL-ORDER-{self.isin}-{clock.now().strftime('%H%M%S')}"
+            self._journal(INTENT, tag=sell_order_tag, role=ROLE_EXIT, quantity=total_pending_quantities)
+            sell_order_id = await self.order_manager.place_new_intraday_order(
+                self.isin,
+                net_quantity=total_pending_quantities,
+                transaction_type='SELL',
+                order_type='MARKET',
+                tag=sell_order_tag,
+                validity='DAY'
+            )
+            submitted_at = time.perf_counter()
+            self._journal(ACK, tag=sell_order_tag, role=ROLE_EXIT, quantity=total_pending_quantities, order_id=sell_order_id)
+            self.logger.info(f"Placing [SELL] order {sell_order_id} for remaining {total_pending_quantities} shares of {self.isin}")
+            
+            try:
+                response = await self.order_manager.wait_for_order(sell_order_id)
+            except OrderStateUnknown as e:
+                self.logger.error(f"SELL order {sell_order_id}: {e}. {self.current_position} Shares may be left to SELL: check the broker.")
+                self.pending_orders = []
+                return
+            tracer.mark(current_trace.get(), "fill")
+            tracer.finish(current_trace.get())
+            order_data = response['data']
+            order_status = order_data['status']
+            self._journal(FILL, tag=sell_order_tag, order_id=sell_order_id, status=order_status, filled_quantity=order_data.get('filled_quantity', 0), price=order_data.get('average_price'))
+            #! for testing set status == 'after market order req received.
+            # if order_status == 'after market order req received': 
+            if order_status == 'complete' and order_data['pending_quantity'] == 0:
+                self.current_position = order_data['pending_quantity']
+                self._journal(POSITION, position=self.current_position, pending_orders=[])
+                # self.current_position = 0
+                self.logger.info(f"SELL order {sell_order_id} executed successfully.")
+                self.logger.info(f"""
+                            Stock Name: {order_data['trading_symbol']}
+                            Quantity Sold: {order_data['filled_quantity']}
+                            """)
+                self.executed_orders.append({
+                    'order_id': sell_order_id,
+                    'tag': sell_order_tag
+                })
+            else:
+                self.logger.warning(f"SELL order {order_status}: {order_data.get('status_message')}")
+
+            timings = {
+                "cancel_ms": (cancelled_at - started) * 1000,
+                "submit_ms": (submitted_at - started) * 1000,
+                "fill_ms": (time.perf_counter() - started) * 1000,
+            }
+            self.exit_latency.append(timings)
+            self.logger.info(f"[Exit latency] {len(open_legs)} legs cancelled: {timings['cancel_ms']:.1f} ms | flatten submitted: {timings['submit_ms']:.1f} ms | filled: {timings['fill_ms']:.1f} ms")
             
             # Status
             self.logger.info(f"""
@@ -265,4 +427,3 @@ class SignalBasedOrderManager:
             
         except Exception as e:
             self.logger.error(f"Error @ _handle_sell_signal: {e}")
-
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel
+
+
+class BacktestFill(BaseModel):
+    label: Literal["BUY", "T1", "T2", "T3", "T4", "SL", "SELL", "EOD"]
+    price: float
+    quantity: int
+    timestamp: datetime
+
+
+class BacktestTrade(BaseModel):
+    isin: str
+    entry_price: float
+    entry_time: datetime
+    exit_time: datetime
+    quantity: int
+    fills: List[BacktestFill] = []
+    pnl: float
+
+
+class BacktestReport(BaseModel):
+    trades: List[BacktestTrade] = []
+    pnl_by_isin: Dict[str, float] = {}
+    total_pnl: float = 0.0
+    win_rate: Optional[float] = None
+    bars: int = 0
+    elapsed: float = 0.0        # seconds
+    bars_per_sec: float = 0.0
@@ -1,8 +1,18 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List
 
 class IndicatorModel(BaseModel):
     value: float
     timestamp: datetime
     # indicator: str
     
+
+
+class VWAPBandsModel(BaseModel):
+    vwap: float
+    std: float
+    upper: List[float] = []   # vwap + k·σ for each requested k
+    lower: List[float] = []   # vwap - k·σ for each requested k
+    anchor: str = "session"
+    timestamp: datetime
@@ -8,3 +8,4 @@ class LTPC(BaseModel):
     ltt: datetime   # Last Traded Time
     ltq: int        # Last Traded Quantity
     cp: float       # Previous Close    
+    trace_id: Optional[int] = None # latency trace (see utils.tracing)
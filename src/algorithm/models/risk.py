@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class RiskLimits(BaseModel):
+    """Pre-trade risk limits (None disables a limit)."""
+    max_position: Optional[int] = None              # shares per ISIN (absolute, incl. open orders)
+    max_notional: Optional[float] = None            # INR per ISIN
+    max_gross_exposure: Optional[float] = None      # INR across all the ISINs
+    max_daily_loss_per_stock: Optional[float] = None # INR (realized + unrealized) per ISIN, blocks new exposure
+    max_daily_loss: Optional[float] = None          # INR across all the ISINs, trips the kill switch
+    max_orders_per_second: Optional[int] = 20       # all the ISINs (entries; exits are never capped)
+    max_orders_per_minute_per_stock: Optional[int] = 20
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from src.algorithm.models.candle import Candle
 from src.algorithm.models.ltpc import LTPC
@@ -11,9 +11,10 @@ from src.algorithm.models.trade_signals import SIGNAL
 #! Temporarily Using for Queuing Data:
 class precise_indicator_data(BaseModel):
     timestamp: datetime
-    vwap: float
-    ema9: float
-    ema20: float
+    vwap: Optional[float] = None
+    ema9: Optional[float] = None
+    ema20: Optional[float] = None
+    values: Dict[str, float] = {} # every pipeline indicator by name (strategies' declared indicators)
     #todo volume: int  
 
 class estimated_vwap(BaseModel):
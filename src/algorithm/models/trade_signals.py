@@ -8,4 +8,15 @@ class SIGNAL(BaseModel):
     value: float
     timestamp: datetime
     levels: Optional[List] = []
+    trace_id: Optional[int] = None # latency trace of the tick (see utils.tracing)
+    setup: Optional[datetime] = None # start of the signal's run: every tick of one setup shares it (order idempotency)
 
+
+class SignalRun(BaseModel):
+    """Run-length encoded stretch of consecutive identical signals."""
+    signal: Literal["WAIT", "BUY", "HOLD", "SELL"] = None
+    start: datetime
+    end: datetime
+    count: int = 1
+    first_value: float
+    last_value: float
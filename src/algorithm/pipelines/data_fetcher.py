@@ -1,6 +1,7 @@
 import asyncio
 import json
 import ssl
+import time
 import websockets
 import socket
 import requests
@@ -15,6 +16,7 @@ import src.algorithm.pipelines.MarketDataFeedV3_pb2 as pb
 from src.algorithm import get_logger
 from src.algorithm.models.candle import Candle
 from src.algorithm.models.ltpc import LTPC
+from src.algorithm.utils.tracing import tracer
 
 
 
@@ -248,6 +250,7 @@ class DataFetcher:
                 
                     while True:
                         message = await websocket.recv()
+                        received_ns = time.perf_counter_ns()
                         decoded_data = self.decode_protobuf(message)
                         data_dict = MessageToDict(decoded_data)
                         feeds: Dict = data_dict.get("feeds", {})
@@ -267,7 +270,9 @@ class DataFetcher:
                                             ltt=ts,
                                             ltq=int(ltpc_dict['ltq']),
                                             cp=float(ltpc_dict['cp']),
+                                            trace_id=tracer.start(received_ns),
                                         )
+                                        tracer.mark(ltpc.trace_id, "decode")
                                         await self.ltpc_queues[instrument_key].put(ltpc)
                                         self.last_ltpc_timestamp = ts
 
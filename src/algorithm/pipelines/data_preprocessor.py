@@ -77,6 +77,20 @@ class DataPreprocessor:
         return None
            
     
+    def get_state(self) -> dict:
+        """Snapshot of the preprocessor (completed 5-min candles & pending 1-min queue) for checkpointing."""
+        return {
+            "five_min_candles": list(self.five_min_candles),
+            "candle_queue": list(self.candle_queue),
+            "current_5min_candle": self.current_5min_candle,
+        }
+
+    def set_state(self, state: dict):
+        """Restore the preprocessor from `get_state()` snapshot."""
+        self.five_min_candles = list(state["five_min_candles"])
+        self.candle_queue = deque(state["candle_queue"], maxlen=5)
+        self.current_5min_candle = state["current_5min_candle"]
+
     def _merge_candles(self, candles:List[Candle]) -> Candle:
         """Merge five 1-minute candles into a single 5-minute candle."""
  
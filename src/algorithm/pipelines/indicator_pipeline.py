@@ -1,59 +1,137 @@
-from typing import List
+from typing import List, Dict, Tuple, Callable, Any, Optional
 
 from src.algorithm import get_logger
 from src.algorithm.models.candle import Candle
 from src.algorithm.models.ltpc import LTPC
 #
 from src.algorithm.tools.indicator import Indicator
-from src.algorithm.tools.vwap import VWAP
-from src.algorithm.tools.ema import EMA
+
+
+# Shared sub-computations derived from the bar (computed once per bar, only if some indicator needs them).
+SOURCES: Dict[str, Callable[[Candle], Any]] = {
+    "candle": lambda candle: candle,
+    "timestamp": lambda candle: candle.timestamp,
+    "close": lambda candle: candle.close,
+    "hlc3": lambda candle: (candle.high + candle.low + candle.close) / 3,
+    "volume": lambda candle: candle.volume,
+}
+
+# (node name, function, input node names, is_indicator)
+PlanStep = Tuple[str, Callable, Tuple[str, ...], bool]
 
 
 class IndicatorPipeline:
-    
+    """Declarative indicator DAG.
+
+    Every indicator declares its inputs (`Indicator.inputs`: a source such as 'close'/'hlc3' or another indicator's name,
+    whose value is passed to its `update` in that order),
+    the keyword inputs of its estimate (`Indicator.estimate_inputs`) and its `timeframe`. The evaluation plan (topological
+    order incl. the shared sources) is compiled once per timeframe and cached until the set of indicators changes, so per-bar
+    work is a flat loop over the plan without any type dispatch.
+    """
+
     def __init__(self, isin:str=None):
         self.logger = get_logger(__name__, isin=isin)
-        self.indicators = {}
-        
+        self.indicators: Dict[str, Indicator] = {}
+        self._update_plans: Dict[str, List[PlanStep]] = {}
+        self._estimate_plan: Optional[List[Tuple[str, Callable, Tuple[str, ...]]]] = None
+
     def add_indicator(self, name: str, indicator: Indicator):
         """Add an indicator to the pipeline."""
         self.indicators[name] = indicator
-        
+        self._invalidate_plans()
+
+    def remove_indicator(self, name: str):
+        """Remove an indicator from the pipeline."""
+        self.indicators.pop(name, None)
+        self._invalidate_plans()
+
+    def _invalidate_plans(self):
+        self._update_plans.clear()
+        self._estimate_plan = None
+
+    def compile_plan(self, timeframe: str = "5min") -> List[PlanStep]:
+        """Compile (and cache) the evaluation plan of the given timeframe.
+
+        :raises ValueError: On unknown inputs or dependency cycles.
+        """
+        if timeframe in self._update_plans:
+            return self._update_plans[timeframe]
+
+        plan: List[PlanStep] = []
+        state: Dict[str, int] = {}  # 1: visiting, 2: done
+
+        def visit(node: str):
+            if state.get(node) == 2:
+                return
+            if state.get(node) == 1:
+                raise ValueError(f"Indicator dependency cycle detected at '{node}'")
+            state[node] = 1
+            if node in self.indicators:
+                indicator = self.indicators[node]
+                if indicator.timeframe != timeframe:
+                    raise ValueError(f"'{node}' ({indicator.timeframe}) can't be an input of a {timeframe} indicator")
+                for dependency in indicator.inputs:
+                    visit(dependency)
+                plan.append((node, indicator.update, tuple(indicator.inputs), True))
+            elif node in SOURCES:
+                plan.append((node, SOURCES[node], ("candle",), False))
+            else:
+                raise ValueError(f"Unknown indicator input '{node}'")
+            state[node] = 2
+
+        for name, indicator in self.indicators.items():
+            if indicator.timeframe == timeframe:
+                visit(name)
+
+        self._update_plans[timeframe] = plan
+        return plan
+
+    def _compile_estimate_plan(self):
+        self._estimate_plan = [
+            (name, indicator.estimate, tuple(indicator.estimate_inputs))
+            for name, indicator in self.indicators.items()
+        ]
+        return self._estimate_plan
+
     def initialize_indicators(self, historical_candles: List[Candle]):
         for name, indicator in self.indicators.items():
-            if isinstance(indicator, EMA):
-                indicator.initialize_ema_with_history(historical_candles)
+            indicator.initialize_with_history(historical_candles)
+            if indicator.current_value is not None:
                 self.logger.info(f"Initialized {name} with historical data: {indicator.current_value.value: .2f}")
-    
-    def update_all(self, candle:Candle):
-        """Updates all indicators with the latest 5-minute candle."""
-        for name, indicator in self.indicators.items():
-            indicator.update(candle)
-            self.logger.info(f"Updated {name}: {indicator.current_value.value} | {candle.timestamp}")
-        
+
+    def update_all(self, candle:Candle, timeframe: str = "5min"):
+        """Updates all indicators of the timeframe with the latest candle (5-minute by default)."""
+        values: Dict[str, Any] = {"candle": candle}
+        for name, func, input_names, is_indicator in self.compile_plan(timeframe):
+            if name == "candle":
+                continue
+            if is_indicator:
+                func(*[values[input_name] for input_name in input_names])
+                indicator = self.indicators[name]
+                values[name] = indicator.current_value.value if indicator.current_value is not None else None
+                self.logger.info(f"Updated {name}: {values[name]} | {candle.timestamp}")
+            else:
+                values[name] = func(candle)
+
         self.logger.info(f"{'-'*100}")
-            
+
     def estimate_all(self, ltpc: LTPC = None, one_min_candle: Candle = None):
         """Get real-time estimators for all indicators."""
 
-        
+        available = {"ltpc": ltpc, "one_min_candle": one_min_candle}
         estimates = {}
-        for name, indicator in self.indicators.items():
-            if isinstance(indicator, EMA) and ltpc is not None:
-                estimates[name] = indicator.estimate(ltpc=ltpc)
-                self.logger.info(f"Estimated {name}: {estimates[name]}")
-            elif isinstance(indicator, VWAP) and one_min_candle is not None:
-                estimates[name] = indicator.estimate(one_min_candle=one_min_candle)
-                self.logger.info(f"Estimated {name}: {estimates[name]}")
-            # More Tools to add here in future...
-        self.logger.info(f"{'-'*75}")
+        for name, estimate, input_names in (self._estimate_plan or self._compile_estimate_plan()):
+            kwargs = {input_name: available[input_name] for input_name in input_names if available.get(input_name) is not None}
+            if kwargs:
+                estimates[name] = estimate(**kwargs)
+                self.logger.debug(f"Estimated {name}: {estimates[name]}") # (per tick while streamed)
         return estimates
-    
+
     def get_current_values(self):
         """Get the current values of all indicators."""
 
         return {
-            name: indicator.current_value 
+            name: indicator.current_value
             for name, indicator in self.indicators.items()
         }
-    
\ No newline at end of file
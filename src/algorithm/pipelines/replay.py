@@ -0,0 +1,274 @@
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from src.algorithm import get_logger
+from src.algorithm.models.candle import Candle
+from src.algorithm.models.ltpc import LTPC
+from src.algorithm.pipelines.stock_processor import StockProcessor
+from src.algorithm.core.order_updates import OrderUpdateHub, LocalOrderUpdateStream, TERMINAL_STATUSES
+from src.algorithm.core.order_manager import OrderStateUnknown
+from src.algorithm.core.ledger import PositionLedger
+from src.algorithm.utils import clock
+from src.algorithm.utils.clock import SimulatedClock
+
+
+ReplayEvent = Tuple[str, Union[LTPC, Candle]]  # (isin, tick or 1-min candle)
+
+
+class ReplayFetcher:
+    """Stand-in for `DataFetcher` serving recorded/historical data to the unmodified `StockProcessor`."""
+
+    def __init__(self, previous_day: Dict[str, List[Candle]], intraday: Dict[str, List[Candle]] = None):
+        """
+        :param previous_day: {isin: previous day's 375 1-min candles}
+        :param intraday: {isin: today's 1-min candles before the replay start} (optional)
+        """
+        self.previous_day = previous_day
+        self.intraday = intraday or {}
+        self.market_status = "NORMAL_OPEN"
+        self.subscribed_instruments: set = set()
+        self.candle_queues: Dict[str, asyncio.Queue] = {}
+        self.ltpc_queues: Dict[str, asyncio.Queue] = {}
+        self.websocket = True
+
+    def get_historical_data(self, ISIN: str, date: str = None, **kwargs) -> List[Candle]:
+        return list(self.previous_day.get(ISIN, []))
+
+    def get_intraday_data(self, ISIN: str, **kwargs) -> List[Candle]:
+        return list(self.intraday.get(ISIN, []))
+
+    async def subscribe(self, instrument_key: str, candle_queue: asyncio.Queue, ltpc_queue: asyncio.Queue):
+        self.subscribed_instruments.add(instrument_key)
+        self.candle_queues[instrument_key] = candle_queue
+        self.ltpc_queues[instrument_key] = ltpc_queue
+
+    async def unsubscribe(self, instrument_key: str):
+        self.subscribed_instruments.discard(instrument_key)
+        self.candle_queues.pop(instrument_key, None)
+        self.ltpc_queues.pop(instrument_key, None)
+
+    def publish(self, isin: str, item: Union[LTPC, Candle]):
+        """Deliver a replayed tick/candle exactly like the websocket loop does."""
+        instrument_key = f"NSE_EQ|{isin}"
+        if isinstance(item, LTPC):
+            self.ltpc_queues[instrument_key].put_nowait(item)
+        else:
+            self.candle_queues[instrument_key].put_nowait(item)
+
+
+class PaperOrderManager:
+    """Minimal in-process paper broker with the `ORDER_MANAGER` interface used by `SignalBasedOrderManager`.
+
+    MARKET orders fill at the last replayed price, LIMIT orders fill once the price crosses their limit.
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, dict] = {}
+        self.last_price: Dict[str, float] = {}
+        self.order_history: List[str] = []
+        self.order_quantities: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self.order_updates = OrderUpdateHub()
+        self.order_update_stream = LocalOrderUpdateStream(self.order_updates)
+
+    async def place_new_intraday_order(self, ISIN: str, net_quantity: int, transaction_type: str, order_type: str,
+                                       price: Optional[float] = None, validity: str = 'IOC', tag: str = None, **kwargs) -> str:
+        if net_quantity < 1:
+            raise ValueError("net_quantity must be at least 1.")
+        if order_type == 'LIMIT' and price is None:
+            raise ValueError("price must be provided for LIMIT orders.")
+        order_id = f"PAPER-{next(self._ids)}"
+        self.orders[order_id] = {
+            'order_id': order_id,
+            'isin': ISIN,
+            'trading_symbol': ISIN,
+            'transaction_type': transaction_type,
+            'order_type': order_type,
+            'price': price or 0,
+            'quantity': net_quantity,
+            'filled_quantity': 0,
+            'pending_quantity': net_quantity,
+            'status': 'open',
+            'status_message': None,
+            'tag': tag,
+        }
+        self.order_history.append(order_id)
+        self.order_quantities[order_id] = net_quantity
+        self.order_update_stream.push(self.orders[order_id])
+        self._try_fill(self.orders[order_id])
+        return order_id
+
+    async def place_multi_intraday_orders(self, orders: List[dict]) -> List[Tuple[Optional[str], Optional[str]]]:
+        results = await asyncio.gather(*(self.place_new_intraday_order(**order) for order in orders), return_exceptions=True)
+        return [(None, str(result)) if isinstance(result, Exception) else (result, None) for result in results]
+
+    async def reconcile_by_tag(self, tags) -> Dict[str, dict]:
+        return {} # paper orders are never lost in flight...
+
+    async def get_order_details(self, order_id: str) -> dict:
+        if order_id not in self.orders:
+            return {'status': 'error', 'errors': [{'message': f"Unknown order {order_id}"}]}
+        return {'status': 'success', 'data': dict(self.orders[order_id])}
+
+    async def wait_for_order(self, order_id: str, timeout: float = None) -> dict:
+        try:
+            return await self.order_updates.wait(order_id, timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        response = await self.get_order_details(order_id) # (final fetch, like the live order manager)
+        if response.get('status') == 'success':
+            self.order_updates.publish(response['data'])
+            if response['data'].get('status') in TERMINAL_STATUSES:
+                return response
+        raise OrderStateUnknown(order_id, self.orders.get(order_id))
+
+    async def cancel_orders(self, order_id: str) -> None:
+        order = self.orders.get(order_id)
+        if order is None or order['status'] != 'open':
+            raise Exception(f"Failed to cancel order: {order_id}")
+        order['status'] = 'cancelled'
+        self.order_update_stream.push(order)
+
+    def on_price(self, isin: str, price: float):
+        """Match resting orders of the instrument against the latest price."""
+        self.last_price[isin] = price
+        for order in self.orders.values():
+            if order['isin'] == isin and order['status'] == 'open':
+                self._try_fill(order)
+
+    def _try_fill(self, order: dict):
+        price = self.last_price.get(order['isin'])
+        if price is None:
+            return
+        if order['order_type'] == 'MARKET':
+            fill_price = price
+        elif order['transaction_type'] == 'SELL' and price >= order['price']:
+            fill_price = order['price']
+        elif order['transaction_type'] == 'BUY' and price <= order['price']:
+            fill_price = order['price']
+        else:
+            return
+        order.update(status='complete', filled_quantity=order['quantity'], pending_quantity=0, average_price=fill_price)
+        self.order_update_stream.push(order)
+
+
+class ReplayRunner:
+    """Accelerated event-driven replay through the unmodified production chain:
+    `StockProcessor` -> `DataPreprocessor` -> `IndicatorPipeline` -> `Algorithm` -> `SignalBasedOrderManager`.
+
+    A `SimulatedClock` is injected, so date checks & polling sleeps run in simulated time and the replay runs as fast as the CPU allows.
+    """
+
+    def __init__(self,
+                 previous_day: Dict[str, List[Candle]],
+                 events: List[ReplayEvent],
+                 quantity: int = 1,
+                 intraday: Dict[str, List[Candle]] = None,
+                 order_manager=None,
+                 strategies: Sequence[str] = ("default",)):
+        """
+        :param previous_day: {isin: previous day's 375 1-min candles}
+        :param events: Recorded ticks & 1-min candles (any order; candles are delivered once closed).
+        :param quantity: Shares per BUY.
+        :param intraday: {isin: today's 1-min candles before the first event} (optional)
+        :param order_manager: Broker stand-in (default: `PaperOrderManager`).
+        :param strategies: Strategy names run on every instrument.
+        """
+        self.fetcher = ReplayFetcher(previous_day, intraday)
+        self.order_manager = order_manager or PaperOrderManager()
+        self.ledger = PositionLedger()
+        self.order_manager.order_updates.subscribe(self.ledger.on_order_update)
+        self.quantity = quantity
+        self.strategies = strategies
+        self.events = sorted(events, key=lambda event: self._event_time(event[1]))
+        self.processors: Dict[str, StockProcessor] = {}
+        self.logger = get_logger(__name__)
+
+    @staticmethod
+    def _event_time(item: Union[LTPC, Candle]) -> datetime:
+        return item.ltt if isinstance(item, LTPC) else item.timestamp + timedelta(minutes=1)
+
+    def _backlog(self) -> int:
+        return sum(
+            queue.qsize()
+            for processor in self.processors.values()
+            for queue in (
+                processor.candle_queue,
+                processor.ltpc_queue,
+                *processor.algo_ltpc_queues.values(),
+                *processor.indicator_queues.values(),
+                *processor.trade_signal_queues.values(),
+            )
+        )
+
+    async def _settle(self, max_yields: int = 1000):
+        """Let every consumer run until no more progress can be made at the current simulated time."""
+        previous, idle = -1, 0
+        for _ in range(max_yields):
+            await asyncio.sleep(0)
+            backlog = self._backlog()
+            idle = idle + 1 if backlog == previous else 0
+            if backlog == 0 and idle >= 2 or idle >= 5:
+                return
+            previous = backlog
+
+    async def _advance(self, sim_clock: SimulatedClock, until: datetime):
+        """Advance simulated time to `until`, waking sleepers in deadline order."""
+        while True:
+            wakeup = sim_clock.next_wakeup()
+            if wakeup is None or wakeup > until:
+                break
+            sim_clock.advance_to(wakeup)
+            await self._settle()
+        sim_clock.advance_to(until)
+
+    async def run(self, drain: timedelta = timedelta(seconds=5)) -> Dict[str, float]:
+        """Replay all the events and return throughput statistics."""
+        if not self.events:
+            return {}
+        sim_clock = SimulatedClock(self._event_time(self.events[0][1]))
+        previous_clock = clock.get_clock()
+        clock.set_clock(sim_clock)
+        tasks: List[asyncio.Task] = []
+        try:
+            for isin in sorted({isin for isin, _ in self.events}):
+                processor = StockProcessor(isin=isin, fetcher=self.fetcher, order_manager=self.order_manager, quantity=self.quantity, strategies=self.strategies, ledger=self.ledger)
+                self.processors[isin] = processor
+                await processor.initialize()
+                tasks.extend(await processor.run())
+
+            started = time.perf_counter()
+            for isin, item in self.events:
+                await self._advance(sim_clock, self._event_time(item))
+                if isinstance(item, LTPC) and hasattr(self.order_manager, "on_price"):
+                    self.order_manager.on_price(isin, item.ltp)
+                self.fetcher.publish(isin, item)
+                await self._settle()
+            await self._advance(sim_clock, sim_clock.now() + drain)
+            elapsed = time.perf_counter() - started
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            clock.set_clock(previous_clock)
+
+        simulated = (sim_clock.now() - self._event_time(self.events[0][1])).total_seconds()
+        stats = {
+            "events": len(self.events),
+            "elapsed": elapsed,
+            "events_per_sec": len(self.events) / elapsed if elapsed > 0 else 0.0,
+            "simulated_seconds": simulated,
+            "speedup": simulated / elapsed if elapsed > 0 else 0.0,
+            "signals": sum(a.emission_policy.evaluated for p in self.processors.values() for a in p.algos.values()),
+            "signals_emitted": sum(a.emission_policy.emitted for p in self.processors.values() for a in p.algos.values()),
+            "orders": len(getattr(self.order_manager, "order_history", [])),
+            "skipped_ticks": sum(a.skipped_ticks for p in self.processors.values() for a in p.algos.values()),
+            "signal_backlog": sum(q.qsize() for p in self.processors.values() for q in p.trade_signal_queues.values()),
+            "realized_pnl": self.ledger.total_realized,
+            "unrealized_pnl": self.ledger.total_unrealized,
+        }
+        self.logger.info(f"[Replay] {stats}")
+        return stats
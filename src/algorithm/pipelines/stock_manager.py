@@ -1,38 +1,73 @@
 import asyncio
-from typing import Dict, List
+from typing import Dict, List, Sequence, Tuple
 from src.algorithm.pipelines.data_fetcher import DataFetcher
 from src.algorithm.pipelines.stock_processor import StockProcessor
 from src.algorithm.core.order_manager import ORDER_MANAGER
+from src.algorithm.utils.checkpoint import CheckpointStore
+from src.algorithm.utils.columnar_store import ColumnarHistoryRecorder
+from src.algorithm.utils.journal import OrderJournal, recover_positions, reconcile_positions
+from src.algorithm.core.ledger import PositionLedger
+from src.algorithm.core.risk_gate import RiskGate
+from src.algorithm.models.risk import RiskLimits
+from src.algorithm.utils.event_bus import events
 from src.algorithm import get_logger
 
 class StockManager:
     
-    def __init__(self, access_token:str):
+    def __init__(self, access_token:str, checkpoint_interval: float = 60, broker_url: str = None, risk_limits: RiskLimits = None):
         self.fetcher = DataFetcher(access_token=access_token)
-        self.order_manager = ORDER_MANAGER(access_token=access_token)    
+        self.order_manager = ORDER_MANAGER(access_token=access_token, base_url=broker_url) # broker_url: e.g. local mock broker
         self.processors:Dict[str, StockProcessor] = {} # New task tree for each stock selected...
         self.tasks:List[asyncio.Task] = []
         self.logger = get_logger(__name__)
+        self.checkpoints = CheckpointStore()
+        self.checkpoint_interval = checkpoint_interval # seconds
+        self.history_recorder = ColumnarHistoryRecorder()
+        self.journal = OrderJournal()
+        self.ledger = PositionLedger() # positions & PnL (fills from the order updates, marks from the ticks)
+        self.order_manager.order_updates.subscribe(self.ledger.on_order_update)
+        self.risk_gate = RiskGate(self.ledger, risk_limits) # pre-trade checks of every order
+        self.order_manager.attach_risk_gate(self.risk_gate)
+        self.order_manager.order_updates.subscribe(self._stream_order_update)
+        self.recovered_positions: Dict[Tuple[str, str], dict] = {} # (isin, strategy) -> journal state, until the stock is re-added
         
     
-    async def add_stock(self, isin:str, quantity:int):
+    @staticmethod
+    def _stream_order_update(order: dict):
+        """Forward order updates to the streaming endpoints (`utils.event_bus`)."""
+        isin = order.get('isin') or order.get('instrument_token', '').split('|')[-1]
+        if events.wants("order", isin):
+            events.publish("order", isin, dict(order))
+    
+    async def add_stock(self, isin:str, quantity:int, strategies: Sequence[str] = ("default",)):
         """Add a stock for algo-monitoring.
         
         :param isin(str): Enter an Stock ISIN Number (e.g., 'INE121J01017').
         :param quantity(int): Enter the number of Shares (quantity) in integer.
-        :param date(str): Enter 'date' in 'YYYY-MM-DD' format.
+        :param strategies(Sequence[str]): Registered strategy names sharing the stock's feed & indicators.
         """
         if isin not in self.processors:
             processor = StockProcessor(
                 isin=isin,
                 fetcher=self.fetcher,
                 order_manager=self.order_manager,
-                quantity=quantity
+                quantity=quantity,
+                history_recorder=self.history_recorder,
+                strategies=strategies,
+                journal=self.journal,
+                ledger=self.ledger
             )
             self.processors[isin] = processor
-            await processor.initialize()
-            self.logger.info(f"Initialized StockProcessor Task: {isin} | {quantity} Shares")
+            await processor.initialize(checkpoint=self.checkpoints.load(isin))
+            for name, signal_manager in processor.signal_managers.items():
+                state = self.recovered_positions.pop((isin, name), None)
+                if state is not None:
+                    signal_manager.restore(state)
+                    self.logger.info(f"Recovered {isin} [{name}]: {state['position']} Shares | {len(state['pending_orders'])} resting targets")
+            self.logger.info(f"Initialized StockProcessor Task: {isin} | {quantity} Shares | Strategies: {list(processor.strategies)}")
             self.tasks.extend(await processor.run())
+        else:
+            self.logger.warning(f"{isin} is already monitored with strategies {list(self.processors[isin].strategies)}, {list(strategies)} ignored.")
 
     async def remove_stock(self, isin:str):
         """Removing a stock from algo-monitoring and deleing it's data.
@@ -40,16 +75,102 @@ class StockManager:
         :param isin(str): Enter an Stock ISIN Number (e.g., 'INE121J01017').
         """
         if isin in self.processors:
-            await self.processors[isin].signal_manager.stop_monitoring()
+            for signal_manager in self.processors[isin].signal_managers.values():
+                await signal_manager.stop_monitoring()
             
             await self.fetcher.unsubscribe(instrument_key=f"NSE_EQ|{isin}")
             self.logger.info(f"Stopped Signal Monitoring & StockProcessor task for instrument: {isin}")
             del self.processors[isin]
+            self.checkpoints.delete(isin)
+
+    async def restore_from_checkpoints(self, timeout: float = 30):
+        """Re-add every stock having a snapshot for today (warm restart), once the websocket is connected."""
+        isins = self.checkpoints.list_isins()
+        if not isins:
+            return
+        waited = 0.0
+        while self.fetcher.websocket is None and waited < timeout:
+            await asyncio.sleep(0.5)
+            waited += 0.5
+        for isin in isins:
+            checkpoint = self.checkpoints.load(isin)
+            if checkpoint is None:
+                continue
+            try:
+                await self.add_stock(isin, checkpoint["quantity"], checkpoint.get("strategies", ("default",)))
+            except Exception as e:
+                self.logger.error(f"Failed to restore {isin} from checkpoint: {e}")
+
+    async def recover_orders(self):
+        """Rebuild today's positions & resting target legs from the order journal and reconcile them with the broker.
+
+        One order book fetch resolves every journaled order whose outcome wasn't recorded (crash between send & ack / fill),
+        and seeds the order history (today's orders are never adopted by `reconcile_by_tag`) & the order update cache so
+        the restored legs' fill state is known. The states are applied when the stocks are re-added (`add_stock`).
+        """
+        records = await asyncio.to_thread(self.journal.load)
+        states = recover_positions(records)
+        try:
+            response = await self.order_manager.get_order_book()
+        except Exception as e:
+            response = {'status': 'error', 'errors': str(e)}
+        if response.get('status') != 'success':
+            self.logger.error(f"Order book unavailable, journal recovery not reconciled: {response}")
+            order_book = []
+        else:
+            order_book = response.get('data') or []
+        known = set(self.order_manager.order_history)
+        for order in order_book:
+            if order.get('order_id') not in known:
+                self.order_manager.order_history.append(order['order_id'])
+            self.order_manager.order_updates.publish(order)
+        if not states:
+            return
+        known_order_ids = {record['order_id'] for record in records if record.get('order_id')}
+        for event in reconcile_positions(states, order_book, known_order_ids):
+            self.journal.record(**event)
+        for (isin, strategy), state in states.items():
+            for order in state['pending_orders']:
+                self.order_manager.status_poller.track(order['order_id'])
+            if state['position'] > 0:
+                self.recovered_positions[(isin, strategy)] = state
+        self.logger.info(f"Recovered {len(self.recovered_positions)} open positions from the order journal.")
+
+    async def checkpoint_all(self):
+        """Write a snapshot of every processor (serialized on the event loop, file I/O off it)."""
+        for isin, processor in list(self.processors.items()):
+            if processor.algo is None:
+                continue # not initialized yet...
+            try:
+                data = self.checkpoints.serialize(processor.snapshot()) # consistent copy of the live state...
+                await asyncio.to_thread(self.checkpoints.save, isin, data)
+            except Exception as e:
+                self.logger.error(f"Failed to checkpoint {isin}: {e}")
+
+    async def checkpoint_loop(self):
+        """Periodically checkpoint all the processors for warm restarts."""
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await self.checkpoint_all()
     
     async def run(self):
         """Start the websocket task and other all automation tasks."""
         self.logger.info(f"Starting Stock Manager... <add_stock> <remove_stock>")
         websocket_task = asyncio.create_task(self.fetcher.start_websocket()) #p1
-        await asyncio.gather(websocket_task, *self.tasks)
-        self.logger.info(f"Gathering all tasks: websocket_task, and other 4 StockProcessor's tasks.")
+        checkpoint_task = asyncio.create_task(self.checkpoint_loop())
+        history_task = asyncio.create_task(self.history_recorder.run())
+        keep_warm_task = asyncio.create_task(self.order_manager.keep_warm()) # pooled order connections...
+        order_updates_task = asyncio.create_task(self.order_manager.order_update_stream.run())
+        status_poller_task = asyncio.create_task(self.order_manager.status_poller.run()) # fallback of the order updates
+        journal_task = asyncio.create_task(self.journal.run())
+        try:
+            await self.recover_orders()
+            await self.restore_from_checkpoints()
+            for isin, strategy in self.recovered_positions:
+                self.logger.warning(f"Open position of {isin} [{strategy}] isn't monitored (no checkpoint). Please EXIT it manually or re-add the stock.")
+            await asyncio.gather(websocket_task, checkpoint_task, history_task, keep_warm_task, order_updates_task, status_poller_task, journal_task, *self.tasks)
+            self.logger.info(f"Gathering all tasks: websocket_task, and other 4 StockProcessor's tasks.")
+        finally:
+            await self.history_recorder.close()
+            await self.order_manager.close()
     
\ No newline at end of file
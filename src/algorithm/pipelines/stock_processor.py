@@ -1,80 +1,188 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
 
 from src.algorithm.models.candle import Candle
 from src.algorithm.models.ltpc import LTPC
 from src.algorithm.models.shared_data import precise_indicator_data 
 # 
 from src.algorithm import get_logger
+from src.algorithm.utils import clock
+from src.algorithm.utils.tracing import tracer
+from src.algorithm.utils.event_bus import events
 from src.algorithm.pipelines.data_fetcher import DataFetcher
 from src.algorithm.pipelines.data_preprocessor import DataPreprocessor
 from src.algorithm.pipelines.indicator_pipeline import IndicatorPipeline
 # 
-from src.algorithm.tools.ema import EMA
-from src.algorithm.tools.vwap import VWAP
 from src.algorithm.algo_core.algo import Algorithm
+from src.algorithm.algo_core.strategy import Strategy, get_strategy
 from src.algorithm.core.order_manager import ORDER_MANAGER
 from src.algorithm.core.signal_based_order_manager import SignalBasedOrderManager
+from src.algorithm.utils.columnar_store import ColumnarHistoryRecorder
+from src.algorithm.utils.journal import OrderJournal
+from src.algorithm.core.ledger import PositionLedger
+
+
+SUPPORTED_TIMEFRAMES = ("5min",)
 
 
 class StockProcessor:
-    """_summary_
+    """One instrument's feed, preprocessing & indicator computation shared by all of its strategies.
+
+    Every strategy gets its own `Algorithm` & `SignalBasedOrderManager` (with their own queues), while candles & ticks are
+    consumed once and the indicators are the union of the strategies' declared indicators (computed once per bar).
     """
     
     def __init__(self,
                  isin:str,
                  fetcher:DataFetcher,
                  order_manager:ORDER_MANAGER,
-                 quantity: int):
+                 quantity: int,
+                 history_recorder: ColumnarHistoryRecorder = None,
+                 strategies: Sequence[str] = ("default",),
+                 journal: OrderJournal = None,
+                 ledger: PositionLedger = None):
         """Initialize the StockProcessor Module to execute the algorithm along with order manager.
         
         :param isin(str): Enter an Stock ISIN Number (e.g., 'INE121J01017').
         :param fetcher(DataFetcher): Pass an Instance of DataFetcher Module.
         :param order_manager(ORDER_MANAGER): Pass an Instance of ORDER_MANAGER Module.
         :param quantity(int): Enter the number of Shares (quantity) in integers.
+        :param history_recorder(ColumnarHistoryRecorder): [Optional] Persists every 5-min candle with its indicator values.
+        :param strategies(Sequence[str]): Registered strategy names to run on the instrument (see `algo_core.strategy`).
+        :param journal(OrderJournal): [Optional] Durable order lifecycle journal of the signal managers (crash recovery).
+        :param ledger(PositionLedger): [Optional] Positions & PnL, marked to market on every tick of the instrument.
         """
         
         self.isin = isin
         self.fetcher = fetcher
         self.order_manager = order_manager
         self.quantity = quantity
+        self.history_recorder = history_recorder
+        self.ledger = ledger
         self.logger = get_logger(__name__, isin=isin)
         self.preprocessor = DataPreprocessor()
         self.pipeline = IndicatorPipeline(isin=isin)
-        # Indicators Instances add...
-        self.ema9 = EMA(period=9) 
-        self.ema20 = EMA(period=20) 
-        self.vwap = VWAP()
-        # Pass the indicators to pipeline...
-        self.pipeline.add_indicator("EMA9", self.ema9)
-        self.pipeline.add_indicator("EMA20", self.ema20)
-        self.pipeline.add_indicator("VWAP", self.vwap)
+        # Strategies & the union of their indicators (shared by name: one name must mean the same indicator & parameters)...
+        self.strategies: Dict[str, Strategy] = {name: get_strategy(name) for name in dict.fromkeys(strategies)}
+        if not self.strategies:
+            raise ValueError("At least one strategy is required.")
+        for name, strategy in self.strategies.items():
+            unsupported = set(strategy.timeframes) - set(SUPPORTED_TIMEFRAMES)
+            if unsupported:
+                raise ValueError(f"Strategy '{name}' needs unsupported timeframes {sorted(unsupported)} (supported: {SUPPORTED_TIMEFRAMES})")
+            for indicator_name, factory in strategy.indicators.items():
+                indicator = factory()
+                shared = self.pipeline.indicators.get(indicator_name)
+                if shared is None:
+                    self.pipeline.add_indicator(indicator_name, indicator)
+                elif type(shared) is not type(indicator) or shared.get_state() != indicator.get_state(): # (fresh instances: parameters only)
+                    raise ValueError(f"Strategy '{name}' declares indicator '{indicator_name}' with other parameters than another strategy of {isin}. Rename one of them.")
         # Initialize all the Major Queues (Common Resources)
         self.candle_queue = asyncio.Queue()
         self.ltpc_queue = asyncio.Queue()
-        self.algo_ltpc_queue = asyncio.Queue()
-        self.indicator_queue = asyncio.Queue()
-        self.trade_signal_queue = asyncio.Queue()
-        # Initialize an Algorithm & SignalBasedOrderManager
-        self.algo:Algorithm = None
-        # self.algo = Algorithm(
-        #     algo_ltpc_queue=self.algo_ltpc_queue,
-        #     indicator_queue=self.indicator_queue,
-        #     trade_signal_queue=self.trade_signal_queue,
-        #     isin = self.isin,
-        # )
-        # 
-        self.signal_manager = SignalBasedOrderManager(
-            order_manager = self.order_manager,
-            signal_queue = self.trade_signal_queue,
-            default_quantity = self.quantity,
+        # Per strategy queues...
+        self.algo_ltpc_queues: Dict[str, asyncio.Queue] = {name: asyncio.Queue() for name in self.strategies}
+        self.indicator_queues: Dict[str, asyncio.Queue] = {name: asyncio.Queue() for name in self.strategies}
+        self.trade_signal_queues: Dict[str, asyncio.Queue] = {name: asyncio.Queue() for name in self.strategies}
+        # Initialize an Algorithm & SignalBasedOrderManager per strategy
+        self.algos: Dict[str, Algorithm] = {}
+        self._restored_algo_state: Dict[str, dict] = {}
+        self.signal_managers: Dict[str, SignalBasedOrderManager] = {
+            name: SignalBasedOrderManager(
+                order_manager = self.order_manager,
+                signal_queue = self.trade_signal_queues[name],
+                default_quantity = self.quantity,
+                strategy = name,
+                journal = journal,
+            )
+            for name in self.strategies
+        }
+
+    # Primary (first) strategy's components...
+    @property
+    def primary_strategy(self) -> str:
+        return next(iter(self.strategies))
+
+    @property
+    def algo(self) -> Optional[Algorithm]:
+        return self.algos.get(self.primary_strategy)
+
+    @property
+    def signal_manager(self) -> SignalBasedOrderManager:
+        return self.signal_managers[self.primary_strategy]
+
+    @property
+    def algo_ltpc_queue(self) -> asyncio.Queue:
+        return self.algo_ltpc_queues[self.primary_strategy]
+
+    @property
+    def indicator_queue(self) -> asyncio.Queue:
+        return self.indicator_queues[self.primary_strategy]
+
+    @property
+    def trade_signal_queue(self) -> asyncio.Queue:
+        return self.trade_signal_queues[self.primary_strategy]
+
+    def _indicator_data(self, timestamp: datetime) -> Optional[precise_indicator_data]:
+        """Latest values of all the pipeline indicators (None until every indicator has a value)."""
+        values = {}
+        for name, indicator in self.pipeline.indicators.items():
+            if not indicator.current_value:
+                return None
+            values[name] = indicator.current_value.value
+        return precise_indicator_data(
+            timestamp=timestamp,
+            ema9=values.get("EMA9"),
+            ema20=values.get("EMA20"),
+            vwap=values.get("VWAP"),
+            values=values,
+            #todo volume = first_candle.volume
         )
+
+    async def _publish_indicators(self, indicator_data: precise_indicator_data):
+        for queue in self.indicator_queues.values():
+            await queue.put(indicator_data)
+        if events.wants("indicator", self.isin):
+            events.publish("indicator", self.isin, {"timestamp": indicator_data.timestamp.isoformat(), **indicator_data.values})
         
     # async def initialize(self, date:str):
-    async def initialize(self):
+    async def initialize(self, checkpoint: dict = None):
         """Initialize with historical and intraday data.
+
+        :param checkpoint(dict): [Optional] Today's snapshot (see `snapshot()`); if usable, state is restored from it and only the bars since are gap-filled.
         """
-        date = date = datetime.now().strftime('%Y-%m-%d') 
+        if checkpoint is not None and self.restore(checkpoint):
+            self.logger.info(f"Restored {self.isin} from checkpoint @ {checkpoint['saved_at']}")
+            self._gap_fill()
+        else:
+            self._initialize_from_history()
+
+        first_candle = None
+        if self.preprocessor.five_min_candles or len(self.preprocessor.five_min_candles) > 0:
+            first_candle = self.preprocessor.five_min_candles[0] if (self.preprocessor.five_min_candles[0].timestamp.hour == 9 and self.preprocessor.five_min_candles[0].timestamp.minute == 15) else self.preprocessor.five_min_candles[-1]
+
+        # Push Initial Indicator Values...
+        if self.preprocessor.five_min_candles:
+            indicator_data = self._indicator_data(self.preprocessor.five_min_candles[-1].timestamp)
+            if indicator_data:
+                await self._publish_indicators(indicator_data)
+        for name, strategy in self.strategies.items():
+            self.algos[name] = Algorithm(
+                algo_ltpc_queue=self.algo_ltpc_queues[name],
+                indicator_queue=self.indicator_queues[name],
+                trade_signal_queue=self.trade_signal_queues[name],
+                isin = self.isin,
+                first_candle= first_candle,
+                strategy=strategy,
+                trace=(name == self.primary_strategy),
+            )
+            if self._restored_algo_state.get(name):
+                self.algos[name].set_state(self._restored_algo_state[name])
+
+    def _initialize_from_history(self):
+        """Replay previous day's & today's intraday data to build the indicators (cold start)."""
+        date = date = clock.now().strftime('%Y-%m-%d')
         # Historical Data Fetch & Preprocess:
         historical_candles = self.fetcher.get_historical_data(ISIN=self.isin, date=date)
         self.preprocessor.convert_to_5min_candles(historical_candles[:375]) # Converting previous day's one min candles only
@@ -89,30 +197,60 @@ class StockProcessor:
         self.preprocessor.five_min_candles = self.preprocessor.five_min_candles[75:] # Removing Previous day's 5 mins candles...
         for candle in self.preprocessor.five_min_candles:
             self.pipeline.update_all(candle) # Update all the indicators
-        
-        first_candle = None
-        if self.preprocessor.five_min_candles or len(self.preprocessor.five_min_candles) > 0:
-            first_candle = self.preprocessor.five_min_candles[0] if (self.preprocessor.five_min_candles[0].timestamp.hour == 9 and self.preprocessor.five_min_candles[0].timestamp.minute == 15) else self.preprocessor.five_min_candles[-1]
+            self._record_history(candle)
 
-        # Push Initial Indicator Values...
-        if self.ema9.current_value and self.ema20.current_value and self.vwap.current_value:
-            await self.indicator_queue.put(
-                precise_indicator_data(
-                    timestamp=self.preprocessor.five_min_candles[-1].timestamp,
-                    ema9=self.ema9.current_value.value,
-                    ema20=self.ema20.current_value.value,
-                    vwap=self.vwap.current_value.value,
-                    #todo volume = first_candle.volume
-                )
+    def _gap_fill(self):
+        """Replay only the intraday 1-min candles after the last restored 5-min candle (warm start)."""
+        intraday_candles = self.fetcher.get_intraday_data(ISIN=self.isin)
+        resume_from = None
+        if self.preprocessor.five_min_candles:
+            resume_from = self.preprocessor.five_min_candles[-1].timestamp + timedelta(minutes=5)
+        missing_candles = [candle for candle in intraday_candles if resume_from is None or candle.timestamp >= resume_from]
+        # Partially formed interval is rebuilt from the fetched candles...
+        self.preprocessor.candle_queue.clear()
+        n_restored = len(self.preprocessor.five_min_candles)
+        self.preprocessor.convert_to_5min_candles(missing_candles)
+        for candle in self.preprocessor.five_min_candles[n_restored:]:
+            self.pipeline.update_all(candle)
+            self._record_history(candle)
+        self.logger.info(f"Gap-filled {len(self.preprocessor.five_min_candles) - n_restored} 5-min candles for {self.isin} since checkpoint.")
+
+    def _record_history(self, five_min_candle: Candle):
+        """Queue the 5-min candle with the current indicator values for columnar persistence."""
+        if self.history_recorder is not None:
+            self.history_recorder.record(
+                self.isin,
+                five_min_candle,
+                {name: (value.value if value else None) for name, value in self.pipeline.get_current_values().items()},
             )
-        self.algo = Algorithm(
-            algo_ltpc_queue=self.algo_ltpc_queue,
-            indicator_queue=self.indicator_queue,
-            trade_signal_queue=self.trade_signal_queue,
-            isin = self.isin,
-            first_candle= first_candle
-        )
-        
+
+    def snapshot(self) -> dict:
+        """Compact snapshot of the indicators, preprocessor & algorithm state (for `CheckpointStore`)."""
+        return {
+            "isin": self.isin,
+            "quantity": self.quantity,
+            "strategies": list(self.strategies),
+            "saved_at": clock.now(),
+            "indicators": {name: indicator.get_state() for name, indicator in self.pipeline.indicators.items()},
+            "preprocessor": self.preprocessor.get_state(),
+            "algos": {name: algo.get_state() for name, algo in self.algos.items()},
+        }
+
+    def restore(self, checkpoint: dict) -> bool:
+        """Restore state from today's snapshot.
+
+        :return: False if the snapshot isn't usable (another stock/day or different indicators).
+        """
+        if checkpoint.get("isin") != self.isin or checkpoint["saved_at"].date() != clock.now().date():
+            return False
+        if set(checkpoint["indicators"]) != set(self.pipeline.indicators):
+            return False
+        for name, state in checkpoint["indicators"].items():
+            self.pipeline.indicators[name].set_state(state)
+        self.preprocessor.set_state(checkpoint["preprocessor"])
+        self._restored_algo_state = checkpoint.get("algos") or {}
+        return True
+
     async def process_candles(self):
         """Processes incoming 1-min candles and Handle 5-min candles update. (task-2)"""
 
@@ -121,20 +259,16 @@ class StockProcessor:
             five_min_candle:Candle = self.preprocessor.update_with_realtime_data(candle)
             if five_min_candle:
                 self.pipeline.update_all(five_min_candle)
+                self._record_history(five_min_candle)
                 
-                if self.preprocessor.current_5min_candle and self.vwap.current_value and self.ema9.current_value and self.ema20.current_value:
+                if self.preprocessor.current_5min_candle:
                     #todo curr_volume = five_min_candle.volume
-                    await self.indicator_queue.put(
-                        precise_indicator_data(
-                            timestamp=five_min_candle.timestamp,
-                            ema9=self.ema9.current_value.value,
-                            ema20=self.ema20.current_value.value,
-                            vwap=self.vwap.current_value.value
-                            #todo volume= curr_volume,
-                        )
-                    )
+                    indicator_data = self._indicator_data(five_min_candle.timestamp)
+                    if indicator_data:
+                        await self._publish_indicators(indicator_data)
                 
-            # estimates = (vwap one min calculations with one min candle...)
+            # estimates = (vwap one min calculations with one min candle, superseding its minute's ticks...)
+            self.pipeline.estimate_all(one_min_candle=candle)
         
         
     async def process_ltpc(self):
@@ -145,7 +279,17 @@ class StockProcessor:
             # estimates = (ema calculations with ltpc data...)
             # await self.algo.get_realtime_tradesignal()
             if ltpc:
-                await self.algo_ltpc_queue.put(ltpc)
+                tracer.mark(ltpc.trace_id, "ltpc_queue")
+                if self.ledger is not None:
+                    self.ledger.mark(self.isin, ltpc.ltp)
+                if events.wants("tick", self.isin):
+                    events.publish("tick", self.isin, ltpc.model_dump(mode="json", exclude={"trace_id"}))
+                # in-between (real-time) indicator values; always computed, the VWAP estimate accumulates every tick...
+                estimates = self.pipeline.estimate_all(ltpc=ltpc)
+                if events.wants("estimate", self.isin):
+                    events.publish("estimate", self.isin, estimates)
+                for queue in self.algo_ltpc_queues.values():
+                    await queue.put(ltpc)
     
     async def run(self):
         """Start DataFetcher & Processing Tasks."""
@@ -161,7 +305,7 @@ class StockProcessor:
         return [
             asyncio.create_task(self.process_candles()),
             asyncio.create_task(self.process_ltpc()),
-            asyncio.create_task(self.algo.get_realtime_tradesignal()),
-            asyncio.create_task(self.signal_manager.start_monitoring(isin=self.isin)),
+            *[asyncio.create_task(algo.get_realtime_tradesignal()) for algo in self.algos.values()],
+            *[asyncio.create_task(manager.start_monitoring(isin=self.isin)) for manager in self.signal_managers.values()],
         ]
                 
\ No newline at end of file
@@ -22,6 +22,8 @@ class EMA(Indicator):
 
     """
     
+    inputs = ("close", "timestamp")
+
     def __init__(self, period:int, smoothening_factor: int = None):
         super().__init__()
         self.period = period
@@ -49,18 +51,22 @@ class EMA(Indicator):
         # initializing EMA value [EMA 0]
         self.previous_ema = SMA 
         self.save_value(SMA, historical_candles[-1].timestamp)
-                    
-    def update(self, candle:Candle):
-        """Calculate EMA using the closing price of the 5-minute candles."""
+
+    def initialize_with_history(self, historical_candles: List[Candle]):
+        """Pipeline hook -> `initialize_ema_with_history`."""
+        self.initialize_ema_with_history(historical_candles)
+
+    def update(self, close: float, timestamp: datetime):
+        """Calculate EMA using the closing price of the 5-minute candles (or any other input series' value)."""
         current_ema: Optional[float] = None
         
         if self.previous_ema is None:
             raise ValueError(f"Initial EMA not initialized, use initialize_ema_with_history(historical_candles:List(Candle)) method to initialize.")
         else:
-            current_ema = (self.alpha * candle.close) + ((1 - self.alpha)*(self.previous_ema))
+            current_ema = (self.alpha * close) + ((1 - self.alpha)*(self.previous_ema))
 
         self.previous_ema = current_ema
-        self.save_value(self.previous_ema, candle.timestamp)
+        self.save_value(self.previous_ema, timestamp)
 
 
     def estimate(self, ltpc: LTPC = None):
@@ -1,21 +1,34 @@
+import os
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from abc import ABC, abstractmethod
 
 from src.algorithm.models.candle import Candle
 from src.algorithm.models.ltpc import LTPC
 from src.algorithm.models.indicators import IndicatorModel
+from src.algorithm.utils.columnar_store import ColumnarFile, read_columnar, to_epoch_us
 
 
 class Indicator(ABC):
-    """Base Class for all the indicators | Blueprint."""
+    """Base Class for all the indicators | Blueprint.
+
+    Declared inputs (used by `IndicatorPipeline` to compile its evaluation plan):
+        inputs: Positional inputs of `update` -> pipeline sources ('candle', 'timestamp', 'close', 'hlc3', 'volume') or other
+            indicator names (their latest value, a float).
+        estimate_inputs: Keyword inputs of `estimate` ('ltpc', 'one_min_candle').
+        timeframe: Candle timeframe the indicator is updated on.
+    """
+    inputs: Tuple[str, ...] = ("candle",)
+    estimate_inputs: Tuple[str, ...] = ("ltpc",)
+    timeframe: str = "5min"
+
     def __init__(self):
         self.current_value: Optional[IndicatorModel] = None
         self.history: list[IndicatorModel] = []
         
     @abstractmethod
-    def update(self, candle: Candle):
-        """Update the indicator with the latest 5-minute candle data."""
+    def update(self, *inputs):
+        """Update the indicator with the resolved `inputs` of the latest 5-minute candle (the candle itself by default)."""
         pass
     
     @abstractmethod
@@ -23,15 +36,36 @@ class Indicator(ABC):
         """Estimate the indicator value in real-time between intervals."""
         pass
     
+    def initialize_with_history(self, historical_candles: List[Candle]):
+        """Initialize the indicator with historical candles (no-op by default)."""
+        pass
+
     def save_value(self, value:float, timestamp: datetime):
         """Save the calculated or estimated value."""
         model = IndicatorModel(value=value, timestamp=timestamp)
         self.current_value = model
         self.history.append(model)
         
+    def get_state(self) -> dict:
+        """Snapshot of the indicator's running state (value history excluded) for checkpointing."""
+        return {key: value for key, value in vars(self).items() if key != "history"}
+
+    def set_state(self, state: dict):
+        """Restore the running state from `get_state()` snapshot."""
+        self.__dict__.update(state)
+
     def save_to_file(self, filename: str):
-        with open(filename, 'w') as f:
-            for entry in self.history:
-                f.write(f"{entry.timestamp},{entry.value}\n")
-                
-                
+        """Write the value history as a binary columnar file (timestamp, value) -> read back with `load_from_file`."""
+        if os.path.exists(filename):
+            os.remove(filename)
+        columnar = ColumnarFile(filename, columns=["value"], capacity=max(len(self.history), 1), mode="r+")
+        columnar.append(
+            [to_epoch_us(entry.timestamp) for entry in self.history],
+            {"value": [entry.value for entry in self.history]},
+        )
+        columnar.close()
+
+    @staticmethod
+    def load_from_file(filename: str):
+        """Zero-copy views {'timestamp': int64 epoch-µs, 'value': float64} of a file written by `save_to_file`."""
+        return read_columnar(filename)
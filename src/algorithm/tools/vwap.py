@@ -1,77 +1,275 @@
-from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from datetime import datetime, date, timedelta, timezone
+from typing import List, Optional, Dict, Tuple, Sequence
 from abc import ABC, abstractmethod
 import logging
-# 
+import math
+#
 from src.algorithm.models.candle import Candle
 from src.algorithm.models.ltpc import LTPC
-from src.algorithm.models.indicators import IndicatorModel
-# 
+from src.algorithm.models.indicators import IndicatorModel, VWAPBandsModel
+#
 from src.algorithm.tools.indicator import Indicator
+from src.algorithm.utils import clock
+
+# (Σ price×volume, Σ volume, Σ price²×volume)
+Sums = Tuple[float, int, float]
+ZERO_SUMS: Sums = (0.0, 0, 0.0)
+SESSION_ANCHOR = "session"
+
 
 class VWAP(Indicator):
     """A class to calculate the Volume-Weighted Average Price using HCL3.
-    
+
+    VWAP is anchored to the trading session (reset on the first candle of a new day). Additional anchors
+    (open, swing, event, ...) are stored as snapshots of the cumulative sums, so every anchored VWAP and its
+    σ bands are computed in O(1) from the difference of two cumulative snapshots, without re-scanning history.
 
     Attributes:
-        cumulative_price_volume (float)
-        cumulative_volume (int)
-    
+        cumulative_price_volume (float): Σ(HLC3 × volume) of all confirmed 5-minute candles of the session.
+        cumulative_volume (int): Σ(volume) of all confirmed 5-minute candles of the session.
+        cumulative_price2_volume (float): Σ(HLC3² × volume) of all confirmed 5-minute candles of the session.
+        interval_price_volume (float): Σ(HLC3 × volume) of the 1-minute candles of the in-progress 5-minute interval.
+        interval_volume (int): Σ(volume) of the 1-minute candles of the in-progress 5-minute interval.
+        tick_price_volume (float): Σ(ltp × ltq) of the ticks not yet covered by a 1-minute candle.
+        tick_volume (int): Σ(ltq) of the ticks not yet covered by a 1-minute candle.
+        anchors (Dict[str, Sums]): Cumulative sums snapshot taken at each anchor.
+
     Methods:
-        update(candle: Candle):
-            Calculate VWAP using HLC3 of the 5-minute candle.
-            
-        estimate(one_min_candle: Candle) -> float:
-            Estimate VWAP using the latest 1-minute candle.
-    
+        update(hlc3: float, volume: int, timestamp: datetime):
+            Calculate VWAP using HLC3 & volume of the 5-minute candle.
+
+        estimate(ltpc: LTPC, one_min_candle: Candle) -> float:
+            Estimate VWAP in O(1) using the latest 1-minute candle and/or the latest tick.
+
+        add_anchor(name: str, at: datetime) / remove_anchor(name: str):
+            Maintain additional anchors (e.g. open, swing low, news event).
+
+        get_bands(num_std: Sequence[float], anchor: str, estimated: bool) -> VWAPBandsModel:
+            Anchored VWAP with upper/lower standard-deviation bands.
     """
-    
+
+    inputs = ("hlc3", "volume", "timestamp")
+    estimate_inputs = ("ltpc", "one_min_candle")
+
     def __init__(self):
         super().__init__()
+        self.session_date: Optional[date] = None
         self.cumulative_price_volume = 0.0
         self.cumulative_volume = 0
-        # 1-min in-between candles... 
-        self.estimated_cumulative_price_volume = 0.0
-        self.estimated_cumulative_volume = 0
-        self.one_min_buffer: List[Candle] = []
-    
-    def update(self, candle: Candle):
-        """Calculate VWAP using HLC3 of the 5-minute candle."""
+        self.cumulative_price2_volume = 0.0
+        # 1-min in-between candles (in-progress 5-min interval)...
+        self.interval_price_volume = 0.0
+        self.interval_volume = 0
+        self.interval_price2_volume = 0.0
+        self.minute_contributions: Dict[datetime, Sums] = {}
+        # ticks of minutes whose 1-min candle has not arrived yet...
+        self.tick_price_volume = 0.0
+        self.tick_volume = 0
+        self.tick_price2_volume = 0.0
+        self.tick_contributions: Dict[datetime, Sums] = {}
+        self.interval_start: Optional[datetime] = None
+        # cumulative sums after each confirmed 5-min candle (prefix sums of the session)...
+        self.prefix_timestamps: List[datetime] = []
+        self.prefix_sums: List[Sums] = []
+        self.anchors: Dict[str, Sums] = {SESSION_ANCHOR: ZERO_SUMS}
+
+    def update(self, hlc3: float, volume: int, timestamp: datetime):
+        """Calculate VWAP using HLC3 & volume of the 5-minute candle (pipeline sources)."""
+
+        if self.session_date != timestamp.date():
+            self.reset_session(timestamp)
+
+        price_volume = hlc3 * volume
 
-        hlc3 = (candle.high + candle.low + candle.close) / 3
-        price_volume = hlc3 * candle.volume
-        
         # Σ
         self.cumulative_price_volume += price_volume
-        self.cumulative_volume += candle.volume
+        self.cumulative_volume += volume
+        self.cumulative_price2_volume += hlc3 * price_volume
+        self.prefix_timestamps.append(timestamp)
+        self.prefix_sums.append(self._confirmed_sums())
 
         vwap_value = (self.cumulative_price_volume / self.cumulative_volume) if self.cumulative_volume != 0 else 0
-        self.save_value(vwap_value, candle.timestamp)
-        self.one_min_buffer.clear()
-        
-    
-    def estimate(self, one_min_candle: Candle = None):
-        """Estimate VWAP using the latest 1-minute candle."""
-        
-        if self.current_value is None or one_min_candle is None:
+        self.save_value(vwap_value, timestamp)
+        # 5-min candle is confirmed: drop everything it already covers...
+        self.interval_start = timestamp + timedelta(minutes=5)
+        self._drop_minutes_before(self.interval_start)
+
+    def reset_session(self, session_start: datetime):
+        """Reset all cumulative sums and anchors at the session boundary.
+
+        :param session_start: Timestamp of the first candle of the new session.
+        """
+
+        self.session_date = session_start.date()
+        self.cumulative_price_volume = 0.0
+        self.cumulative_volume = 0
+        self.cumulative_price2_volume = 0.0
+        self.prefix_timestamps.clear()
+        self.prefix_sums.clear()
+        self.anchors = {SESSION_ANCHOR: ZERO_SUMS}
+        self.interval_start = None
+        # previous session's leftovers...
+        self._drop_minutes_before(session_start)
+
+    def estimate(self, ltpc: LTPC = None, one_min_candle: Candle = None):
+        """Estimate VWAP using the latest 1-minute candle and/or the latest tick (LTPC).
+
+        - A revised 1-minute candle for an already seen minute replaces its previous contribution instead of being re-added.
+        - Ticks are accumulated (ltp × ltq) until the 1-minute candle of their minute arrives, which then supersedes them.
+        """
+
+        if self.current_value is None or (one_min_candle is None and ltpc is None):
             return 0.0
-        
-        self.one_min_buffer.append(one_min_candle)
-        
-        buffer_price_volume = sum((candle.high + candle.low + candle.close) / 3 * candle.volume for candle in self.one_min_buffer)
-        buffer_volume = sum(candle.volume for candle in self.one_min_buffer)
-        # hlc3 = (one_min_candle.high + one_min_candle.low + one_min_candle.close) / 3
-        # price_volume = hlc3 * one_min_candle.volume
-        
+
+        if one_min_candle is not None:
+            self._add_one_min_candle(one_min_candle)
+        if ltpc is not None:
+            self._add_tick(ltpc)
+
         # Σ
-        #! BUG Fix: This formula is only valid for suceeding 1-min candle after 5-min completion
-        estimated_cumulative_price_volume = self.cumulative_price_volume + buffer_price_volume
-        estimated_cumulative_volume = self.cumulative_volume + buffer_volume
-        
+        estimated_cumulative_price_volume, estimated_cumulative_volume, _ = self._estimated_sums()
+
         estimated_vwap = (estimated_cumulative_price_volume / estimated_cumulative_volume) if estimated_cumulative_volume != 0 else 0
-        # estimated_cumulative_price_volume = self.cumulative_price_volume + price_volume
-        # estimated_cumulative_volume = self.cumulative_volume + one_min_candle.volume
-        
-        # estimated_vwap = (estimated_cumulative_price_volume / estimated_cumulative_volume) if estimated_cumulative_volume != 0 else 0
         return estimated_vwap
-        
+
+    def add_anchor(self, name: str, at: datetime = None):
+        """Add an anchored VWAP starting from the given time.
+
+        :param name: Anchor name (e.g., 'open', 'swing-low', 'results').
+        :param at: Anchor start; the first confirmed 5-min candle at/after this time is included. (None: from now on)
+        """
+
+        if at is None:
+            self.anchors[name] = self._confirmed_sums()
+            return
+        # last prefix strictly before the anchor time...
+        idx = self._prefix_index_before(at)
+        self.anchors[name] = self.prefix_sums[idx] if idx >= 0 else ZERO_SUMS
+
+    def remove_anchor(self, name: str):
+        """Remove an anchor (session anchor can't be removed)."""
+        if name != SESSION_ANCHOR:
+            self.anchors.pop(name, None)
+
+    def get_anchored_vwap(self, anchor: str = SESSION_ANCHOR, estimated: bool = False) -> float:
+        """Anchored VWAP value in O(1)."""
+        return self.get_bands(num_std=(), anchor=anchor, estimated=estimated).vwap
+
+    def get_bands(self, num_std: Sequence[float] = (1, 2), anchor: str = SESSION_ANCHOR, estimated: bool = False) -> VWAPBandsModel:
+        """Anchored VWAP with standard-deviation bands computed from running Σpv, Σv and Σp²v.
+
+        :param num_std: Band multipliers (k) -> vwap ± k·σ.
+        :param anchor: Anchor name (default: session).
+        :param estimated: Include the in-progress interval (1-min candles & ticks).
+        :raises KeyError: If the anchor doesn't exist.
+        """
+
+        base_pv, base_v, base_p2v = self.anchors[anchor]
+        pv, v, p2v = self._estimated_sums() if estimated else self._confirmed_sums()
+        pv, v, p2v = pv - base_pv, v - base_v, p2v - base_p2v
+
+        vwap_value = pv / v if v > 0 else 0.0
+        variance = (p2v / v - vwap_value * vwap_value) if v > 0 else 0.0
+        std = math.sqrt(variance) if variance > 0 else 0.0
+        timestamp = self.current_value.timestamp if self.current_value else clock.now()
+
+        return VWAPBandsModel(
+            vwap=vwap_value,
+            std=std,
+            upper=[vwap_value + k * std for k in num_std],
+            lower=[vwap_value - k * std for k in num_std],
+            anchor=anchor,
+            timestamp=timestamp,
+        )
+
+    def _confirmed_sums(self) -> Sums:
+        return (self.cumulative_price_volume, self.cumulative_volume, self.cumulative_price2_volume)
+
+    def _estimated_sums(self) -> Sums:
+        return (
+            self.cumulative_price_volume + self.interval_price_volume + self.tick_price_volume,
+            self.cumulative_volume + self.interval_volume + self.tick_volume,
+            self.cumulative_price2_volume + self.interval_price2_volume + self.tick_price2_volume,
+        )
+
+    def _prefix_index_before(self, at: datetime) -> int:
+        """Index of the last confirmed 5-min candle that started before `at` (-1 if none)."""
+        lo, hi = 0, len(self.prefix_timestamps)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.prefix_timestamps[mid] < at:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def _add_one_min_candle(self, candle: Candle):
+        """Add (or replace, if revised) a 1-minute candle contribution to the in-progress interval."""
+
+        minute = candle.timestamp.replace(second=0, microsecond=0)
+        if self.interval_start is not None and minute < self.interval_start:
+            # already part of a confirmed 5-min candle...
+            return
+
+        hlc3 = (candle.high + candle.low + candle.close) / 3
+        price_volume = hlc3 * candle.volume
+        previous = self.minute_contributions.get(minute)
+        if previous is not None:
+            self.interval_price_volume -= previous[0]
+            self.interval_volume -= previous[1]
+            self.interval_price2_volume -= previous[2]
+        self.minute_contributions[minute] = (price_volume, candle.volume, hlc3 * price_volume)
+        self.interval_price_volume += price_volume
+        self.interval_volume += candle.volume
+        self.interval_price2_volume += hlc3 * price_volume
+
+        # 1-min candle now covers the ticks of its minute (and any earlier one)...
+        self._drop_ticks_before(minute + timedelta(minutes=1))
+
+    def _add_tick(self, ltpc: LTPC):
+        """Accumulate a single trade (ltp × ltq) for the minute it belongs to."""
+
+        if not ltpc.ltq:
+            return
+
+        minute = ltpc.ltt.replace(second=0, microsecond=0)
+        if minute in self.minute_contributions or (self.interval_start is not None and minute < self.interval_start):
+            # 1-min candle of this minute is already accounted for...
+            return
+
+        price_volume = ltpc.ltp * ltpc.ltq
+        bucket = self.tick_contributions.get(minute, ZERO_SUMS)
+        self.tick_contributions[minute] = (bucket[0] + price_volume, bucket[1] + ltpc.ltq, bucket[2] + ltpc.ltp * price_volume)
+        self.tick_price_volume += price_volume
+        self.tick_volume += ltpc.ltq
+        self.tick_price2_volume += ltpc.ltp * price_volume
+
+    def _drop_minutes_before(self, boundary: datetime):
+        """Remove 1-minute candle and tick contributions older than the given boundary."""
+
+        for minute in [m for m in self.minute_contributions if m < boundary]:
+            price_volume, volume, price2_volume = self.minute_contributions.pop(minute)
+            self.interval_price_volume -= price_volume
+            self.interval_volume -= volume
+            self.interval_price2_volume -= price2_volume
+        self._drop_ticks_before(boundary)
+
+        if not self.minute_contributions:
+            # avoid float drift once the interval is empty...
+            self.interval_price_volume = 0.0
+            self.interval_volume = 0
+            self.interval_price2_volume = 0.0
+
+    def _drop_ticks_before(self, boundary: datetime):
+        """Remove tick contributions older than the given boundary."""
+
+        for minute in [m for m in self.tick_contributions if m < boundary]:
+            price_volume, volume, price2_volume = self.tick_contributions.pop(minute)
+            self.tick_price_volume -= price_volume
+            self.tick_volume -= volume
+            self.tick_price2_volume -= price2_volume
+
+        if not self.tick_contributions:
+            self.tick_price_volume = 0.0
+            self.tick_volume = 0
+            self.tick_price2_volume = 0.0
@@ -0,0 +1,77 @@
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from src.algorithm import get_logger
+from src.algorithm.utils import clock
+
+
+class CheckpointStore:
+    """Compact binary (pickle) snapshots of the per-stock pipeline state for warm restarts.
+
+    Snapshots are written atomically (temp file + fsync + rename), one file per ISIN per day:
+        `<root>/<YYYY-MM-DD>/<ISIN>.ckpt`
+    so a restarted process only sees complete snapshots of the current session.
+    """
+
+    def __init__(self, root: str = "checkpoints"):
+        self.root = root
+        self.logger = get_logger(__name__)
+
+    def _path(self, isin: str, date: str = None) -> str:
+        date = date or clock.today().strftime('%Y-%m-%d')
+        return os.path.join(self.root, date, f"{isin}.ckpt")
+
+    @staticmethod
+    def serialize(state: Dict[str, Any]) -> bytes:
+        """Pickle a snapshot. Call it on the event loop: snapshots reference the live indicator state, which the loop keeps
+        mutating (only the serialized bytes may be handed to another thread)."""
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, isin: str, data: bytes) -> str:
+        """Atomically write the serialized snapshot of a stock (blocking: run it in a thread from async code).
+
+        :param data: Output of `serialize`.
+        """
+        path = self._path(isin)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def load(self, isin: str) -> Optional[Dict[str, Any]]:
+        """Load today's latest snapshot of a stock (None if missing or unreadable)."""
+        path = self._path(isin)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    def list_isins(self) -> List[str]:
+        """ISINs having a snapshot for today."""
+        directory = os.path.dirname(self._path("_"))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".ckpt")] for name in os.listdir(directory) if name.endswith(".ckpt"))
+
+    def delete(self, isin: str):
+        """Remove today's snapshot of a stock."""
+        path = self._path(isin)
+        if os.path.exists(path):
+            os.remove(path)
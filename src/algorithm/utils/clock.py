@@ -0,0 +1,107 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+
+class SystemClock:
+    """Wall-clock time & real `asyncio.sleep` (production default)."""
+
+    def now(self, tz=None) -> datetime:
+        return datetime.now(tz)
+
+    def today(self) -> datetime:
+        return datetime.today()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, delay: float):
+        await asyncio.sleep(delay)
+
+
+class SimulatedClock:
+    """Discrete-event clock for accelerated replays.
+
+    `now()`/`today()` return the simulated time and `sleep(delay)` parks the coroutine until the replay driver advances the
+    simulated time past its deadline (`advance_to`), so polling delays cost no wall-clock time.
+    """
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.current = start
+        self._sleepers: List[Tuple[datetime, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    def now(self, tz=None) -> datetime:
+        if tz is not None and self.current.tzinfo is not None:
+            return self.current.astimezone(tz)
+        return self.current
+
+    def today(self) -> datetime:
+        return self.current
+
+    def monotonic(self) -> float:
+        return (self.current - self.start).total_seconds()
+
+    async def sleep(self, delay: float):
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.current + timedelta(seconds=delay), next(self._counter), future))
+        await future
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Earliest pending sleep deadline (None if nobody sleeps)."""
+        while self._sleepers and self._sleepers[0][2].done():
+            heapq.heappop(self._sleepers)  # cancelled sleepers...
+        return self._sleepers[0][0] if self._sleepers else None
+
+    def advance_to(self, when: datetime) -> int:
+        """Move simulated time forward and wake every sleeper due by then.
+
+        :return: Number of woken sleepers.
+        """
+        if when > self.current:
+            self.current = when
+        woken = 0
+        while self._sleepers and self._sleepers[0][0] <= self.current:
+            _, _, future = heapq.heappop(self._sleepers)
+            if not future.done():
+                future.set_result(None)
+                woken += 1
+        return woken
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    """Active clock."""
+    return _clock
+
+
+def set_clock(clock) -> None:
+    """Inject a clock (e.g. `SimulatedClock` for replays); `set_clock(SystemClock())` restores wall-clock time."""
+    global _clock
+    _clock = clock
+
+
+def now(tz=None) -> datetime:
+    return _clock.now(tz)
+
+
+def today() -> datetime:
+    return _clock.today()
+
+
+def monotonic() -> float:
+    """Seconds for measuring intervals (rate limits, latencies) on the active clock."""
+    return _clock.monotonic()
+
+
+async def sleep(delay: float):
+    await _clock.sleep(delay)
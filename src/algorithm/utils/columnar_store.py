@@ -0,0 +1,202 @@
+import os
+import json
+import struct
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.algorithm import get_logger
+from src.algorithm.utils import clock
+from src.algorithm.models.candle import Candle
+
+
+MAGIC = b"TPCOL001"
+HEADER_PREFIX = struct.Struct("<8sQI")  # magic, row count, header json length
+ALIGNMENT = 64
+CANDLE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def to_epoch_us(ts: datetime) -> int:
+    """datetime -> epoch microseconds (int64 `timestamp` column; `.view('datetime64[us]')` to read as datetimes)."""
+    return int(round(ts.timestamp() * 1_000_000))
+
+
+class ColumnarFile:
+    """Append-only, memory-mappable columnar file.
+
+    Layout:
+        [magic(8) | row count(uint64) | header length(uint32) | header json | padding] [column 0 × capacity] [column 1 × capacity] ...
+
+    Every column is a contiguous float64/int64 block of `capacity` rows, so a reader gets zero-copy NumPy views of
+    `[:row count]`. The row count is updated only after the rows are written, hence readers always see complete rows.
+    """
+
+    def __init__(self, path: str, columns: Sequence[str] = None, capacity: int = 512, mode: str = "r"):
+        """Open (or create, in "r+" mode with `columns`) a columnar file.
+
+        :param path: File path.
+        :param columns: Float column names (a leading int64 `timestamp` column is always present). Required to create a file.
+        :param capacity: Max rows (a trading day has 375 1-minute bars).
+        :param mode: "r" (read-only views) or "r+" (append).
+        """
+        self.path = path
+        if not os.path.exists(path):
+            if mode == "r" or columns is None:
+                raise FileNotFoundError(path)
+            self._create(path, list(columns), capacity)
+
+        with open(path, "rb") as f:
+            magic, _, header_len = HEADER_PREFIX.unpack(f.read(HEADER_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a columnar file: {path}")
+            header = json.loads(f.read(header_len))
+        self.columns: List[str] = header["columns"]
+        self.capacity: int = header["capacity"]
+        self.data_offset: int = header["data_offset"]
+        self.mode = mode
+        self._memmap = np.memmap(path, dtype=np.uint8, mode=mode)
+        self._row_count = np.ndarray((1,), dtype=np.uint64, buffer=self._memmap, offset=8)
+        self._arrays: Dict[str, np.ndarray] = {
+            name: np.ndarray(
+                (self.capacity,),
+                dtype=np.int64 if name == "timestamp" else np.float64,
+                buffer=self._memmap,
+                offset=self.data_offset + idx * self.capacity * 8,
+            )
+            for idx, name in enumerate(self.columns)
+        }
+
+    @staticmethod
+    def _create(path: str, columns: List[str], capacity: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        columns = ["timestamp"] + [name for name in columns if name != "timestamp"]
+        header = {"columns": columns, "capacity": capacity, "data_offset": 0}
+        # data offset depends on the header length itself -> compute with a placeholder first...
+        header_len = len(json.dumps(header)) + 16
+        data_offset = -(-(HEADER_PREFIX.size + header_len) // ALIGNMENT) * ALIGNMENT
+        header["data_offset"] = data_offset
+        header_bytes = json.dumps(header).encode("utf-8").ljust(header_len)
+        with open(path, "wb") as f:
+            f.write(HEADER_PREFIX.pack(MAGIC, 0, len(header_bytes)))
+            f.write(header_bytes)
+            f.truncate(data_offset + len(columns) * capacity * 8)
+
+    def __len__(self) -> int:
+        return int(self._row_count[0])
+
+    def append(self, timestamps: Sequence[int], values: Dict[str, Sequence[float]]):
+        """Append a batch of rows (missing columns are stored as NaN).
+
+        :raises OverflowError: If the file capacity is exceeded.
+        """
+        n, k = len(self), len(timestamps)
+        if n + k > self.capacity:
+            raise OverflowError(f"{self.path}: capacity of {self.capacity} rows exceeded")
+        self._arrays["timestamp"][n:n + k] = timestamps
+        for name in self.columns[1:]:
+            self._arrays[name][n:n + k] = values.get(name, np.nan)
+        self._memmap.flush()
+        self._row_count[0] = n + k
+        self._memmap.flush()
+
+    def read(self) -> Dict[str, np.ndarray]:
+        """Zero-copy views of all the written rows (column name -> array)."""
+        n = len(self)
+        return {name: array[:n] for name, array in self._arrays.items()}
+
+    def close(self):
+        self._memmap.flush()
+        del self._arrays, self._row_count, self._memmap
+
+
+def read_columnar(path: str) -> Dict[str, np.ndarray]:
+    """Open a columnar file read-only and return zero-copy column views."""
+    return ColumnarFile(path, mode="r").read()
+
+
+class ColumnarHistoryRecorder:
+    """Background writer of per-instrument candles + indicator values.
+
+    One file per instrument per day: `<root>/<YYYY-MM-DD>/<ISIN>.col` (columns: timestamp, OHLCV, indicators...), the
+    indicator columns being the ones recorded for the instrument (its pipeline's indicators) when its file is created.
+    `record()` is a non-blocking enqueue from the trading loop; `run()` appends the queued rows in batches
+    every `flush_interval` seconds from a worker thread.
+    """
+
+    def __init__(self, root: str = "history", flush_interval: float = 5.0, capacity: int = 512):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.files: Dict[str, ColumnarFile] = {}
+        self._lock = threading.Lock() # a batch still being written by a cancelled `run()` vs `close()`
+        self.logger = get_logger(__name__)
+
+    def path(self, isin: str, date: str = None) -> str:
+        date = date or clock.today().strftime('%Y-%m-%d')
+        return os.path.join(self.root, date, f"{isin}.col")
+
+    def record(self, isin: str, candle: Candle, indicator_values: Dict[str, Optional[float]] = None):
+        """Queue a candle (and the indicator values computed on it) for persistence."""
+        row = {name: getattr(candle, name) for name in CANDLE_COLUMNS}
+        for name, value in (indicator_values or {}).items():
+            row[name] = np.nan if value is None else value
+        self.queue.put_nowait((isin, candle.timestamp, row))
+
+    def _write_batch(self, batch: List[Tuple[str, datetime, Dict[str, float]]]):
+        with self._lock:
+            self._write_rows(batch)
+
+    def _write_rows(self, batch: List[Tuple[str, datetime, Dict[str, float]]]):
+        grouped: Dict[str, List[Tuple[datetime, Dict[str, float]]]] = {}
+        for isin, ts, row in batch:
+            grouped.setdefault(self.path(isin, ts.strftime('%Y-%m-%d')), []).append((ts, row))
+        for path, rows in grouped.items():
+            columnar = self.files.get(path)
+            if columnar is None:
+                indicator_names = dict.fromkeys(name for _, row in rows for name in row if name not in CANDLE_COLUMNS)
+                columnar = self.files[path] = ColumnarFile(path, columns=CANDLE_COLUMNS + list(indicator_names), capacity=self.capacity, mode="r+")
+            # rows already persisted (e.g. replayed after a restart) are skipped...
+            last_ts = int(columnar.read()["timestamp"][-1]) if len(columnar) else None
+            rows = [(to_epoch_us(ts), row) for ts, row in rows]
+            rows = [(ts, row) for ts, row in rows if last_ts is None or ts > last_ts]
+            if rows:
+                columnar.append(
+                    [ts for ts, _ in rows],
+                    {name: [row.get(name, np.nan) for _, row in rows] for name in columnar.columns[1:]},
+                )
+
+    async def flush(self):
+        """Write everything queued so far."""
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        if batch:
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                self.logger.error(f"Failed to persist {len(batch)} history rows: {e}")
+
+    async def run(self):
+        """Background batch writer task."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        """Write the queued rows & close every open file (shutdown)."""
+        await self.flush()
+        await asyncio.to_thread(self._close_files)
+
+    def _close_files(self):
+        with self._lock:
+            files, self.files = self.files, {}
+            for columnar in files.values():
+                columnar.close()
+
+    def load_day(self, isin: str, date: str = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of an instrument's day (see `read_columnar`)."""
+        return read_columnar(self.path(isin, date))
@@ -0,0 +1,152 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.algorithm import get_logger
+from src.algorithm.utils import clock
+
+
+TOPICS = ("tick", "estimate", "indicator", "signal", "order")
+CONFLATED_TOPICS = ("tick", "estimate", "indicator") # only the latest value per ISIN matters (conflated per subscriber)
+
+
+class Subscription:
+    """One client's filtered view of the `EventBus` with a bounded buffer.
+
+    Tick / estimate / indicator events are conflated on arrival (only the latest one per (topic, ISIN) is kept), so a
+    client reading at its own (throttled) rate never falls behind on them. Signals & order events are all delivered, in
+    order; a client letting `max_buffer` of them pile up is dropped (its stream ends) instead of ever blocking the
+    publishers.
+    """
+
+    def __init__(self, bus: "EventBus", isins: Optional[Iterable[str]] = None, topics: Optional[Iterable[str]] = None, max_buffer: int = 512):
+        self.bus = bus
+        self.isins: Optional[Set[str]] = set(isins) if isins else None # None -> every ISIN
+        self.topics: Set[str] = set(topics) if topics else set(TOPICS)
+        self.max_buffer = max_buffer
+        self.pending: Deque[Tuple[int, dict]] = deque() # (sequence, event) of the non-conflated events
+        self.latest: Dict[Tuple[str, str], Tuple[int, dict]] = {} # (topic, isin) -> (sequence, latest event)
+        self._sequence = 0
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self.delivered = 0
+        self.conflated = 0
+
+    @property
+    def buffered(self) -> int:
+        return len(self.pending) + len(self.latest)
+
+    def offer(self, event: dict):
+        """Non-blocking enqueue (called by the bus); overflowing signals / order events drop the subscriber."""
+        if self.closed:
+            return
+        self._sequence += 1
+        if event["topic"] in CONFLATED_TOPICS:
+            key = (event["topic"], event["isin"])
+            if key in self.latest:
+                self.conflated += 1
+            self.latest[key] = (self._sequence, event)
+        elif len(self.pending) >= self.max_buffer:
+            self.bus.drop(self, reason="slow consumer")
+            return
+        else:
+            self.pending.append((self._sequence, event))
+        self._ready.set()
+
+    def close(self, reason: str = None):
+        if self.closed:
+            return
+        self.closed = True
+        self.close_reason = reason
+        # free the buffer & wake the reader (end of stream)...
+        self.pending.clear()
+        self.latest.clear()
+        self._ready.set()
+
+    async def batches(self, max_rate: float = None) -> AsyncIterator[List[dict]]:
+        """Yield the buffered events in batches (in publishing order), at most `max_rate` batches per second
+        (server-side throttling)."""
+        interval = 1 / max_rate if max_rate else 0.0
+        next_batch = 0.0
+        while True:
+            await self._ready.wait()
+            wait = next_batch - clock.monotonic()
+            if wait > 0 and not self.closed:
+                await clock.sleep(wait)
+            if self.closed:
+                return
+            self._ready.clear()
+            batch = sorted([*self.pending, *self.latest.values()], key=lambda item: item[0])
+            self.pending.clear()
+            self.latest.clear()
+            next_batch = clock.monotonic() + interval
+            self.delivered += len(batch)
+            yield [event for _, event in batch]
+
+
+class EventBus:
+    """In-process pub-sub of the per-ISIN market & trading events (ticks, estimated / confirmed indicators, signals,
+    order updates) feeding the API's streaming endpoints.
+
+    Publishers first ask `wants(topic, isin)` (O(1)) so nothing is built or serialized while nobody listens.
+    """
+
+    def __init__(self):
+        self.subscriptions: Set[Subscription] = set()
+        self._wanted: Dict[str, Dict[Optional[str], int]] = {topic: {} for topic in TOPICS} # topic -> {isin | None: subscribers}
+        self.dropped = 0
+        self.logger = get_logger(__name__)
+
+    def subscribe(self, isins: Optional[Iterable[str]] = None, topics: Optional[Iterable[str]] = None, max_buffer: int = 512) -> Subscription:
+        """:raises ValueError: On unknown topics."""
+        unknown = set(topics or ()) - set(TOPICS)
+        if unknown:
+            raise ValueError(f"Unknown topics {sorted(unknown)}. Available: {list(TOPICS)}")
+        subscription = Subscription(self, isins, topics, max_buffer)
+        self.subscriptions.add(subscription)
+        self._count(subscription, +1)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, reason: str = None):
+        if subscription in self.subscriptions:
+            self.subscriptions.discard(subscription)
+            self._count(subscription, -1)
+        subscription.close(reason)
+
+    def drop(self, subscription: Subscription, reason: str):
+        self.dropped += 1
+        self.logger.warning(f"Dropping stream subscriber ({reason}) after {subscription.delivered} events.")
+        self.unsubscribe(subscription, reason)
+
+    def _count(self, subscription: Subscription, delta: int):
+        for topic in subscription.topics:
+            wanted = self._wanted[topic]
+            for isin in (subscription.isins or (None,)):
+                wanted[isin] = wanted.get(isin, 0) + delta
+                if not wanted[isin]:
+                    del wanted[isin]
+
+    def wants(self, topic: str, isin: str) -> bool:
+        """True if some subscriber would receive the event."""
+        wanted = self._wanted[topic]
+        return bool(wanted) and (None in wanted or isin in wanted)
+
+    def publish(self, topic: str, isin: str, data: dict):
+        """Fan the event out to the matching subscribers (never blocks)."""
+        if not self.wants(topic, isin):
+            return
+        event = {"topic": topic, "isin": isin, "ts": clock.now().isoformat(), "data": data}
+        for subscription in list(self.subscriptions):
+            if topic in subscription.topics and (subscription.isins is None or isin in subscription.isins):
+                subscription.offer(event)
+
+    def get_stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscriptions),
+            "dropped": self.dropped,
+            "buffered": sorted((subscription.buffered for subscription in self.subscriptions), reverse=True),
+        }
+
+
+events = EventBus()
@@ -0,0 +1,170 @@
+import os
+import json
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from src.algorithm import get_logger
+from src.algorithm.utils import clock
+
+
+# Journal events...
+INTENT = "intent"       # order about to be sent (tag, side, quantity, role)
+ACK = "ack"             # broker accepted the order (order id)
+FILL = "fill"           # order reached a terminal state (filled quantity, average price, status)
+CANCEL = "cancel"       # order cancelled by us
+POSITION = "position"   # shares held by an (isin, strategy) & its resting target legs (after every position change)
+
+ROLE_ENTRY = "entry"
+ROLE_TARGET = "target"
+ROLE_EXIT = "exit"
+
+
+class OrderJournal:
+    """Append-only, fsync-batched journal of the order lifecycle (for crash recovery).
+
+    One JSON line per event in `<root>/<YYYY-MM-DD>/orders.jsonl`. `record()` is a non-blocking enqueue from the order
+    handlers; `run()` writes the queued events every `flush_interval` seconds from a worker thread with a single fsync
+    per batch, so the order hot path never waits on disk (an event is durable at most `flush_interval` seconds later).
+    """
+
+    def __init__(self, root: str = "journal", flush_interval: float = 0.2):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.written = 0
+        self.logger = get_logger(__name__)
+
+    def path(self, date: str = None) -> str:
+        date = date or clock.today().strftime('%Y-%m-%d')
+        return os.path.join(self.root, date, "orders.jsonl")
+
+    def record(self, event: str, isin: str, strategy: str, **fields: Any):
+        """Queue a journal event (O(1), no I/O)."""
+        self.queue.put_nowait({"ts": clock.now().isoformat(), "event": event, "isin": isin, "strategy": strategy, **fields})
+
+    def _write_batch(self, batch: List[dict]):
+        path = self.path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = "".join(json.dumps(record, default=str) + "\n" for record in batch)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def flush(self):
+        """Write everything queued so far (one fsync)."""
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        if batch:
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.logger.error(f"Failed to journal {len(batch)} order events: {e}")
+
+    async def run(self):
+        """Background batch writer task."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            await self.flush()
+
+    def load(self, date: str = None) -> List[dict]:
+        """Read a day's journal (a torn last line of a crashed write is ignored)."""
+        path = self.path(date)
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    self.logger.warning(f"Skipping torn journal line in {path}")
+        return records
+
+
+def recover_positions(records: List[dict]) -> Dict[Tuple[str, str], dict]:
+    """Rebuild the order manager state of every (isin, strategy) from journal records.
+
+    :return: {(isin, strategy): state} for the keys not known to be flat, where state is
+        - "position": shares held as of the last `POSITION` event.
+        - "pending_orders": profit target legs resting as of the last event ([{order_id, tag, quantity}, ...]).
+        - "executed_orders": filled orders ([{order_id, tag}, ...]).
+        - "in_flight": entries / exits without a recorded fill, and intents of any role without a recorded ack
+          (`order_id` None); both are resolved against the broker's order book by `reconcile_positions`.
+    """
+    states: Dict[Tuple[str, str], dict] = {}
+    for record in records:
+        key = (record["isin"], record["strategy"])
+        state = states.setdefault(key, {"position": 0, "legs": {}, "pending": [], "executed_orders": [], "in_flight": {}})
+        event = record["event"]
+        if event == INTENT:
+            state["in_flight"][record["tag"]] = {field: record.get(field) for field in ("tag", "role", "quantity")} | {"order_id": None}
+        elif event == ACK:
+            order = state["in_flight"].pop(record["tag"], None) or {field: record.get(field) for field in ("tag", "role", "quantity")}
+            order["order_id"] = record["order_id"]
+            if order["role"] == ROLE_TARGET:
+                state["legs"][order["order_id"]] = {"order_id": order["order_id"], "tag": order["tag"], "quantity": order["quantity"]}
+                state["pending"].append(order["order_id"])
+            else:
+                state["in_flight"][order["order_id"]] = order
+        elif event == FILL:
+            state["in_flight"].pop(record["order_id"], None)
+            if record.get("filled_quantity"):
+                state["executed_orders"].append({"order_id": record["order_id"], "tag": record.get("tag")})
+        elif event == POSITION:
+            state["position"] = record["position"]
+            state["pending"] = list(record.get("pending_orders") or [])
+    recovered = {}
+    for key, state in states.items():
+        if state["position"] <= 0 and not state["in_flight"]:
+            continue
+        recovered[key] = {
+            "position": state["position"],
+            "pending_orders": [state["legs"][order_id] for order_id in state["pending"] if order_id in state["legs"]],
+            "executed_orders": state["executed_orders"],
+            "in_flight": list(state["in_flight"].values()),
+        }
+    return recovered
+
+
+def reconcile_positions(states: Dict[Tuple[str, str], dict], order_book: List[dict], known_order_ids: set) -> List[dict]:
+    """Apply the broker's view (one order book fetch) to the recovered states, in place.
+
+    In-flight orders are looked up by order id (or by tag among the orders unknown to the journal when the ack wasn't
+    journaled): filled entries / exits adjust the position & found target legs become pending again. Orders the broker
+    never received are dropped.
+
+    :return: The journal events describing the resolutions (to be appended to the journal).
+    """
+    by_id = {order.get("order_id"): order for order in order_book}
+    by_tag: Dict[str, dict] = {}
+    for order in order_book: # latest order of each tag...
+        if order.get("order_id") not in known_order_ids:
+            by_tag[order.get("tag")] = order
+    events = []
+    for (isin, strategy), state in states.items():
+        for order in state.pop("in_flight"):
+            broker_order = by_id.get(order["order_id"]) if order["order_id"] else by_tag.pop(order["tag"], None)
+            if broker_order is None:
+                continue # never reached the broker...
+            order_id = broker_order["order_id"]
+            if order["order_id"] is None:
+                events.append({"event": ACK, "isin": isin, "strategy": strategy, "order_id": order_id, **{field: order[field] for field in ("tag", "role", "quantity")}})
+            if order["role"] == ROLE_TARGET:
+                state["pending_orders"].append({"order_id": order_id, "tag": order["tag"], "quantity": order["quantity"]})
+                continue
+            filled_quantity = broker_order.get("filled_quantity") or 0
+            if filled_quantity:
+                state["position"] += filled_quantity if order["role"] == ROLE_ENTRY else -filled_quantity
+                state["executed_orders"].append({"order_id": order_id, "tag": order["tag"]})
+            events.append({"event": FILL, "isin": isin, "strategy": strategy, "order_id": order_id, "tag": order["tag"],
+                           "status": broker_order.get("status"), "filled_quantity": filled_quantity, "price": broker_order.get("average_price")})
+        state["position"] = max(0, state["position"])
+        events.append({"event": POSITION, "isin": isin, "strategy": strategy, "position": state["position"],
+                       "pending_orders": [order["order_id"] for order in state["pending_orders"]]})
+    return events
@@ -0,0 +1,125 @@
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+# Stage boundaries of a tick's path (in order): websocket message received -> ... -> order filled.
+STAGES = (
+    "decode",        # protobuf decoded into an LTPC (DataFetcher)
+    "ltpc_queue",    # StockProcessor took it from its ltpc queue
+    "algo_queue",    # Algorithm took it from algo_ltpc_queue
+    "signal",        # strategy evaluated (compute_trade_signal)
+    "signal_queue",  # SignalBasedOrderManager took the signal
+    "rate_limit",    # 'place' token granted (OrderPlacementQueue)
+    "ack",           # broker acknowledged the order (order id)
+    "fill",          # order complete
+)
+N_BUCKETS = 40  # log2 buckets of µs (bucket i: [2^(i-1), 2^i) µs)
+
+# Trace of the order being placed by the current task (set by SignalBasedOrderManager, read by OrderPlacementQueue)
+current_trace: ContextVar[Optional[int]] = ContextVar("current_trace", default=None)
+
+
+class Histogram:
+    """Fixed log2-bucket latency histogram (O(1) record)."""
+    __slots__ = ("counts", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * N_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        self.counts[min((ns // 1000).bit_length(), N_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (µs) of the bucket holding the q-quantile."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(2 ** i)
+        return float(2 ** (N_BUCKETS - 1))
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_us": (self.total_ns / self.count / 1000) if self.count else 0.0,
+            "p50_us": self.percentile(0.50),
+            "p90_us": self.percentile(0.90),
+            "p99_us": self.percentile(0.99),
+            "max_us": self.max_ns / 1000,
+        }
+
+
+class Tracer:
+    """Lightweight tick-to-fill tracer.
+
+    A trace id is attached to every tick (`LTPC.trace_id`, then `SIGNAL.trace_id`); `mark(trace_id, stage)` records the
+    monotonic time at a stage boundary and feeds the stage's latency (since the previous mark) into its histogram.
+    Finished traces also feed the end-to-end histogram ('total'). At most `max_active` traces are kept open.
+    """
+
+    def __init__(self, max_active: int = 10000):
+        self.enabled = True
+        self.max_active = max_active
+        self._ids = itertools.count(1)
+        self._last: Dict[int, int] = {}   # trace_id -> last mark (ns)
+        self._start: Dict[int, int] = {}  # trace_id -> start (ns)
+        self.histograms: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES + ("total",)}
+
+    def start(self, at_ns: int = None) -> Optional[int]:
+        """Open a trace (e.g. when the websocket message arrived) and return its id."""
+        if not self.enabled:
+            return None
+        if len(self._start) >= self.max_active:
+            oldest = next(iter(self._start))
+            self._start.pop(oldest)
+            self._last.pop(oldest, None)
+        trace_id = next(self._ids)
+        now = time.perf_counter_ns() if at_ns is None else at_ns
+        self._start[trace_id] = now
+        self._last[trace_id] = now
+        return trace_id
+
+    def mark(self, trace_id: Optional[int], stage: str):
+        """Record a stage boundary of the trace (no-op for untraced items)."""
+        if trace_id is None:
+            return
+        last = self._last.get(trace_id)
+        if last is None:
+            return
+        now = time.perf_counter_ns()
+        self._last[trace_id] = now
+        self.histograms[stage].record(now - last)
+
+    def finish(self, trace_id: Optional[int]):
+        """Close the trace (filled, or ended without an order) and record its total latency."""
+        if trace_id is None:
+            return
+        start = self._start.pop(trace_id, None)
+        last = self._last.pop(trace_id, None)
+        if start is not None:
+            self.histograms["total"].record(last - start)
+
+    def discard(self, trace_id: Optional[int]):
+        """Drop the trace without recording its total (e.g. ticks without any order)."""
+        self._start.pop(trace_id, None)
+        self._last.pop(trace_id, None)
+
+    def get_histograms(self) -> Dict[str, dict]:
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def reset(self):
+        self.histograms = {stage: Histogram() for stage in STAGES + ("total",)}
+
+
+tracer = Tracer()
@@ -0,0 +1,15 @@
+from datetime import datetime
+
+import pytest
+
+from src.algorithm.utils import clock
+from src.algorithm.utils.clock import SimulatedClock, SystemClock
+
+
+@pytest.fixture
+def sim_clock():
+    """Simulated clock injected for the test (restored to wall-clock time afterwards)."""
+    simulated = SimulatedClock(datetime(2025, 1, 6, 9, 15))
+    clock.set_clock(simulated)
+    yield simulated
+    clock.set_clock(SystemClock())
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.algorithm.algo_core.backtest import VectorizedBacktester, BUY, SELL, IST
+from src.algorithm.utils.columnar_store import to_epoch_us
+
+
+OPEN = datetime(2025, 1, 6, 9, 15, tzinfo=IST)
+
+
+def make_day(high, low=None, close=None, open_=None):
+    """1-min day arrays (prices default to the highs)."""
+    high = np.asarray(high, dtype=np.float64)
+    close = high if close is None else np.asarray(close, dtype=np.float64)
+    return {
+        "timestamp": np.array([to_epoch_us(OPEN + timedelta(minutes=i)) for i in range(len(high))], dtype=np.int64),
+        "open": close if open_ is None else np.asarray(open_, dtype=np.float64),
+        "high": high,
+        "low": close if low is None else np.asarray(low, dtype=np.float64),
+        "close": close,
+        "volume": np.full(len(high), 100.0),
+    }
+
+
+def rule(**signals):
+    """Signal rule with BUY / SELL at the given bar indexes."""
+    def signal_rule(day):
+        out = np.zeros(len(day["close"]), dtype=np.int8)
+        out[signals.get("buys", [])] = BUY
+        out[signals.get("sells", [])] = SELL
+        return out
+    return signal_rule
+
+
+def fills(trade):
+    return [(fill.label, pytest.approx(fill.price), fill.quantity) for fill in trade.fills]
+
+
+def test_targets_fill_and_the_rest_exits_at_end_of_day():
+    day = make_day(high=[100, 101.2, 102.5, 101.5], close=[100, 100.5, 101, 101])
+    backtester = VectorizedBacktester(quantity=100, signal_rule=rule(buys=[0]))
+
+    [trade] = backtester.run_day("A", day)
+
+    assert fills(trade) == [("BUY", 100, 100), ("T1", 101, 50), ("T2", 102, 10), ("EOD", 101, 40)]
+    assert trade.pnl == pytest.approx(50 * 1 + 10 * 2 + 40 * 1)
+    assert trade.exit_time == OPEN + timedelta(minutes=3)
+
+
+def test_sell_signal_exits_at_its_bar_close():
+    day = make_day(high=[100, 101, 100.5, 104, 104], close=[100, 100.5, 99, 104, 104])
+    backtester = VectorizedBacktester(quantity=10, signal_rule=rule(buys=[0], sells=[2]))
+
+    [trade] = backtester.run_day("A", day)
+
+    # targets touched after the SELL signal don't count...
+    assert fills(trade) == [("BUY", 100, 10), ("T1", 101, 5), ("SELL", 99, 5)]
+    assert trade.pnl == pytest.approx(5 * 1 - 5 * 1)
+
+
+def test_stop_is_resolved_before_targets_on_the_same_bar():
+    day = make_day(high=[100, 101.5, 100], low=[100, 97.5, 99], close=[100, 99, 99], open_=[100, 99.5, 99])
+    backtester = VectorizedBacktester(quantity=10, signal_rule=rule(buys=[0]), stop_level=-2)
+
+    [trade] = backtester.run_day("A", day)
+
+    assert fills(trade) == [("BUY", 100, 10), ("SL", 98, 10)]
+    assert trade.pnl == pytest.approx(-20)
+
+
+def test_all_targets_filled_frees_the_next_entry():
+    day = make_day(high=[100, 105, 100, 100, 100], close=[100, 104, 100, 100, 100])
+    backtester = VectorizedBacktester(quantity=20, signal_rule=rule(buys=[0, 1, 2]))
+
+    first, second = backtester.run_day("A", day)
+
+    assert [fill.label for fill in first.fills] == ["BUY", "T1", "T2", "T3", "T4"]
+    assert first.exit_time == OPEN + timedelta(minutes=1)
+    # the BUY of bar 1 overlaps the first trade...
+    assert second.entry_time == OPEN + timedelta(minutes=2)
+    assert [fill.label for fill in second.fills] == ["BUY", "EOD"]
+
+
+def test_run_aggregates_the_days():
+    day = make_day(high=[100, 101.2, 102.5, 101.5], close=[100, 100.5, 101, 101])
+    backtester = VectorizedBacktester(quantity=100, signal_rule=rule(buys=[0]))
+
+    report = backtester.run({"A": [day, day], "B": [make_day(high=[100])]})
+
+    assert len(report.trades) == 2
+    assert report.pnl_by_isin == {"A": pytest.approx(220.0), "B": 0.0}
+    assert report.win_rate == 1.0
+    assert report.bars == 9
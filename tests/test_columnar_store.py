@@ -0,0 +1,76 @@
+import asyncio
+import math
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from src.algorithm.models.candle import Candle
+from src.algorithm.utils.columnar_store import ColumnarFile, ColumnarHistoryRecorder, read_columnar, to_epoch_us
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "day" / "A.col")
+    columnar = ColumnarFile(path, columns=["close", "ema"], capacity=8, mode="r+")
+    columnar.append([1, 2], {"close": [10.0, 11.0], "ema": [9.5, 10.0]})
+    columnar.append([3], {"close": [12.0]})
+    columnar.close()
+
+    data = read_columnar(path)
+
+    assert list(data) == ["timestamp", "close", "ema"]
+    assert data["timestamp"].dtype == np.int64
+    assert data["timestamp"].tolist() == [1, 2, 3]
+    assert data["close"].tolist() == [10.0, 11.0, 12.0]
+    assert data["ema"][:2].tolist() == [9.5, 10.0]
+    assert math.isnan(data["ema"][2]) # missing columns are NaN...
+
+
+def test_reopened_file_keeps_appending(tmp_path):
+    path = str(tmp_path / "A.col")
+    columnar = ColumnarFile(path, columns=["close"], capacity=4, mode="r+")
+    columnar.append([1], {"close": [10.0]})
+    columnar.close()
+
+    columnar = ColumnarFile(path, columns=["ignored"], mode="r+")
+    columnar.append([2], {"close": [11.0]})
+
+    assert columnar.columns == ["timestamp", "close"]
+    assert columnar.read()["close"].tolist() == [10.0, 11.0]
+    with pytest.raises(OverflowError):
+        columnar.append([3, 4, 5], {"close": [1.0, 2.0, 3.0]})
+    assert len(columnar) == 2
+    columnar.close()
+
+
+def test_missing_and_foreign_files_are_rejected(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_columnar(str(tmp_path / "missing.col"))
+    foreign = tmp_path / "foreign.col"
+    foreign.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        read_columnar(str(foreign))
+
+
+def test_history_recorder_columns_follow_the_recorded_indicators(tmp_path, sim_clock):
+    recorder = ColumnarHistoryRecorder(root=str(tmp_path))
+    start = sim_clock.now()
+    candles = [Candle(timestamp=start + timedelta(minutes=5 * i), open=1, high=2, low=0.5, close=1.5, volume=10) for i in range(3)]
+
+    async def record():
+        for i, candle in enumerate(candles[:2]):
+            recorder.record("A", candle, {"EMA9": 1.0 + i, "RSI14": None})
+        await recorder.flush()
+        recorder.record("A", candles[1], {"EMA9": 9.0}) # replayed after a restart...
+        recorder.record("A", candles[2], {"EMA9": 3.0})
+        await recorder.close()
+
+    asyncio.run(record())
+    data = recorder.load_day("A")
+
+    assert recorder.path("A") == str(tmp_path / "2025-01-06" / "A.col")
+    assert list(data) == ["timestamp", "open", "high", "low", "close", "volume", "EMA9", "RSI14"]
+    assert data["timestamp"].tolist() == [to_epoch_us(candle.timestamp) for candle in candles]
+    assert data["EMA9"].tolist() == [1.0, 2.0, 3.0]
+    assert np.isnan(data["RSI14"]).all()
+    assert recorder.files == {}
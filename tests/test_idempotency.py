@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from src.algorithm.core.idempotency import IdempotencyCache
+
+
+def test_duplicate_is_suppressed_until_ttl(sim_clock):
+    cache = IdempotencyCache(ttl=60)
+    key = ("INE000A01010", "default", sim_clock.now())
+
+    assert cache.acquire(key)
+    assert not cache.acquire(key)
+    assert cache.suppressed == 1
+
+    sim_clock.advance_to(sim_clock.now() + timedelta(seconds=59))
+    assert key in cache
+    sim_clock.advance_to(sim_clock.now() + timedelta(seconds=1))
+    assert key not in cache
+    assert cache.acquire(key)
+    assert cache.get_stats() == {"keys": 1, "acquired": 2, "suppressed_duplicates": 1}
+
+
+def test_release_allows_retry(sim_clock):
+    cache = IdempotencyCache(ttl=60)
+
+    assert cache.acquire("setup")
+    cache.release("setup")
+    assert cache.acquire("setup")
+    assert cache.suppressed == 0
+
+
+def test_oldest_keys_are_evicted_beyond_max_size(sim_clock):
+    cache = IdempotencyCache(ttl=60, max_size=2)
+    for key in ("a", "b", "c"):
+        assert cache.acquire(key)
+
+    assert "a" not in cache
+    assert "b" in cache and "c" in cache
+    assert cache.acquire("a") # evicted keys can be claimed again...
+    assert "b" not in cache
@@ -0,0 +1,111 @@
+import asyncio
+import os
+
+from src.algorithm.utils.journal import (
+    OrderJournal, recover_positions, reconcile_positions,
+    INTENT, ACK, FILL, POSITION, ROLE_ENTRY, ROLE_TARGET, ROLE_EXIT,
+)
+
+
+KEY = ("INE000A01010", "default")
+
+
+def event(name: str, **fields) -> dict:
+    return {"ts": "2025-01-06T09:20:00", "event": name, "isin": KEY[0], "strategy": KEY[1], **fields}
+
+
+def entry(tag: str, order_id: str, quantity: int = 10) -> list:
+    return [
+        event(INTENT, tag=tag, role=ROLE_ENTRY, quantity=quantity),
+        event(ACK, tag=tag, role=ROLE_ENTRY, quantity=quantity, order_id=order_id),
+        event(FILL, tag=tag, order_id=order_id, status="complete", filled_quantity=quantity, price=100.0),
+    ]
+
+
+def targets(*legs) -> list:
+    records = [event(INTENT, tag=tag, role=ROLE_TARGET, quantity=quantity) for tag, _, quantity in legs]
+    records += [event(ACK, tag=tag, role=ROLE_TARGET, quantity=quantity, order_id=order_id) for tag, order_id, quantity in legs]
+    return records
+
+
+def test_open_position_and_resting_legs_are_recovered():
+    records = entry("BUY-1", "B1") + [event(POSITION, position=10, pending_orders=[])]
+    records += targets(("T1-1", "S1", 5), ("T2-1", "S2", 5))
+    records += [event(POSITION, position=10, pending_orders=["S1", "S2"])]
+
+    states = recover_positions(records)
+
+    assert states == {KEY: {
+        "position": 10,
+        "pending_orders": [{"order_id": "S1", "tag": "T1-1", "quantity": 5}, {"order_id": "S2", "tag": "T2-1", "quantity": 5}],
+        "executed_orders": [{"order_id": "B1", "tag": "BUY-1"}],
+        "in_flight": [],
+    }}
+
+
+def test_flat_positions_are_dropped():
+    records = entry("BUY-1", "B1") + [event(POSITION, position=10, pending_orders=[])]
+    records += [
+        event(INTENT, tag="SL-1", role=ROLE_EXIT, quantity=10),
+        event(ACK, tag="SL-1", role=ROLE_EXIT, quantity=10, order_id="X1"),
+        event(FILL, tag="SL-1", order_id="X1", status="complete", filled_quantity=10, price=99.0),
+        event(POSITION, position=0, pending_orders=[]),
+    ]
+
+    assert recover_positions(records) == {}
+
+
+def test_unacknowledged_intents_of_two_setups_stay_apart():
+    records = [
+        event(INTENT, tag="BUY-ORDER-A-10-092000", role=ROLE_ENTRY, quantity=10),
+        event(INTENT, tag="BUY-ORDER-A-10-101500", role=ROLE_ENTRY, quantity=10),
+    ]
+
+    [state] = recover_positions(records).values()
+
+    assert [order["tag"] for order in state["in_flight"]] == ["BUY-ORDER-A-10-092000", "BUY-ORDER-A-10-101500"]
+    assert all(order["order_id"] is None for order in state["in_flight"])
+
+
+def test_reconcile_resolves_in_flight_orders_from_the_order_book():
+    records = [event(INTENT, tag="BUY-2", role=ROLE_ENTRY, quantity=10)] + targets(("T1-0", "S0", 5))
+    records += [event(INTENT, tag="T1-2", role=ROLE_TARGET, quantity=5), event(INTENT, tag="T2-2", role=ROLE_TARGET, quantity=5)]
+    states = recover_positions(records)
+    order_book = [
+        {"order_id": "B0", "tag": "BUY-2", "status": "complete", "filled_quantity": 10}, # known, earlier order...
+        {"order_id": "B2", "tag": "BUY-2", "status": "complete", "filled_quantity": 10, "average_price": 101.0},
+        {"order_id": "S2", "tag": "T1-2", "status": "open", "filled_quantity": 0},
+    ]
+
+    events = reconcile_positions(states, order_book, known_order_ids={"B0", "S0"})
+
+    state = states[KEY]
+    assert state["position"] == 10
+    assert state["executed_orders"] == [{"order_id": "B2", "tag": "BUY-2"}]
+    assert [order["order_id"] for order in state["pending_orders"]] == ["S0", "S2"] # T2-2 never reached the broker
+    assert [(e["event"], e.get("order_id")) for e in events] == [(ACK, "B2"), (FILL, "B2"), (ACK, "S2"), (POSITION, None)]
+    assert events[-1]["pending_orders"] == ["S0", "S2"]
+
+
+def test_reconcile_applies_the_fill_of_an_acknowledged_exit():
+    records = entry("BUY-1", "B1") + [event(POSITION, position=10, pending_orders=[])]
+    records += [event(INTENT, tag="SL-1", role=ROLE_EXIT, quantity=10), event(ACK, tag="SL-1", role=ROLE_EXIT, quantity=10, order_id="X1")]
+    states = recover_positions(records)
+
+    reconcile_positions(states, [{"order_id": "X1", "tag": "SL-1", "status": "complete", "filled_quantity": 6}], {"B1", "X1"})
+
+    assert states[KEY]["position"] == 4
+
+
+def test_journal_round_trip_skips_a_torn_line(tmp_path, sim_clock):
+    journal = OrderJournal(root=str(tmp_path))
+    journal.record(INTENT, *KEY, tag="BUY-1", role=ROLE_ENTRY, quantity=10)
+    journal.record(ACK, *KEY, tag="BUY-1", role=ROLE_ENTRY, quantity=10, order_id="B1")
+    asyncio.run(journal.flush())
+    path = journal.path()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "fi')
+
+    assert path == os.path.join(str(tmp_path), "2025-01-06", "orders.jsonl")
+    assert [record["event"] for record in journal.load()] == [INTENT, ACK]
+    assert journal.written == 2
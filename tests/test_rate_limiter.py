@@ -0,0 +1,65 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from src.algorithm.core.rate_limiter import TokenBucket, RateLimiter, PRIORITY_EXIT, PRIORITY_ENTRY, PRIORITY_TARGET
+
+
+def test_token_bucket_refills_up_to_the_burst(sim_clock):
+    bucket = TokenBucket(rate=2, burst=2)
+
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.time_until_available() == pytest.approx(0.5)
+
+    sim_clock.advance_to(sim_clock.now() + timedelta(seconds=0.5))
+    assert bucket.try_acquire()
+    sim_clock.advance_to(sim_clock.now() + timedelta(seconds=60))
+    bucket.time_until_available()
+    assert bucket.tokens == 2
+
+
+def test_waiters_are_granted_by_priority_then_arrival():
+    async def scenario():
+        limiter = RateLimiter(budgets={"place": (1000, 1)}, max_in_flight=1)
+        granted = []
+
+        async def request(name: str, priority: int):
+            async with limiter.limit("place", priority=priority):
+                granted.append(name)
+
+        await limiter.acquire("place") # hold the only slot while the others queue up...
+        tasks = [
+            asyncio.create_task(request(name, priority))
+            for name, priority in (("target", PRIORITY_TARGET), ("entry-1", PRIORITY_ENTRY), ("exit", PRIORITY_EXIT), ("entry-2", PRIORITY_ENTRY))
+        ]
+        await asyncio.sleep(0)
+        assert limiter.get_stats()["place"]["waiting"] == 4
+        limiter.release("place")
+        await asyncio.gather(*tasks)
+        return granted, limiter.in_flight["place"]
+
+    granted, in_flight = asyncio.run(scenario())
+
+    assert granted == ["exit", "entry-1", "entry-2", "target"]
+    assert in_flight == 0
+
+
+def test_cancelled_waiter_gives_up_its_turn():
+    async def scenario():
+        limiter = RateLimiter(budgets={"cancel": (1000, 5)}, max_in_flight=1)
+        await limiter.acquire("cancel")
+        waiter = asyncio.create_task(limiter.acquire("cancel", priority=PRIORITY_EXIT))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release("cancel")
+        return limiter.in_flight["cancel"]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_unknown_endpoint_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(RateLimiter().acquire("stream"))
@@ -0,0 +1,104 @@
+import pytest
+
+from src.algorithm.core.ledger import PositionLedger
+from src.algorithm.core.risk_gate import RiskGate, APPROVED, KILL_SWITCH, MAX_POSITION, MAX_NOTIONAL, NO_PRICE
+from src.algorithm.models.risk import RiskLimits
+
+
+ISIN = "INE000A01010"
+
+
+@pytest.fixture
+def ledger() -> PositionLedger:
+    ledger = PositionLedger()
+    ledger.mark(ISIN, 100.0)
+    return ledger
+
+
+def long_gate(ledger: PositionLedger, quantity: int = 10, **limits) -> RiskGate:
+    """Gate over a filled long position of `quantity` shares."""
+    ledger.apply_fill(ISIN, "BUY", quantity, 100.0)
+    return RiskGate(ledger, RiskLimits(**limits))
+
+
+def test_buy_is_clipped_to_the_position_headroom(ledger):
+    gate = RiskGate(ledger, RiskLimits(max_position=10))
+
+    assert gate.check(ISIN, "BUY", 15) == (10, MAX_POSITION)
+    assert gate.open_quantity[ISIN] == 10
+    # open orders count towards the position...
+    assert gate.check(ISIN, "BUY", 1) == (0, MAX_POSITION)
+    assert gate.rejected == {MAX_POSITION: 1}
+
+
+def test_buy_is_clipped_to_the_notional_headroom(ledger):
+    gate = RiskGate(ledger, RiskLimits(max_notional=550))
+
+    assert gate.check(ISIN, "BUY", 10) == (5, MAX_NOTIONAL)
+    assert gate.check(ISIN, "BUY", 10, price=50.0) == (6, MAX_NOTIONAL)
+
+
+def test_notional_limit_needs_a_price():
+    gate = RiskGate(PositionLedger(), RiskLimits(max_notional=1000))
+
+    assert gate.check(ISIN, "BUY", 1) == (0, NO_PRICE)
+
+
+def test_kill_switch_blocks_entries_but_not_exits(ledger):
+    gate = long_gate(ledger)
+    gate.kill("test")
+
+    assert gate.check(ISIN, "BUY", 1) == (0, KILL_SWITCH)
+    assert gate.check(ISIN, "SELL", 10) == (10, APPROVED)
+
+
+def test_reducing_part_passes_and_the_rest_is_blocked(ledger):
+    gate = long_gate(ledger)
+    gate.kill("test")
+
+    # a reversal through zero only keeps its reducing part...
+    assert gate.check(ISIN, "SELL", 15) == (10, KILL_SWITCH)
+    assert gate.open_quantity[ISIN] == -10
+
+
+def test_resting_sells_count_against_further_exits(ledger):
+    gate = long_gate(ledger)
+    gate.kill("test")
+    assert gate.check(ISIN, "SELL", 10) == (10, APPROVED)
+    gate.bind("T1", ISIN, "SELL", 10)
+
+    # the projected position is already flat: another SELL would open a short...
+    assert gate.check(ISIN, "SELL", 10) == (0, KILL_SWITCH)
+
+
+def test_cancel_releases_the_reservation(ledger):
+    gate = long_gate(ledger)
+    gate.kill("test")
+    gate.check(ISIN, "SELL", 10)
+    gate.bind("T1", ISIN, "SELL", 10)
+
+    gate.on_cancel("T1")
+
+    assert gate.open_quantity[ISIN] == 0
+    assert gate.check(ISIN, "SELL", 10) == (10, APPROVED)
+
+
+def test_order_updates_shrink_the_reservation(ledger):
+    gate = RiskGate(ledger, RiskLimits())
+    gate.check(ISIN, "BUY", 10)
+    gate.bind("B1", ISIN, "BUY", 10)
+
+    gate.on_order_update({"order_id": "B1", "status": "open", "quantity": 10, "filled_quantity": 4})
+    assert gate.open_quantity[ISIN] == 6
+    gate.on_order_update({"order_id": "B1", "status": "complete", "quantity": 10, "filled_quantity": 10})
+    assert gate.open_quantity[ISIN] == 0
+    assert gate._orders == {}
+
+
+def test_release_undoes_an_unplaced_reservation(ledger):
+    gate = RiskGate(ledger, RiskLimits())
+    approved, _ = gate.check(ISIN, "BUY", 10)
+
+    gate.release(ISIN, "BUY", approved)
+
+    assert gate.open_quantity[ISIN] == 0
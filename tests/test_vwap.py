@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.algorithm.models.candle import Candle
+from src.algorithm.models.ltpc import LTPC
+from src.algorithm.tools.vwap import VWAP
+
+
+OPEN = datetime(2025, 1, 6, 9, 15)
+
+
+def candle(ts: datetime, price: float, volume: int) -> Candle:
+    return Candle(timestamp=ts, open=price, high=price, low=price, close=price, volume=volume)
+
+
+def tick(ts: datetime, price: float, quantity: int) -> LTPC:
+    return LTPC(ltp=price, ltt=ts, ltq=quantity, cp=price)
+
+
+@pytest.fixture
+def vwap() -> VWAP:
+    """VWAP with the 09:15 5-min candle confirmed (100 @ 10 shares): the in-progress interval starts at 09:20."""
+    indicator = VWAP()
+    indicator.update(100.0, 10, OPEN)
+    return indicator
+
+
+def test_revised_minute_candle_replaces_its_contribution(vwap):
+    minute = OPEN + timedelta(minutes=5)
+
+    assert vwap.estimate(one_min_candle=candle(minute, 110.0, 10)) == pytest.approx(105.0)
+    # revised candle of the same minute: replaces, isn't added on top...
+    assert vwap.estimate(one_min_candle=candle(minute, 130.0, 10)) == pytest.approx(115.0)
+    assert vwap.interval_volume == 10
+
+
+def test_minute_candle_supersedes_the_ticks_of_its_minute(vwap):
+    minute = OPEN + timedelta(minutes=5)
+
+    assert vwap.estimate(ltpc=tick(minute + timedelta(seconds=5), 120.0, 10)) == pytest.approx(110.0)
+    assert vwap.estimate(one_min_candle=candle(minute, 110.0, 10)) == pytest.approx(105.0)
+    assert vwap.tick_volume == 0
+    # late ticks of a minute whose candle already arrived are ignored...
+    assert vwap.estimate(ltpc=tick(minute + timedelta(seconds=30), 500.0, 10)) == pytest.approx(105.0)
+
+
+def test_minutes_of_a_confirmed_candle_are_ignored(vwap):
+    assert vwap.estimate(one_min_candle=candle(OPEN + timedelta(minutes=4), 500.0, 100)) == pytest.approx(100.0)
+    assert vwap.minute_contributions == {}
+
+
+def test_confirmed_candle_drops_its_minutes(vwap):
+    vwap.estimate(one_min_candle=candle(OPEN + timedelta(minutes=5), 110.0, 10))
+    vwap.update(110.0, 10, OPEN + timedelta(minutes=5))
+
+    assert vwap.current_value.value == pytest.approx(105.0)
+    assert vwap.minute_contributions == {}
+    assert vwap.get_bands(estimated=True).vwap == pytest.approx(105.0)
+
+
+def test_new_session_resets_the_sums_and_anchors(vwap):
+    vwap.add_anchor("swing", OPEN)
+    vwap.estimate(one_min_candle=candle(OPEN + timedelta(minutes=5), 110.0, 10))
+    next_open = OPEN + timedelta(days=1)
+
+    vwap.update(200.0, 5, next_open)
+
+    assert vwap.session_date == next_open.date()
+    assert vwap.current_value.value == pytest.approx(200.0)
+    assert vwap.cumulative_volume == 5
+    assert list(vwap.anchors) == ["session"]
+    assert vwap.minute_contributions == {}
+    assert vwap.get_bands().std == 0.0